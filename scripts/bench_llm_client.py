@@ -0,0 +1,134 @@
+"""
+Load test OllamaClient (scheduler, response cache, streaming) against the fake Ollama server.
+
+Starts tests/fake_ollama_server.py with simulated per-token latency, then fires a mixed workload
+from concurrent threads: interactive input-parsing calls and background staff rewrites.
+Reports per-priority p50/p95 latency, throughput, scheduler queueing and server-side token
+counts. Everything is offline and seeded, so runs are comparable; compare e.g.
+--max-inflight 1 vs 4, --cache vs not, or --fault-rate 0.05.
+
+Usage:
+    python scripts/bench_llm_client.py [--interactive 20] [--background 20] [--threads 8]
+    python scripts/bench_llm_client.py --max-inflight 4 --token-latency 0.01 --cache
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.config import get_config
+from src.llm.prompt_manager import format_prompt
+from src.llm.scheduler import LLMScheduler
+from src.llm.schemas import InputParse, StaffRewrite
+from tests.fake_ollama_server import FAULT_KINDS, FakeOllamaServer
+
+QUERIES = [
+    "brain MRI with contrast, Aetna",
+    "knee arthroscopy, Cigna",
+    "CT chest, UnitedHealthcare",
+]
+
+
+def _p(values: list[float], q: float) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100)[int(q * 100) - 1]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--interactive", type=int, default=20, help="Input-parsing requests")
+    parser.add_argument("--background", type=int, default=20, help="Staff-rewrite requests")
+    parser.add_argument("--threads", type=int, default=8, help="Concurrent callers")
+    parser.add_argument("--max-inflight", type=int, default=1, help="llm_scheduler.max_inflight")
+    parser.add_argument(
+        "--parallel", type=int, default=1, help="Fake server concurrent generations"
+    )
+    parser.add_argument("--token-latency", type=float, default=0.02)
+    parser.add_argument("--prefill-latency", type=float, default=0.0005)
+    parser.add_argument("--cache", action="store_true", help="Enable the LLM response cache")
+    parser.add_argument(
+        "--fault-rate", type=float, default=0.0, help="Per-request rate of each fault kind"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    config = get_config()
+    tmp = tempfile.TemporaryDirectory()
+    config.setdefault("paths", {})["cache_dir"] = tmp.name
+    config.setdefault("llm_cache", {})["enabled"] = args.cache
+    config.setdefault("llm_scheduler", {}).update(max_inflight=args.max_inflight, max_queue=None)
+    config.setdefault("ollama", {}).update(timeout=10, retry_backoff_seconds=0.05)
+    # Hangs would only measure the read timeout; inject the other fault kinds
+    faults = {kind: args.fault_rate for kind in FAULT_KINDS if kind != "timeout"}
+
+    from src.llm.ollama_client import OllamaClient
+
+    rng = random.Random(args.seed)
+    jobs = ["interactive"] * args.interactive + ["background"] * args.background
+    rng.shuffle(jobs)
+    latencies: dict[str, list[float]] = {"interactive": [], "background": []}
+    failed: list[str] = []
+
+    with FakeOllamaServer(
+        token_latency=args.token_latency,
+        prefill_latency=args.prefill_latency,
+        parallel=args.parallel,
+        fault_rates=faults,
+        seed=args.seed,
+    ) as server:
+        config["ollama"]["base_url"] = server.url
+        client = OllamaClient()
+        client.warm_up()
+
+        def run(i: int, kind: str) -> None:
+            query = QUERIES[i % len(QUERIES)]
+            start = time.perf_counter()
+            try:
+                if kind == "interactive":
+                    prompt = format_prompt("input_parser", query=query)
+                    result = client.extract_json(prompt, schema=InputParse, priority="interactive")
+                else:
+                    bullets = f'{{"documentation_required": ["{query}"]}}'
+                    prompt = format_prompt("staff_rewriter", requirements_json=bullets)
+                    result = client.extract_json(prompt, schema=StaffRewrite, priority="background")
+                if "raw" in result:
+                    failed.append(kind)
+            except Exception:
+                failed.append(kind)
+            latencies[kind].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.threads) as pool:
+            list(pool.map(run, range(len(jobs)), jobs))
+        elapsed = time.perf_counter() - start
+        server_stats = server.stats()
+
+    print(
+        f"{len(jobs)} requests, {args.threads} threads, max_inflight={args.max_inflight}, "
+        f"server parallel={args.parallel}, cache={'on' if args.cache else 'off'}"
+    )
+    print(f"{'priority':<12} {'n':>4} {'p50 s':>8} {'p95 s':>8}")
+    for kind, values in latencies.items():
+        if values:
+            print(f"{kind:<12} {len(values):>4} {_p(values, 0.5):>8.3f} {_p(values, 0.95):>8.3f}")
+    rate = len(jobs) / elapsed
+    print(f"throughput:  {rate:.1f} requests/s over {elapsed:.2f}s ({len(failed)} failed)")
+    sched = LLMScheduler.from_config().stats()
+    print(f"scheduler:   max queue depth {sched['max_queue_depth']}, admitted {sched['admitted']}")
+    print(f"server:      {server_stats}")
+    if args.cache:
+        print(f"cache:       {client.cache_stats()}")
+    tmp.cleanup()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""
+Recall / latency / memory of quantized NumPy vector storage against float32.
+
+Embeds the parsed policy corpus (data/policies/parsed, via the configured embedding model and
+the embedding cache), builds a NumpyBackend per quantization mode in a temporary directory and
+compares each against exact float32 search: recall@k of the top-k ids, per-query latency, the
+stored size of the search matrix and the peak memory a query allocates while scanning it
+(tracemalloc). Queries are "CPT <code> prior authorization" for codes
+found in the corpus.
+
+Without a parsed corpus or embedding model, use --synthetic N (random unit vectors with
+clustered structure) to exercise the code path.
+
+Usage:
+    python scripts/bench_quantization.py [--k 5] [--queries 200] [--rerank-factor 4]
+    python scripts/bench_quantization.py --synthetic 20000 --dim 384
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+
+from src.config import get_config
+from src.ingestion.cpt_index import extract_cpt_codes, is_policy_file
+from src.lookup.vector_backends import QUANTIZATION_MODES, NumpyBackend
+
+
+def _load_corpus(parsed_dir: Path) -> list[str]:
+    texts = []
+    for jf in sorted(parsed_dir.rglob("*.json")):
+        if not is_policy_file(jf):
+            continue
+        with open(jf, encoding="utf-8") as f:
+            texts.extend(c["text"] for c in json.load(f).get("chunks", []) if c.get("text"))
+    return texts
+
+
+def _corpus_vectors(n_queries: int) -> tuple[np.ndarray, np.ndarray]:
+    from src.lookup.vector_store import PolicyVectorStore
+
+    config = get_config()
+    base = Path(__file__).resolve().parent.parent
+    parsed_dir = base / config.get("paths", {}).get("policies_parsed", "data/policies/parsed")
+    texts = _load_corpus(parsed_dir)
+    if not texts:
+        raise SystemExit(
+            f"No parsed chunks in {parsed_dir}. Run parse_policy_pdfs.py or use --synthetic N."
+        )
+    codes = sorted({c for t in texts for c in extract_cpt_codes(t)})
+    rng = np.random.default_rng(0)
+    picked = rng.choice(codes, size=min(n_queries, len(codes)), replace=False) if codes else []
+    queries = [f"CPT {c} prior authorization" for c in picked] or texts[:n_queries]
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PolicyVectorStore(persist_directory=tmp, backend=NumpyBackend(Path(tmp) / "unused"))
+        print(
+            f"Embedding {len(texts)} chunks and {len(queries)} queries ({store.embedding_model})..."
+        )
+        vectors = np.asarray(store.embed(texts), np.float32)
+        return vectors, np.asarray(store.embed(queries), np.float32)
+
+
+def _synthetic_vectors(n: int, dim: int, n_queries: int) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(0)
+    centers = rng.normal(size=(max(1, n // 50), dim))
+    vectors = centers[rng.integers(len(centers), size=n)] + 0.3 * rng.normal(size=(n, dim))
+    queries = vectors[rng.integers(n, size=n_queries)] + 0.3 * rng.normal(size=(n_queries, dim))
+    return vectors.astype(np.float32), queries.astype(np.float32)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--k", type=int, default=5, help="Results per query (recall@k)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--rerank-factor", type=int, default=4)
+    parser.add_argument(
+        "--synthetic", type=int, default=0, help="Use N synthetic vectors instead of the corpus"
+    )
+    parser.add_argument("--dim", type=int, default=384, help="Synthetic vector dimension")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        vectors, queries = _synthetic_vectors(args.synthetic, args.dim, args.queries)
+    else:
+        vectors, queries = _corpus_vectors(args.queries)
+    ids = [str(i) for i in range(len(vectors))]
+    print(f"{len(vectors)} vectors x {vectors.shape[1]} dims, {len(queries)} queries, k={args.k}")
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        truth = None
+        for mode in QUANTIZATION_MODES:
+            for rerank in ([1] if mode == "none" else [1, args.rerank_factor]):
+                backend = NumpyBackend(
+                    Path(tmp) / f"{mode}_{rerank}", quantization=mode, rerank_factor=rerank
+                )
+                backend.upsert(ids, vectors, ids, [{}] * len(ids))
+                latencies = []
+                results = []
+                for q in queries:
+                    start = time.perf_counter()
+                    results.append(backend.query(q, args.k)["ids"])
+                    latencies.append(time.perf_counter() - start)
+                if truth is None:
+                    truth = results
+                recall = np.mean(
+                    [len(set(r) & set(t)) / len(t) for r, t in zip(results, truth) if t]
+                )
+                tracemalloc.start()
+                backend.query(queries[0], args.k)
+                scan_peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                p50 = np.median(latencies) * 1000
+                rows.append((mode, rerank, recall, p50, backend.resident_bytes(), scan_peak))
+
+    header = (
+        f"{'mode':<8} {'rerank':>6} {'recall@k':>9} {'p50 ms':>8} "
+        f"{'stored MB':>10} {'scan MB':>8}"
+    )
+    print(header)
+    for mode, rerank, recall, p50, size, peak in rows:
+        print(
+            f"{mode:<8} {rerank:>6} {recall:>9.4f} {p50:>8.3f} "
+            f"{size / 1e6:>10.2f} {peak / 1e6:>8.2f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""
+Benchmark PolicyVectorStore.search (one call per query) against search_many (one batch).
+
+By default runs on a synthetic corpus in a temporary NumPy index with a hashing embedder, so
+it needs neither chromadb nor an embedding model and measures search overhead only. With
+--store it queries the configured store instead (real embeddings; embedding cache disabled so
+every run embeds).
+
+Usage:
+    python scripts/bench_vector_search.py [--chunks 5000] [--queries 200] [--n-results 5]
+    python scripts/bench_vector_search.py --store [--payer Aetna]
+"""
+
+import argparse
+import hashlib
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+
+from src.config import get_config
+from src.lookup.vector_backends import NumpyBackend
+from src.lookup.vector_store import PolicyVectorStore
+
+DIM = 384
+
+
+def _hash_embed(texts: list[str]) -> list[list[float]]:
+    """Deterministic pseudo-embeddings (one seeded random vector per text)."""
+    out = []
+    for t in texts:
+        seed = int.from_bytes(hashlib.sha256(t.encode("utf-8")).digest()[:8], "little")
+        out.append(np.random.default_rng(seed).normal(size=DIM).astype(np.float32).tolist())
+    return out
+
+
+def _synthetic_store(directory: Path, n_chunks: int) -> PolicyVectorStore:
+    store = PolicyVectorStore(
+        persist_directory=directory,
+        embedding_function=_hash_embed,
+        backend=NumpyBackend(directory / "bench.npyindex"),
+    )
+    payers = ["Aetna", "UnitedHealthcare", "Cigna"]
+    chunks = [
+        {
+            "text": f"Policy chunk {i}: CPT {70000 + i % 2000} prior authorization criteria",
+            "chunk_index": i,
+            "metadata": {"payer": payers[i % len(payers)], "source": f"policy_{i // 100}.pdf"},
+        }
+        for i in range(n_chunks)
+    ]
+    store.add_chunks(chunks, batch_size=5000)
+    return store
+
+
+def _time(fn, repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--store", action="store_true", help="Use the configured vector store")
+    parser.add_argument(
+        "--payer", default=None, help="Metadata payer filter (where={'payer': ...})"
+    )
+    parser.add_argument("--chunks", type=int, default=5000, help="Synthetic corpus size")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--n-results", type=int, default=5)
+    parser.add_argument("--repeats", type=int, default=3, help="Best of N timings")
+    args = parser.parse_args()
+
+    queries = [f"CPT {70000 + (i * 37) % 2000} prior authorization" for i in range(args.queries)]
+    where = {"payer": args.payer} if args.payer else None
+
+    # Measure search itself, not the result cache
+    get_config().setdefault("vector_store", {})["search_cache_entries"] = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.store:
+            get_config().setdefault("vector_store", {})["embedding_cache"] = False
+            store = PolicyVectorStore()
+        else:
+            get_config().setdefault("paths", {})["cache_dir"] = tmp
+            get_config().setdefault("vector_store", {})["embedding_cache"] = False
+            store = _synthetic_store(Path(tmp), args.chunks)
+        print(
+            f"{store.count()} chunks, {len(queries)} queries, "
+            f"n_results={args.n_results}, where={where}"
+        )
+
+        looped = _time(
+            lambda: [store.search(q, n_results=args.n_results, where=where) for q in queries],
+            args.repeats,
+        )
+        batched = _time(
+            lambda: store.search_many(queries, n_results=args.n_results, where=where), args.repeats
+        )
+
+    print(f"search (loop):   {looped * 1000:8.1f} ms  {len(queries) / looped:9.0f} queries/s")
+    print(f"search_many:     {batched * 1000:8.1f} ms  {len(queries) / batched:9.0f} queries/s")
+    print(f"speedup:         {looped / batched:8.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,12 @@
 """
 Batch parse policy PDFs and save to data/policies/parsed/.
 
+Also writes a CPT -> chunk index (_cpt_index.json) per payer directory so PolicyLookup
+can fetch matching chunks without scanning every parsed file.
+
 Usage:
     python scripts/parse_policy_pdfs.py [--input-dir data/policies/raw]
+    python scripts/parse_policy_pdfs.py --index-only   # rebuild CPT indexes for existing JSON
 """
 
 import argparse
@@ -13,6 +17,7 @@ from pathlib import Path
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
+from src.ingestion.cpt_index import is_policy_file, write_cpt_index
 from src.ingestion.pdf_parser import extract_text_from_pdf
 from src.ingestion.policy_chunker import chunk_policy
 from src.lookup.payer_aliases import normalize_payer
@@ -35,12 +40,25 @@ def main() -> int:
         default=None,
         help="Canonical payer name (e.g. UnitedHealthcare). Infer from filename if omitted.",
     )
+    parser.add_argument(
+        "--index-only",
+        action="store_true",
+        help="Skip PDF parsing; rebuild CPT indexes for all parsed payer directories",
+    )
     args = parser.parse_args()
 
     base_dir = Path(__file__).resolve().parent.parent
     input_dir = base_dir / args.input_dir
     output_dir = base_dir / args.output_dir
 
+    if args.index_only:
+        if not output_dir.exists():
+            print(f"Output directory not found: {output_dir}")
+            return 1
+        payer_dirs = {f.parent for f in output_dir.rglob("*.json") if is_policy_file(f)}
+        _write_indexes(payer_dirs)
+        return 0
+
     if not input_dir.exists():
         print(f"Input directory not found: {input_dir}")
         return 1
@@ -53,6 +71,7 @@ def main() -> int:
         print("Add policy PDFs to the raw directory.")
         return 0
 
+    payer_dirs: set[Path] = set()
     for pdf_path in pdf_files:
         try:
             parsed = extract_text_from_pdf(pdf_path)
@@ -82,12 +101,21 @@ def main() -> int:
             out_path = payer_subdir / f"{pdf_path.stem}.json"
             with open(out_path, "w", encoding="utf-8") as f:
                 json.dump(output, f, indent=2)
+            payer_dirs.add(payer_subdir)
             print(f"Parsed {pdf_path.name} -> {out_path.name} ({len(chunks)} chunks)")
         except Exception as e:
             print(f"Error parsing {pdf_path.name}: {e}")
 
+    _write_indexes(payer_dirs)
     return 0
 
 
+def _write_indexes(payer_dirs: set[Path]) -> None:
+    """Rebuild the CPT -> chunk index for each payer directory."""
+    for payer_dir in sorted(payer_dirs):
+        index_path = write_cpt_index(payer_dir)
+        print(f"Indexed {payer_dir.name} -> {index_path.name}")
+
+
 if __name__ == "__main__":
     sys.exit(main())
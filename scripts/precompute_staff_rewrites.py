@@ -0,0 +1,143 @@
+"""
+Precompute staff-friendly rewrites for every entry in the CMS cache.
+
+Walks data/cms/articles_cache.json, groups CPTs that share identical requirement bullets,
+rewrites each unique group once through Ollama (staff_rewriter prompt) and stores the result
+next to the raw bullets under "staff_rewrite". PolicyLookup then serves the precomputed text
+for Medicare without a live LLM call.
+
+Resumable: entries whose stored rewrite matches the current bullets and prompt version are
+skipped, and progress is checkpointed to disk. Re-run after build_cms_cache_from_bulk.py
+(which rewrites the cache from scratch); LLM outputs are memoized, so re-runs are cheap.
+
+Usage:
+    python scripts/precompute_staff_rewrites.py [--workers 2] [--limit N] [--force]
+"""
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.config import get_config
+from src.llm.llm_memo import LLMMemo
+from src.llm.prompt_manager import prompt_version
+from src.lookup.cms_policy_lookup import STAFF_REWRITE_KEY, requirements_hash
+from src.lookup.policy_lookup import staff_rewrite_bullets
+
+
+def _write_cache(cache: dict, cache_path: Path) -> None:
+    """Atomically write the cache (temp file + replace) so an interrupted run never corrupts it."""
+    tmp = cache_path.with_suffix(cache_path.suffix + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(cache, f, indent=2)
+    os.replace(tmp, cache_path)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--cache-path", default=None, help="CMS cache JSON (default: cms_api.cache_path)"
+    )
+    parser.add_argument("--workers", type=int, default=2, help="Concurrent Ollama requests")
+    parser.add_argument("--limit", type=int, default=None, help="Rewrite at most N unique entries")
+    parser.add_argument("--checkpoint-every", type=int, default=25, help="Save after N rewrites")
+    parser.add_argument(
+        "--force", action="store_true", help="Redo entries that already have a rewrite"
+    )
+    args = parser.parse_args()
+
+    config = get_config()
+    base = Path(__file__).resolve().parent.parent
+    cache_path = Path(
+        args.cache_path
+        or config.get("cms_api", {}).get("cache_path", "data/cms/articles_cache.json")
+    )
+    if not cache_path.is_absolute():
+        cache_path = base / cache_path
+    if not cache_path.exists():
+        print(f"CMS cache not found: {cache_path}. Run build_cms_cache_from_bulk.py first.")
+        return 1
+
+    with open(cache_path, encoding="utf-8") as f:
+        cache = json.load(f)
+
+    # This process is the only Ollama user: let --workers generations run concurrently
+    config.setdefault("llm_scheduler", {})["max_inflight"] = max(1, args.workers)
+    try:
+        from src.llm.ollama_client import OllamaClient
+        client = OllamaClient()
+    except ImportError as e:
+        print(e)
+        return 1
+    version = prompt_version("staff_rewriter")
+
+    # Unique bullet sets -> CPTs sharing them
+    groups: dict[str, list[str]] = {}
+    for cpt, entry in cache.items():
+        if not isinstance(entry, dict) or "prior_auth_required" not in entry:
+            continue
+        h = requirements_hash(entry)
+        staff = entry.get(STAFF_REWRITE_KEY)
+        done = (
+            isinstance(staff, dict)
+            and staff.get("source_hash") == h
+            and staff.get("prompt_version") == version
+            and staff.get("model") == client.model
+        )
+        if done and not args.force:
+            continue
+        groups.setdefault(h, []).append(cpt)
+
+    todo = list(groups.items())[: args.limit] if args.limit else list(groups.items())
+    print(f"{len(todo)} unique requirement sets to rewrite ({sum(len(c) for _, c in todo)} CPTs)")
+    if not todo:
+        return 0
+
+    memo = LLMMemo.from_config()
+    done_count = failed = 0
+    pool = ThreadPoolExecutor(max_workers=max(1, args.workers))
+    futures = {
+        pool.submit(staff_rewrite_bullets, cache[cpts[0]], client, memo): (h, cpts)
+        for h, cpts in todo
+    }
+    try:
+        for fut in as_completed(futures):
+            h, cpts = futures[fut]
+            try:
+                rewritten = fut.result()
+            except Exception as e:
+                rewritten = None
+                print(f"Error rewriting {cpts[0]}: {e}")
+            if not rewritten:
+                failed += 1
+                continue
+            for cpt in cpts:
+                cache[cpt][STAFF_REWRITE_KEY] = {
+                    **rewritten,
+                    "source_hash": h,
+                    "prompt_version": version,
+                    "model": client.model,
+                }
+            done_count += 1
+            if done_count % args.checkpoint_every == 0:
+                _write_cache(cache, cache_path)
+                print(f"Checkpoint: {done_count}/{len(todo)} rewritten, {failed} failed")
+    except KeyboardInterrupt:
+        print("Interrupted; saving progress.")
+        pool.shutdown(wait=False, cancel_futures=True)
+        _write_cache(cache, cache_path)
+        return 130
+    pool.shutdown()
+
+    _write_cache(cache, cache_path)
+    print(f"Rewrote {done_count} unique entries ({failed} failed; re-run to retry) -> {cache_path}")
+    return 0 if not failed else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
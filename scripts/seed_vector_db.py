@@ -2,6 +2,8 @@
 Seed ChromaDB with policy chunks from parsed JSON files.
 
 Run after parse_policy_pdfs.py. Requires parsed JSON in data/policies/parsed/.
+Idempotent: chunks are upserted under content-hash ids, so unchanged chunks are skipped and
+chunks from an edited file replace its previous ones.
 """
 
 import json
@@ -11,7 +13,8 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 from src.config import get_config
-from src.lookup.vector_store import PolicyVectorStore
+from src.ingestion.cpt_index import is_policy_file
+from src.lookup.vector_store import PolicyVectorStore, chunk_id
 
 
 def main() -> int:
@@ -23,23 +26,35 @@ def main() -> int:
         print(f"Parsed directory not found: {parsed_dir}")
         return 1
 
-    json_files = list(parsed_dir.rglob("*.json"))
+    json_files = [f for f in parsed_dir.rglob("*.json") if is_policy_file(f)]
     if not json_files:
         print("No parsed JSON files found. Run parse_policy_pdfs.py first.")
         return 0
 
     store = PolicyVectorStore()
-    total = 0
-    for jf in json_files:
-        with open(jf, encoding="utf-8") as f:
-            data = json.load(f)
-        chunks = data.get("chunks", [])
-        if chunks:
-            ids = [f"{jf.stem}_{c['chunk_index']}" for c in chunks]
-            store.add_chunks(chunks, ids=ids)
-            total += len(chunks)
-            print(f"Added {len(chunks)} chunks from {jf.name}")
-    print(f"Total: {total} chunks in vector store")
+    total = written = 0
+    # One bulk write: the index and BM25 files are written once, not once per policy file
+    with store.bulk_write():
+        for jf in json_files:
+            with open(jf, encoding="utf-8") as f:
+                data = json.load(f)
+            chunks = data.get("chunks", [])
+            if chunks:
+                n = store.add_chunks(chunks)
+                # Same-named PDFs under different payers are different sources
+                sources = {
+                    (c.get("metadata", {}).get("payer"), c.get("metadata", {}).get("source"))
+                    for c in chunks
+                }
+                ids = [chunk_id(c) for c in chunks]
+                pruned = sum(store.prune_source(src, ids, payer) for payer, src in sources if src)
+                total += len(chunks)
+                written += n
+                print(
+                    f"{jf.name}: {n} new/changed, {len(chunks) - n} unchanged, "
+                    f"{pruned} stale removed"
+                )
+    print(f"Total: {total} chunks ({written} written); {store.count()} in vector store")
     return 0
 
 
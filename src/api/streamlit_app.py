@@ -1,6 +1,8 @@
 """Streamlit application for AuthLookup."""
 
 import json
+import threading
+
 import streamlit as st
 
 from src.lookup.cpt_lookup import CPTLookup
@@ -22,22 +24,42 @@ def get_ollama_client():
 
 
 def check_ollama_available() -> tuple[bool, str]:
-    """Check if Ollama is running and reachable. Returns (ok, error_message)."""
+    """
+    Check if Ollama is running and the model is pulled. Returns (ok, error_message).
+
+    Uses OllamaClient.health() (tags/ps endpoints, TTL-cached), so it is cheap on every rerun.
+    """
     try:
         client = get_ollama_client()
-        client.query("ok")
-        return True, ""
     except ImportError as e:
         return False, f"ollama package required. Install with: pip install ollama"
-    except Exception as e:
-        return False, f"Ollama not available: {e}. Start Ollama (ollama serve) and pull the model (ollama pull qwen2.5-coder:3b)."
+    health = client.health()
+    if not health["ok"]:
+        return (
+            False,
+            f"Ollama not available: {health['error']}. Start Ollama (ollama serve) "
+            "and pull the model (ollama pull qwen2.5-coder:3b).",
+        )
+    _warm_up_model(client.model)
+    return True, ""
+
+
+@st.cache_resource(show_spinner=False)
+def _warm_up_model(model: str) -> threading.Thread:
+    """Load the model once per server process, in the background, before the first search."""
+    thread = threading.Thread(
+        target=get_ollama_client().warm_up, name="ollama-warm-up", daemon=True
+    )
+    thread.start()
+    return thread
 
 
 def parse_input_with_llm(query: str, client):
     """Parse procedure and payer from query using LLM."""
     from src.llm.prompt_manager import format_prompt
+    from src.llm.schemas import InputParse
     prompt = format_prompt("input_parser", query=query)
-    result = client.extract_json(prompt)
+    result = client.extract_json(prompt, schema=InputParse, priority="interactive")
     return result.get("procedure", query), result.get("payer", "Unknown")
 
 
@@ -80,7 +102,10 @@ def run_app() -> None:
                 with m2:
                     st.metric("Prior Auth Required", "Yes" if requirements.get("prior_auth_required") else "No")
                 source = requirements.get("source_section", "unknown")
-                st.caption(f"Source: {source}")
+                if requirements.get("degraded"):
+                    st.caption(f"Source: {source} (quick answer - AI summary timed out)")
+                else:
+                    st.caption(f"Source: {source}")
                 st.write("**Documentation Needed:**")
                 for doc in requirements.get("documentation_required", []):
                     st.write(f"- {doc}")
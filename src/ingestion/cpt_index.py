@@ -0,0 +1,95 @@
+"""CPT code -> chunk inverted index for parsed policy JSON."""
+
+import json
+import re
+from pathlib import Path
+from typing import Any
+
+# Written next to the parsed policy files of each payer directory. The leading underscore
+# keeps it out of the "*.json" policy scans (see is_policy_file).
+CPT_INDEX_FILENAME = "_cpt_index.json"
+CPT_INDEX_VERSION = 1
+
+# CPT (5 digits, Category II/III 4 digits + F/T) and HCPCS Level II (letter + 4 digits),
+# matched on token boundaries so "70553" does not hit "170553" or "70553.5".
+_CPT_TOKEN_RE = re.compile(r"(?<![0-9A-Za-z.])(\d{4}[0-9FT]|[A-V]\d{4})(?![0-9A-Za-z]|\.\d)")
+
+
+def extract_cpt_codes(text: str) -> set[str]:
+    """Return CPT/HCPCS codes that appear as whole tokens in text."""
+    return set(_CPT_TOKEN_RE.findall(text or ""))
+
+
+def chunk_mentions_cpt(text: str, cpt_code: str) -> bool:
+    """True if cpt_code appears in text as a whole token."""
+    return cpt_code.strip() in extract_cpt_codes(text)
+
+
+def cpt_metadata_key(cpt_code: str) -> str:
+    """Boolean chunk-metadata key marking that a chunk mentions cpt_code (e.g. cpt_70553)."""
+    return f"cpt_{cpt_code.strip().upper()}"
+
+
+def cpt_metadata(text: str) -> dict[str, Any]:
+    """
+    Chunk metadata for the codes in text: "cpt_codes" (comma-separated) plus one
+    cpt_<code>: True flag per code, so vector stores can prefilter with {"cpt_70553": True}.
+    """
+    codes = sorted(extract_cpt_codes(text))
+    meta: dict[str, Any] = {"cpt_codes": ",".join(codes)}
+    meta.update({cpt_metadata_key(c): True for c in codes})
+    return meta
+
+
+def is_policy_file(path: Path) -> bool:
+    """Parsed policy JSON file (excludes index and other underscore-prefixed files)."""
+    return path.suffix == ".json" and not path.name.startswith("_")
+
+
+def build_cpt_index(payer_dir: str | Path) -> dict[str, Any]:
+    """
+    Build index mapping CPT code -> [[file name, chunk_index], ...] for one payer directory.
+
+    Postings are ordered by file name then chunk order, matching the order of a directory scan.
+    """
+    payer_dir = Path(payer_dir)
+    postings: dict[str, list[list[Any]]] = {}
+    files: list[str] = []
+    for f in sorted(payer_dir.glob("*.json")):
+        if not is_policy_file(f):
+            continue
+        try:
+            with open(f, encoding="utf-8") as fp:
+                data = json.load(fp)
+        except (json.JSONDecodeError, OSError):
+            continue
+        files.append(f.name)
+        for pos, chunk in enumerate(data.get("chunks", [])):
+            for code in sorted(extract_cpt_codes(chunk.get("text", ""))):
+                postings.setdefault(code, []).append([f.name, pos])
+    return {"version": CPT_INDEX_VERSION, "files": files, "postings": postings}
+
+
+def write_cpt_index(payer_dir: str | Path) -> Path:
+    """Build and write the CPT index for a payer directory. Returns the index path."""
+    payer_dir = Path(payer_dir)
+    index = build_cpt_index(payer_dir)
+    out_path = payer_dir / CPT_INDEX_FILENAME
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(index, f)
+    return out_path
+
+
+def load_cpt_index(payer_dir: str | Path) -> dict[str, Any] | None:
+    """Load the CPT index for a payer directory, or None if missing/unreadable."""
+    path = Path(payer_dir) / CPT_INDEX_FILENAME
+    if not path.exists():
+        return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            index = json.load(f)
+    except (json.JSONDecodeError, OSError):
+        return None
+    if not isinstance(index, dict) or index.get("version") != CPT_INDEX_VERSION:
+        return None
+    return index
@@ -2,6 +2,7 @@
 
 from dataclasses import dataclass
 
+from src.ingestion.cpt_index import cpt_metadata
 from src.ingestion.pdf_parser import ParsedPdf
 
 
@@ -54,16 +55,18 @@ def chunk_policy(
             continue
 
         page_num = _estimate_page_for_position(text, parsed, start)
+        chunk_text = chunk_text.strip()
 
         chunks.append(
             PolicyChunk(
-                text=chunk_text.strip(),
+                text=chunk_text,
                 chunk_index=chunk_index,
                 page_number=page_num,
                 metadata={
                     **metadata_base,
                     "chunk_index": chunk_index,
                     "page": page_num,
+                    **cpt_metadata(chunk_text),
                 },
             )
         )
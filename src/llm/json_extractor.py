@@ -17,6 +17,9 @@ def extract_json(text: str) -> dict[str, Any] | None:
             return json.loads(match.group())
         except json.JSONDecodeError:
             pass
+        # Greedy match spans trailing prose with braces; take the first balanced object instead
+        scanner = JsonObjectScanner()
+        return scanner.feed(text)
     return None
 
 
@@ -26,3 +29,65 @@ def extract_json_with_fallback(text: str) -> dict[str, Any]:
     if result is not None:
         return result
     return {"raw": text}
+
+
+class JsonObjectScanner:
+    """
+    Incremental scanner for the first complete top-level JSON object in streamed text.
+
+    feed() text fragments as they arrive; it returns the parsed object as soon as the
+    outermost braces balance (braces inside strings and escapes are handled), so a caller can
+    stop the generation there. Prose before the object is skipped; a balanced span that is
+    not valid JSON is dropped and scanning resumes after it.
+    """
+
+    def __init__(self) -> None:
+        self.text = ""
+        self.result: dict[str, Any] | None = None
+        self._pos = 0
+        self._start = -1
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    @property
+    def done(self) -> bool:
+        return self.result is not None
+
+    def feed(self, fragment: str) -> dict[str, Any] | None:
+        """Add text; return the object once complete (and on every later call), else None."""
+        self.text += fragment
+        if self.result is not None:
+            return self.result
+        text = self.text
+        while self._pos < len(text):
+            ch = text[self._pos]
+            self._pos += 1
+            if self._start < 0:
+                if ch == "{":
+                    self._start, self._depth = self._pos - 1, 1
+                continue
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == "{":
+                self._depth += 1
+            elif ch == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    try:
+                        parsed = json.loads(text[self._start : self._pos])
+                    except json.JSONDecodeError:
+                        parsed = None
+                    if isinstance(parsed, dict):
+                        self.result = parsed
+                        return parsed
+                    self._pos = self._start + 1
+                    self._start = -1
+        return None
@@ -0,0 +1,79 @@
+"""Persistent memo of parsed LLM outputs keyed by prompt version, rendered inputs and model."""
+
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import Any
+
+from src.config import get_config
+from src.llm.prompt_manager import prompt_version
+from src.sqlite_cache import SQLiteCache
+
+_shared: dict[str, "LLMMemo"] = {}
+_shared_lock = threading.Lock()
+
+
+class LLMMemo:
+    """
+    Content-addressed memo for prompt -> parsed JSON results.
+
+    Identical work (same template version, same inputs, same model) is done once per corpus
+    version instead of once per request; e.g. every CPT under one LCD shares a staff rewrite.
+    """
+
+    def __init__(self, path: str | Path, max_entries: int | None = None) -> None:
+        self._store = SQLiteCache(path, table="llm_memo", max_entries=max_entries)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_config(cls) -> "LLMMemo | None":
+        """Process-wide memo at {cache_dir}/llm_memo.sqlite; None when llm_memo.enabled is false."""
+        config = get_config()
+        memo_config = config.get("llm_memo", {})
+        if not memo_config.get("enabled", True):
+            return None
+        path = Path(config.get("paths", {}).get("cache_dir", "data/cache"))
+        if not path.is_absolute():
+            path = Path(__file__).resolve().parent.parent.parent / path
+        path = path / "llm_memo.sqlite"
+        with _shared_lock:
+            if str(path) not in _shared:
+                _shared[str(path)] = cls(path, max_entries=memo_config.get("max_entries"))
+            return _shared[str(path)]
+
+    @staticmethod
+    def make_key(prompt_name: str, model: str, **inputs: Any) -> str:
+        """hash(prompt template version + rendered inputs + model)."""
+        try:
+            version = prompt_version(prompt_name)
+        except FileNotFoundError:
+            version = "missing"
+        payload = json.dumps([prompt_name, version, model, inputs], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """Memoized result or None."""
+        value = self._store.get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: dict[str, Any]) -> None:
+        """Memoize a parsed result."""
+        self._store.set(key, value)
+
+    def stats(self) -> dict[str, Any]:
+        """Hit/miss counters and hit rate."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
@@ -1,19 +1,103 @@
-"""Ollama HTTP client with retries and timeouts."""
+"""Ollama HTTP clients (blocking and asyncio) with retries and timeouts."""
 
-import json
-import re
+import asyncio
+import logging
+import random
+import threading
+import time
+import weakref
+from concurrent.futures import CancelledError
 from typing import Any
 
+from pydantic import BaseModel, ValidationError
+
 from src.config import get_config
+from src.llm.json_extractor import JsonObjectScanner, extract_json_with_fallback
+from src.llm.response_cache import LLMResponseCache
+from src.llm.scheduler import LLMScheduler
+from src.llm.schemas import ollama_format
 
 try:
+    import httpx
     import ollama
 except ImportError:
     ollama = None
 
+logger = logging.getLogger(__name__)
 
-class OllamaClient:
-    """Client for Ollama API with structured output support."""
+# HTTP statuses worth retrying (overloaded / restarting server)
+_RETRY_STATUS = {500, 502, 503, 504}
+
+_clients: dict[tuple, Any] = {}
+_clients_lock = threading.Lock()
+# (base_url, model) -> (monotonic expiry, health result)
+_health: dict[tuple[str, str], tuple[float, dict[str, Any]]] = {}
+_health_lock = threading.Lock()
+# Event loop -> {key: ollama.AsyncClient}; httpx async pools are bound to the loop that uses them
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[tuple, Any]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _client_kwargs(timeout: float, connect_timeout: float, pool_size: int) -> dict[str, Any]:
+    return {
+        "timeout": httpx.Timeout(timeout, connect=min(connect_timeout, timeout)),
+        "limits": httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+    }
+
+
+def _shared_client(host: str, timeout: float, connect_timeout: float, pool_size: int) -> Any:
+    """
+    Process-wide ollama.Client per (host, timeouts, pool size).
+
+    The underlying httpx client is thread-safe and keeps connections alive, so every
+    OllamaClient instance and thread reuses the same bounded connection pool.
+    """
+    key = (ollama.Client, host, timeout, connect_timeout, pool_size)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = ollama.Client(host=host, **_client_kwargs(timeout, connect_timeout, pool_size))
+            _clients[key] = client
+        return client
+
+
+def _shared_async_client(host: str, timeout: float, connect_timeout: float, pool_size: int) -> Any:
+    """ollama.AsyncClient shared by every coroutine on the running event loop (pool per loop)."""
+    loop = asyncio.get_running_loop()
+    key = (ollama.AsyncClient, host, timeout, connect_timeout, pool_size)
+    with _clients_lock:
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get(key)
+        if client is None:
+            client = ollama.AsyncClient(
+                host=host, **_client_kwargs(timeout, connect_timeout, pool_size)
+            )
+            clients[key] = client
+        return client
+
+
+def _model_matches(name: str | None, model: str) -> bool:
+    """Ollama reports untagged models as name:latest."""
+    return bool(name) and (name == model or (":" not in model and name == f"{model}:latest"))
+
+
+def _is_transient(exc: Exception) -> bool:
+    """
+    Connect-phase failures, dropped connections and 5xx; not bad requests or missing models.
+
+    Read timeouts are not retried: the server was generating, so resending would hold the
+    LLM slot for another full timeout.
+    """
+    if isinstance(exc, ollama.ResponseError):
+        return exc.status_code in _RETRY_STATUS
+    return isinstance(
+        exc, (ConnectionError, httpx.ConnectError, httpx.ConnectTimeout, httpx.RemoteProtocolError)
+    )
+
+
+class _OllamaClientBase:
+    """Configuration, response cache and output validation shared by the sync and async clients."""
 
     def __init__(
         self,
@@ -28,29 +112,438 @@ class OllamaClient:
         self.model = model or ollama_config.get("model", "llama3:8b")
         self.base_url = base_url or ollama_config.get("base_url", "http://localhost:11434")
         self.timeout = timeout or ollama_config.get("timeout", 60)
+        self.retries = int(ollama_config.get("retries", 2))
+        self.retry_backoff = float(ollama_config.get("retry_backoff_seconds", 0.5))
+        self.stream_json = bool(ollama_config.get("stream_json", True))
+        self.connect_timeout = ollama_config.get("connect_timeout", 5)
+        self.pool_size = int(ollama_config.get("pool_size", 4))
+        self.keep_alive = ollama_config.get("keep_alive")
+        self.health_ttl = float(ollama_config.get("health_ttl_seconds", 15))
+        self._cache = LLMResponseCache.from_config()
+        self._scheduler = LLMScheduler.from_config()
+
+    def _chat_kwargs(self, messages: list[dict[str, str]], format: Any) -> dict[str, Any]:
+        kwargs: dict[str, Any] = {"model": self.model, "messages": messages}
+        if format is not None:
+            kwargs["format"] = format
+        if self.keep_alive is not None:
+            kwargs["keep_alive"] = self.keep_alive
+        return kwargs
+
+    def _cached_health(self) -> dict[str, Any] | None:
+        with _health_lock:
+            entry = _health.get((self.base_url, self.model))
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+        return None
+
+    def _store_health(self, result: dict[str, Any]) -> dict[str, Any]:
+        with _health_lock:
+            _health[(self.base_url, self.model)] = (time.monotonic() + self.health_ttl, result)
+        return result
 
-    def query(self, prompt: str, system: str | None = None) -> str:
-        """Send a query to Ollama and return the response text."""
-        messages = []
-        if system:
-            messages.append({"role": "system", "content": system})
-        messages.append({"role": "user", "content": prompt})
-
-        client = ollama.Client(host=self.base_url)
-        response = client.chat(
-            model=self.model,
-            messages=messages,
+    def _forget_health(self) -> None:
+        with _health_lock:
+            _health.pop((self.base_url, self.model), None)
+
+    def _health_result(self, tags: Any, ps: Any) -> dict[str, Any]:
+        """Health from /api/tags (pulled models) and /api/ps (models loaded in memory)."""
+        available = any(
+            _model_matches(m.get("model") or m.get("name"), self.model) for m in tags["models"]
+        )
+        loaded = any(
+            _model_matches(m.get("model") or m.get("name"), self.model) for m in ps["models"]
+        )
+        return {
+            "ok": available,
+            "model": self.model,
+            "model_available": available,
+            "model_loaded": loaded,
+            "error": None if available else f"Model {self.model} is not pulled (ollama pull).",
+        }
+
+    def _health_error(self, exc: Exception) -> dict[str, Any]:
+        return {
+            "ok": False,
+            "model": self.model,
+            "model_available": False,
+            "model_loaded": False,
+            "error": f"Ollama not reachable at {self.base_url}: {exc}",
+        }
+
+    def _cache_key(self, kind: str, prompt: str, system: str | None, format: Any) -> str | None:
+        if self._cache is None:
+            return None
+        return LLMResponseCache.make_key(self.model, prompt, system, kind=kind, format=format)
+
+    def cache_stats(self) -> dict[str, Any]:
+        """Response cache hit rate and LLM seconds saved ({} when llm_cache is disabled)."""
+        return self._cache.stats() if self._cache is not None else {}
+
+    def _retry_delay(self, attempt: int, exc: Exception) -> float | None:
+        """Backoff before retrying exc, or None if it should be raised."""
+        if attempt >= self.retries or not _is_transient(exc):
+            return None
+        # Full jitter: uniform in [0, backoff * 2^attempt]
+        delay = random.uniform(0, self.retry_backoff * 2**attempt)
+        logger.warning(
+            "Ollama call failed (%s); retry %d/%d in %.2fs", exc, attempt + 1, self.retries, delay
+        )
+        return delay
+
+    @staticmethod
+    def _validate(
+        result: dict[str, Any], text: str, schema: type[BaseModel] | None
+    ) -> dict[str, Any]:
+        if schema is None or "raw" in result:
+            return result
+        try:
+            return schema.model_validate(result).model_dump()
+        except ValidationError as e:
+            logger.warning("LLM output failed %s validation: %s", schema.__name__, e)
+            return {"raw": text}
+
+
+class OllamaClient(_OllamaClientBase):
+    """Client for Ollama API with structured output support."""
+
+    def __init__(
+        self,
+        model: str | None = None,
+        base_url: str | None = None,
+        timeout: int | None = None,
+    ) -> None:
+        super().__init__(model, base_url, timeout)
+        self._client = _shared_client(
+            self.base_url, self.timeout, self.connect_timeout, self.pool_size
         )
-        return response["message"]["content"]
 
-    def extract_json(self, prompt: str, system: str | None = None) -> dict[str, Any]:
-        """Query Ollama and extract JSON from the response."""
-        response = self.query(prompt, system)
+    def health(self) -> dict[str, Any]:
+        """
+        Server and model status without generating: {"ok", "model", "model_available",
+        "model_loaded", "error"}.
 
-        json_match = re.search(r"\{[\s\S]*\}", response)
-        if json_match:
+        Uses /api/tags and /api/ps, and the result is cached per server and model for
+        ollama.health_ttl_seconds, so calling it on every Streamlit rerun is cheap.
+        """
+        cached = self._cached_health()
+        if cached is not None:
+            return cached
+        try:
+            result = self._health_result(self._client.list(), self._client.ps())
+        except Exception as e:
+            result = self._health_error(e)
+        return self._store_health(result)
+
+    def warm_up(self, keep_alive: str | float | None = None) -> bool:
+        """
+        Load the model into memory with an empty generate request so the first real query does not
+        pay for loading. The model stays loaded for keep_alive (default: ollama.keep_alive).
+        Returns False if the request failed.
+        """
+        try:
+            self._with_retries(
+                self._client.generate,
+                "background",
+                model=self.model,
+                prompt="",
+                keep_alive=keep_alive or self.keep_alive,
+            )
+        except Exception as e:
+            logger.warning("Ollama warm-up for %s failed: %s", self.model, e)
+            return False
+        finally:
+            self._forget_health()
+        return True
+
+    def query(
+        self,
+        prompt: str,
+        system: str | None = None,
+        format: Any = None,
+        cache: bool = True,
+        priority: str = "normal",
+        cancel: threading.Event | None = None,
+    ) -> str:
+        """
+        Send a query to Ollama and return the response text (format: "json" or a JSON schema).
+
+        Responses are served from / stored in the llm_cache unless cache is False. Calls that
+        reach Ollama wait for a scheduler slot at priority ("interactive", "normal",
+        "background") and raise SchedulerBusyError under back-pressure; see src.llm.scheduler.
+        """
+        key = self._cache_key("chat", prompt, system, format) if cache else None
+        if key is not None and (text := self._cache.get(key)) is not None:
+            return text
+        kwargs = self._chat_kwargs(_messages(prompt, system), format)
+        start = time.perf_counter()
+        response = self._with_retries(self._client.chat, priority, cancel, **kwargs)
+        text = response["message"]["content"]
+        if key is not None and isinstance(text, str):
+            self._cache.set(key, text, time.perf_counter() - start)
+        return text
+
+    def _with_retries(
+        self,
+        fn: Any,
+        priority: str = "normal",
+        cancel: threading.Event | None = None,
+        **kwargs: Any,
+    ) -> Any:
+        """
+        Call fn in a scheduler slot, retrying transient failures up to self.retries times with
+        jittered backoff. The slot is released while backing off. If cancel is set by the time
+        a slot is granted, fn is not called and CancelledError is raised.
+        """
+        for attempt in range(self.retries + 1):
+            try:
+                with self._scheduler.slot(priority):
+                    _check_cancel(cancel)
+                    return fn(**kwargs)
+            except Exception as e:
+                delay = self._retry_delay(attempt, e)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+
+    def extract_json(
+        self,
+        prompt: str,
+        system: str | None = None,
+        stream: bool | None = None,
+        schema: type[BaseModel] | None = None,
+        cache: bool = True,
+        priority: str = "normal",
+        cancel: threading.Event | None = None,
+    ) -> dict[str, Any]:
+        """
+        Query Ollama and extract JSON from the response.
+
+        With schema (a pydantic model, see src.llm.schemas) its JSON schema is sent as Ollama's
+        `format`, so decoding is constrained to a matching object, and the result is validated;
+        output that does not validate is returned as {"raw": text}.
+
+        With stream (default: ollama.stream_json) tokens are scanned as they arrive and the
+        generation is stopped once the top-level JSON object closes, so trailing prose is
+        never generated.
+
+        The JSON text is served from / stored in the llm_cache unless cache is False; output
+        that does not parse or validate is never cached.
+
+        Setting cancel (from another thread) abandons the call with CancelledError: it is not
+        sent if still queued for a slot, and a streaming generation stops at the next token.
+        """
+        if stream is None:
+            stream = self.stream_json
+        format = ollama_format(schema) if schema is not None else None
+        key = self._cache_key("json", prompt, system, format) if cache else None
+        text = self._cache.get(key) if key is not None else None
+        if text is not None:
+            return self._validate(extract_json_with_fallback(text), text, schema)
+        start = time.perf_counter()
+        if not stream:
+            text = self.query(
+                prompt, system, format=format, cache=False, priority=priority, cancel=cancel
+            )
+            result = extract_json_with_fallback(text)
+        else:
+            result, text = self._with_retries(
+                self._stream_json,
+                priority,
+                cancel,
+                messages=_messages(prompt, system),
+                format=format,
+                stop=cancel,
+            )
+        result = self._validate(result, text, schema)
+        if key is not None and "raw" not in result:
+            self._cache.set(key, text, time.perf_counter() - start)
+        return result
+
+    def _stream_json(
+        self,
+        messages: list[dict[str, str]],
+        format: Any = None,
+        stop: threading.Event | None = None,
+    ) -> tuple[dict[str, Any], str]:
+        scanner = JsonObjectScanner()
+        stream = self._client.chat(stream=True, **self._chat_kwargs(messages, format))
+        try:
+            for chunk in stream:
+                _check_cancel(stop)
+                if scanner.feed(chunk["message"]["content"]) is not None:
+                    break
+        finally:
+            # Closing the stream drops the HTTP response; Ollama aborts the generation
+            close = getattr(stream, "close", None)
+            if close is not None:
+                close()
+        if scanner.result is not None:
+            return scanner.result, scanner.text
+        return extract_json_with_fallback(scanner.text), scanner.text
+
+
+class AsyncOllamaClient(_OllamaClientBase):
+    """
+    asyncio client with the same query/extract_json contract as OllamaClient.
+
+    Backed by ollama.AsyncClient, shared per event loop so concurrent coroutines reuse one
+    bounded connection pool. Scheduler slots are awaited on the loop. Cancelling a call, or
+    exceeding its timeout, aborts the HTTP request (Ollama stops generating) and releases
+    the slot. Response cache lookups run in a worker thread.
+    """
+
+    @property
+    def _client(self) -> Any:
+        return _shared_async_client(
+            self.base_url, self.timeout, self.connect_timeout, self.pool_size
+        )
+
+    async def health(self) -> dict[str, Any]:
+        """See OllamaClient.health (shares its TTL cache)."""
+        cached = self._cached_health()
+        if cached is not None:
+            return cached
+        try:
+            tags, ps = await asyncio.gather(self._client.list(), self._client.ps())
+            result = self._health_result(tags, ps)
+        except Exception as e:
+            result = self._health_error(e)
+        return self._store_health(result)
+
+    async def warm_up(self, keep_alive: str | float | None = None) -> bool:
+        """See OllamaClient.warm_up."""
+        try:
+            await self._with_retries(
+                self._client.generate,
+                "background",
+                model=self.model,
+                prompt="",
+                keep_alive=keep_alive or self.keep_alive,
+            )
+        except Exception as e:
+            logger.warning("Ollama warm-up for %s failed: %s", self.model, e)
+            return False
+        finally:
+            self._forget_health()
+        return True
+
+    async def query(
+        self,
+        prompt: str,
+        system: str | None = None,
+        format: Any = None,
+        cache: bool = True,
+        priority: str = "normal",
+        timeout: float | None = None,
+    ) -> str:
+        """See OllamaClient.query; timeout bounds queueing plus generation (TimeoutError)."""
+        return await _wait_for(self._query(prompt, system, format, cache, priority), timeout)
+
+    async def _query(
+        self, prompt: str, system: str | None, format: Any, cache: bool, priority: str
+    ) -> str:
+        key = self._cache_key("chat", prompt, system, format) if cache else None
+        if key is not None and (text := await asyncio.to_thread(self._cache.get, key)) is not None:
+            return text
+        kwargs = self._chat_kwargs(_messages(prompt, system), format)
+        start = time.perf_counter()
+        response = await self._with_retries(self._client.chat, priority, **kwargs)
+        text = response["message"]["content"]
+        if key is not None and isinstance(text, str):
+            await asyncio.to_thread(self._cache.set, key, text, time.perf_counter() - start)
+        return text
+
+    async def _with_retries(self, fn: Any, priority: str = "normal", **kwargs: Any) -> Any:
+        """Await fn in a scheduler slot, retrying transient failures (slot freed during backoff)."""
+        for attempt in range(self.retries + 1):
             try:
-                return json.loads(json_match.group())
-            except json.JSONDecodeError:
-                pass
-        return {"raw": response}
+                async with self._scheduler.async_slot(priority):
+                    return await fn(**kwargs)
+            except Exception as e:
+                delay = self._retry_delay(attempt, e)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+
+    async def extract_json(
+        self,
+        prompt: str,
+        system: str | None = None,
+        stream: bool | None = None,
+        schema: type[BaseModel] | None = None,
+        cache: bool = True,
+        priority: str = "normal",
+        timeout: float | None = None,
+    ) -> dict[str, Any]:
+        """See OllamaClient.extract_json; timeout bounds queueing plus generation (TimeoutError)."""
+        return await _wait_for(
+            self._extract_json(prompt, system, stream, schema, cache, priority), timeout
+        )
+
+    async def _extract_json(
+        self,
+        prompt: str,
+        system: str | None,
+        stream: bool | None,
+        schema: type[BaseModel] | None,
+        cache: bool,
+        priority: str,
+    ) -> dict[str, Any]:
+        if stream is None:
+            stream = self.stream_json
+        format = ollama_format(schema) if schema is not None else None
+        key = self._cache_key("json", prompt, system, format) if cache else None
+        text = await asyncio.to_thread(self._cache.get, key) if key is not None else None
+        if text is not None:
+            return self._validate(extract_json_with_fallback(text), text, schema)
+        start = time.perf_counter()
+        if not stream:
+            text = await self._query(prompt, system, format, False, priority)
+            result = extract_json_with_fallback(text)
+        else:
+            result, text = await self._with_retries(
+                self._stream_json, priority, messages=_messages(prompt, system), format=format
+            )
+        result = self._validate(result, text, schema)
+        if key is not None and "raw" not in result:
+            await asyncio.to_thread(self._cache.set, key, text, time.perf_counter() - start)
+        return result
+
+    async def _stream_json(
+        self, messages: list[dict[str, str]], format: Any = None
+    ) -> tuple[dict[str, Any], str]:
+        scanner = JsonObjectScanner()
+        stream = await self._client.chat(stream=True, **self._chat_kwargs(messages, format))
+        try:
+            async for chunk in stream:
+                if scanner.feed(chunk["message"]["content"]) is not None:
+                    break
+        finally:
+            aclose = getattr(stream, "aclose", None)
+            if aclose is not None:
+                await aclose()
+        if scanner.result is not None:
+            return scanner.result, scanner.text
+        return extract_json_with_fallback(scanner.text), scanner.text
+
+
+async def _wait_for(awaitable: Any, timeout: float | None) -> Any:
+    """asyncio.wait_for raising the built-in TimeoutError (a distinct class before 3.11)."""
+    try:
+        return await asyncio.wait_for(awaitable, timeout)
+    except asyncio.TimeoutError:
+        raise TimeoutError(f"Ollama call did not finish within {timeout}s") from None
+
+
+def _check_cancel(cancel: threading.Event | None) -> None:
+    if cancel is not None and cancel.is_set():
+        raise CancelledError("LLM call cancelled")
+
+
+def _messages(prompt: str, system: str | None) -> list[dict[str, str]]:
+    messages = []
+    if system:
+        messages.append({"role": "system", "content": system})
+    messages.append({"role": "user", "content": prompt})
+    return messages
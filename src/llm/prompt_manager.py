@@ -1,6 +1,31 @@
-"""Load and format prompts from config files."""
+"""Load and format prompts from config files; token-budgeted prompt building."""
 
+import hashlib
+import json
+import logging
+import math
+import re
+import threading
+from collections.abc import Sequence
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Any
+
+from src.config import get_config
+
+try:
+    from tokenizers import Tokenizer
+except ImportError:
+    Tokenizer = None
+
+logger = logging.getLogger(__name__)
+
+# Where packed text may be cut: sentence / line boundaries, else between words
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?;:])\s+|\n+")
+_WORD_GAP_RE = re.compile(r"\s+")
+
+_counters: dict[str, "TokenCounter"] = {}
+_counters_lock = threading.Lock()
 
 
 def get_prompts_dir() -> Path:
@@ -20,3 +45,160 @@ def format_prompt(name: str, **kwargs: str) -> str:
     """Load and format prompt with given variables."""
     template = load_prompt(name)
     return template.format(**kwargs)
+
+
+def prompt_version(name: str) -> str:
+    """Short content hash of a prompt template and its output schema; changes when either does."""
+    from src.llm.schemas import schema_for
+
+    digest = hashlib.sha256(load_prompt(name).encode("utf-8"))
+    schema = schema_for(name)
+    if schema is not None:
+        digest.update(json.dumps(schema.model_json_schema(), sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()[:12]
+
+
+class TokenCounter:
+    """
+    Prompt token counts for one model.
+
+    Uses the model's tokenizer when llm_prompts.tokenizers maps the model to a Hugging Face
+    tokenizer (name or tokenizer.json path) and the optional `tokenizers` package is
+    installed; otherwise estimates len(text) / llm_prompts.chars_per_token, rounded up.
+    """
+
+    def __init__(self, tokenizer: str | None = None, chars_per_token: float = 3.0) -> None:
+        self.chars_per_token = chars_per_token
+        self._tokenizer = None
+        if tokenizer and Tokenizer is not None:
+            try:
+                if Path(tokenizer).is_file():
+                    self._tokenizer = Tokenizer.from_file(tokenizer)
+                else:
+                    self._tokenizer = Tokenizer.from_pretrained(tokenizer)
+            except Exception as e:
+                logger.warning("Tokenizer %s unavailable (%s); estimating tokens", tokenizer, e)
+
+    @property
+    def exact(self) -> bool:
+        """True when counts come from the model's tokenizer rather than the estimate."""
+        return self._tokenizer is not None
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        if self._tokenizer is not None:
+            return len(self._tokenizer.encode(text, add_special_tokens=False).ids)
+        return math.ceil(len(text) / self.chars_per_token)
+
+
+def get_token_counter(model: str | None = None) -> TokenCounter:
+    """Shared TokenCounter for model (default: ollama.model)."""
+    config = get_config()
+    model = model or config.get("ollama", {}).get("model", "")
+    with _counters_lock:
+        counter = _counters.get(model)
+        if counter is None:
+            prompts_config = config.get("llm_prompts", {})
+            counter = TokenCounter(
+                (prompts_config.get("tokenizers") or {}).get(model),
+                float(prompts_config.get("chars_per_token", 3.0)),
+            )
+            _counters[model] = counter
+        return counter
+
+
+def prompt_budget(name: str) -> int | None:
+    """Max prompt tokens for a prompt (llm_prompts.budgets), or None if unbudgeted."""
+    budget = get_config().get("llm_prompts", {}).get("budgets", {}).get(name)
+    return int(budget) if budget is not None else None
+
+
+# build_prompt(budget=...) default: look the budget up with prompt_budget(name)
+_CONFIG_BUDGET: Any = object()
+
+
+@dataclass
+class BuiltPrompt:
+    """A rendered prompt with its token count and the packed value of the chunked variable."""
+
+    text: str
+    tokens: int
+    packed: str = ""
+    chunks_used: int = 0
+    truncated: bool = False
+
+
+def _truncate_to_fit(text: str, fits: Any, boundary: re.Pattern = _SENTENCE_END_RE) -> str:
+    """Longest prefix of text ending at a boundary for which fits(prefix) holds."""
+    best = ""
+    for match in boundary.finditer(text):
+        prefix = text[: match.start()]
+        if not fits(prefix):
+            break
+        best = prefix
+    if not best and boundary is _SENTENCE_END_RE:
+        return _truncate_to_fit(text, fits, _WORD_GAP_RE)
+    return best
+
+
+def build_prompt(
+    name: str,
+    pack: str | None = None,
+    chunks: Sequence[str] = (),
+    budget: int | None = _CONFIG_BUDGET,
+    model: str | None = None,
+    separator: str = "\n\n",
+    **kwargs: str,
+) -> BuiltPrompt:
+    """
+    Render prompt name within a token budget (default: prompt_budget(name); None = unbudgeted).
+
+    chunks, most relevant first, fill the template variable pack: whole chunks are added while
+    the prompt fits, and the first chunk that does not fit is cut at the last sentence or line
+    boundary that does. The token count is logged so prefill cost can be tracked per prompt.
+    """
+    template = load_prompt(name)
+    counter = get_token_counter(model)
+    if budget is _CONFIG_BUDGET:
+        budget = prompt_budget(name)
+    if budget is not None and budget <= 0:
+        raise ValueError(f"Token budget for prompt {name!r} must be positive, got {budget}")
+    packed = ""
+    used = 0
+    truncated = False
+    if pack is not None:
+        overhead = counter.count(template.format(**{pack: ""}, **kwargs))
+        room = budget - overhead if budget is not None else None
+        parts: list[str] = []
+
+        def fits(candidate: str) -> bool:
+            return room is None or counter.count(separator.join([*parts, candidate])) <= room
+
+        for chunk in chunks:
+            if fits(chunk):
+                parts.append(chunk)
+                continue
+            truncated = True
+            cut = _truncate_to_fit(chunk, fits)
+            if cut:
+                parts.append(cut)
+            break
+        used = len(parts)
+        packed = separator.join(parts)
+        kwargs[pack] = packed
+    text = template.format(**kwargs)
+    tokens = counter.count(text)
+    logger.info(
+        "Prompt %s: %d tokens%s (budget %s, %d/%d chunks%s)",
+        name,
+        tokens,
+        "" if counter.exact else " (estimated)",
+        "none" if budget is None else budget,
+        used,
+        len(chunks),
+        ", truncated" if truncated else "",
+    )
+    if budget is not None and tokens > budget:
+        logger.warning("Prompt %s is %d tokens, over its %d token budget", name, tokens, budget)
+    return BuiltPrompt(text, tokens, packed=packed, chunks_used=used, truncated=truncated)
@@ -0,0 +1,96 @@
+"""Persistent cache of raw Ollama responses keyed by model, prompt, system prompt and options."""
+
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import Any
+
+from src.config import get_config
+from src.sqlite_cache import SQLiteCache
+
+_shared: dict[str, "LLMResponseCache"] = {}
+_shared_lock = threading.Lock()
+
+
+class LLMResponseCache:
+    """
+    Response text for a rendered request, shared across users and restarts.
+
+    Each entry records how long the original generation took, so hits can be reported as
+    LLM seconds saved. Entries expire after ttl_seconds; beyond max_entries the least
+    recently used are evicted.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        ttl_seconds: float | None = None,
+        max_entries: int | None = None,
+    ) -> None:
+        self._store = SQLiteCache(
+            path, table="llm_responses", ttl_seconds=ttl_seconds, max_entries=max_entries
+        )
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+
+    @classmethod
+    def from_config(cls) -> "LLMResponseCache | None":
+        """Shared cache at {cache_dir}/llm_responses.sqlite; None if llm_cache.enabled is false."""
+        config = get_config()
+        cache_config = config.get("llm_cache", {})
+        if not cache_config.get("enabled", True):
+            return None
+        path = Path(config.get("paths", {}).get("cache_dir", "data/cache"))
+        if not path.is_absolute():
+            path = Path(__file__).resolve().parent.parent.parent / path
+        path = path / "llm_responses.sqlite"
+        ttl_hours = cache_config.get("ttl_hours")
+        with _shared_lock:
+            if str(path) not in _shared:
+                _shared[str(path)] = cls(
+                    path,
+                    ttl_seconds=ttl_hours * 3600 if ttl_hours else None,
+                    max_entries=cache_config.get("max_entries"),
+                )
+            return _shared[str(path)]
+
+    @staticmethod
+    def make_key(model: str, prompt: str, system: str | None = None, **options: Any) -> str:
+        """hash(model + prompt hash + system prompt + request options such as format)."""
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        payload = json.dumps([model, prompt_hash, system, options], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> str | None:
+        """Cached response text or None."""
+        entry = self._store.get(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.saved_seconds += entry.get("seconds", 0.0)
+        return entry["text"]
+
+    def set(self, key: str, text: str, seconds: float) -> None:
+        """Store response text and how long it took to generate."""
+        self._store.set(key, {"text": text, "seconds": seconds})
+
+    def clear(self) -> None:
+        self._store.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """Hit/miss counters, hit rate, LLM seconds saved by hits and stored entries."""
+        with self._lock:
+            total = self.hits + self.misses
+            stats = {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "saved_seconds": self.saved_seconds,
+            }
+        stats["entries"] = len(self._store)
+        return stats
@@ -0,0 +1,245 @@
+"""Process-wide priority scheduler that bounds concurrent Ollama generations."""
+
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Callable
+
+from src.config import get_config
+
+# Lower rank is admitted first
+PRIORITIES = {"interactive": 0, "normal": 1, "background": 2}
+
+# Recent queue waits kept per priority for percentile metrics
+_WAIT_SAMPLES = 1000
+
+_shared: "LLMScheduler | None" = None
+_shared_lock = threading.Lock()
+
+
+class SchedulerBusyError(RuntimeError):
+    """Raised when the LLM queue is full or a request waited longer than the queue timeout."""
+
+
+def _percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class LLMScheduler:
+    """
+    Admits at most max_inflight LLM calls at a time; the rest wait in a priority queue.
+
+    A CPU-only Ollama server slows every generation when requests overlap, so interactive
+    calls (input parsing, CPT mapping) are admitted ahead of extraction and background
+    staff rewrites. Requests beyond max_queue, or waiting longer than queue_timeout, fail
+    fast with SchedulerBusyError instead of piling up.
+
+    Threads wait with acquire()/slot(); coroutines with acquire_async()/async_slot(), which
+    wait on the event loop and leave the queue when cancelled.
+    """
+
+    def __init__(
+        self,
+        max_inflight: int = 1,
+        max_queue: int | None = None,
+        queue_timeout: float | None = None,
+    ) -> None:
+        if max_inflight < 1:
+            raise ValueError("max_inflight must be at least 1")
+        self.max_inflight = max_inflight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._cond = threading.Condition()
+        self._queue: list[tuple[int, int]] = []
+        # Queue entry -> wakeup for coroutines waiting in acquire_async
+        self._wakers: dict[tuple[int, int], Callable[[], None]] = {}
+        self._seq = itertools.count()
+        self._inflight = 0
+        self._max_depth = 0
+        self._admitted = 0
+        self._rejected = 0
+        self._timed_out = 0
+        self._waits: dict[str, deque[float]] = {p: deque(maxlen=_WAIT_SAMPLES) for p in PRIORITIES}
+
+    @classmethod
+    def from_config(cls) -> "LLMScheduler":
+        """Process-wide scheduler from the llm_scheduler config section."""
+        global _shared
+        with _shared_lock:
+            if _shared is None:
+                sched_config = get_config().get("llm_scheduler", {})
+                _shared = cls(
+                    max_inflight=int(sched_config.get("max_inflight", 1)),
+                    max_queue=sched_config.get("max_queue"),
+                    queue_timeout=sched_config.get("queue_timeout_seconds"),
+                )
+            return _shared
+
+    def acquire(self, priority: str = "normal", timeout: float | None = None) -> None:
+        """Block until a slot is free and no higher-priority request is waiting."""
+        timeout = self.queue_timeout if timeout is None else timeout
+        start = time.monotonic()
+        with self._cond:
+            entry = self._enqueue(priority)
+            if entry is None:
+                return
+            try:
+                while not self._try_admit(entry, priority, start):
+                    remaining = self._remaining(timeout, start)
+                    self._cond.wait(remaining)
+            except BaseException:
+                self._dequeue(entry)
+                raise
+
+    async def acquire_async(self, priority: str = "normal", timeout: float | None = None) -> None:
+        """acquire() for coroutines; waits without blocking the event loop.
+
+        Cancellation removes the waiter from the queue.
+        """
+        timeout = self.queue_timeout if timeout is None else timeout
+        start = time.monotonic()
+        loop = asyncio.get_running_loop()
+        wakeup = asyncio.Event()
+        with self._cond:
+            entry = self._enqueue(priority)
+            if entry is None:
+                return
+            self._wakers[entry] = lambda: loop.call_soon_threadsafe(wakeup.set)
+        try:
+            while True:
+                with self._cond:
+                    if self._try_admit(entry, priority, start):
+                        return
+                    remaining = self._remaining(timeout, start)
+                    wakeup.clear()
+                try:
+                    await asyncio.wait_for(wakeup.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            with self._cond:
+                self._dequeue(entry)
+            raise
+
+    def _enqueue(self, priority: str) -> tuple[int, int] | None:
+        """Admit immediately (None) or push a queue entry. Lock held.
+
+        Raises SchedulerBusyError when the queue is full.
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority {priority!r}; expected one of {sorted(PRIORITIES)}")
+        if self._inflight < self.max_inflight and not self._queue:
+            self._admit(priority, 0.0)
+            return None
+        if self.max_queue is not None and len(self._queue) >= self.max_queue:
+            self._rejected += 1
+            raise SchedulerBusyError(
+                f"LLM queue full ({len(self._queue)} waiting); try again shortly"
+            )
+        entry = (PRIORITIES[priority], next(self._seq))
+        heapq.heappush(self._queue, entry)
+        self._max_depth = max(self._max_depth, len(self._queue))
+        return entry
+
+    def _try_admit(self, entry: tuple[int, int], priority: str, start: float) -> bool:
+        """Admit entry if it heads the queue and a slot is free. Lock held."""
+        if self._inflight >= self.max_inflight or self._queue[0] != entry:
+            return False
+        heapq.heappop(self._queue)
+        self._wakers.pop(entry, None)
+        self._admit(priority, time.monotonic() - start)
+        # Another slot may still be free for the next waiter
+        self._notify()
+        return True
+
+    def _remaining(self, timeout: float | None, start: float) -> float | None:
+        """Seconds left to wait. Lock held.
+
+        Raises SchedulerBusyError once the queue timeout has passed.
+        """
+        if timeout is None:
+            return None
+        remaining = timeout - (time.monotonic() - start)
+        if remaining <= 0:
+            self._timed_out += 1
+            raise SchedulerBusyError(f"Waited {timeout:.0f}s for an LLM slot; try again shortly")
+        return remaining
+
+    def _dequeue(self, entry: tuple[int, int]) -> None:
+        """Drop a waiter that gave up (timeout, cancellation). Lock held."""
+        if entry in self._queue:
+            self._queue.remove(entry)
+            heapq.heapify(self._queue)
+        self._wakers.pop(entry, None)
+        self._notify()
+
+    def _notify(self) -> None:
+        """Wake waiting threads and coroutines to re-check the queue head. Lock held."""
+        self._cond.notify_all()
+        for wake in self._wakers.values():
+            wake()
+
+    def _admit(self, priority: str, waited: float) -> None:
+        self._inflight += 1
+        self._admitted += 1
+        self._waits[priority].append(waited)
+
+    def release(self) -> None:
+        """Free a slot taken by acquire() or acquire_async()."""
+        with self._cond:
+            self._inflight -= 1
+            self._notify()
+
+    @contextmanager
+    def slot(self, priority: str = "normal", timeout: float | None = None) -> Iterator[None]:
+        """Hold a slot for the duration of the block."""
+        self.acquire(priority, timeout)
+        try:
+            yield
+        finally:
+            self.release()
+
+    @asynccontextmanager
+    async def async_slot(
+        self, priority: str = "normal", timeout: float | None = None
+    ) -> AsyncIterator[None]:
+        """Hold a slot for the duration of an async block (released on cancellation too)."""
+        await self.acquire_async(priority, timeout)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> dict[str, Any]:
+        """In-flight and queued counts, peak queue depth, rejections and queue waits.
+
+        Waits are reported as p50/p95 seconds per priority.
+        """
+        with self._cond:
+            ranks = {rank: name for name, rank in PRIORITIES.items()}
+            queued = {name: 0 for name in PRIORITIES}
+            for rank, _ in self._queue:
+                queued[ranks[rank]] += 1
+            waits = {name: list(samples) for name, samples in self._waits.items()}
+            return {
+                "max_inflight": self.max_inflight,
+                "inflight": self._inflight,
+                "queued": len(self._queue),
+                "queued_by_priority": queued,
+                "max_queue_depth": self._max_depth,
+                "admitted": self._admitted,
+                "rejected": self._rejected,
+                "timed_out": self._timed_out,
+                "wait_seconds": {
+                    name: {"p50": _percentile(w, 0.5), "p95": _percentile(w, 0.95)}
+                    for name, w in waits.items()
+                },
+            }
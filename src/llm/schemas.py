@@ -0,0 +1,63 @@
+"""Structured-output schemas per prompt (sent to Ollama as `format`, validated with pydantic)."""
+
+from typing import Any, Literal
+
+from pydantic import BaseModel
+
+
+class InputParse(BaseModel):
+    """input_parser: procedure and payer from a free-text query."""
+
+    procedure: str
+    payer: str = "Unknown"
+
+
+class CPTMapping(BaseModel):
+    """cpt_mapper: best CPT code for a procedure description."""
+
+    code: str
+    description: str = ""
+    confidence: Literal["high", "medium", "low"] = "low"
+
+
+class PolicyRequirements(BaseModel):
+    """policy_extractor: prior auth requirements from policy text."""
+
+    prior_auth_required: bool
+    documentation_required: list[str] = []
+    medical_necessity_criteria: list[str] = []
+    common_denial_reasons: list[str] = []
+    source_section: str = ""
+
+
+class StaffRewrite(BaseModel):
+    """staff_rewriter: requirement lists rewritten for clinic staff."""
+
+    documentation_required: list[str] = []
+    medical_necessity_criteria: list[str] = []
+    common_denial_reasons: list[str] = []
+
+
+PROMPT_SCHEMAS: dict[str, type[BaseModel]] = {
+    "input_parser": InputParse,
+    "cpt_mapper": CPTMapping,
+    "policy_extractor": PolicyRequirements,
+    "staff_rewriter": StaffRewrite,
+}
+
+
+def schema_for(prompt_name: str) -> type[BaseModel] | None:
+    """Output schema for a prompt, or None if it has none."""
+    return PROMPT_SCHEMAS.get(prompt_name)
+
+
+def ollama_format(schema: type[BaseModel]) -> dict[str, Any]:
+    """
+    JSON schema for Ollama's `format` parameter.
+
+    Every property is marked required so the constrained decoder always emits it; pydantic
+    defaults still apply when validating output from other sources.
+    """
+    json_schema = schema.model_json_schema()
+    json_schema["required"] = list(json_schema.get("properties", {}))
+    return json_schema
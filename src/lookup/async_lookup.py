@@ -0,0 +1,260 @@
+"""Asyncio lookup pipeline: async variants of CPTLookup and PolicyLookup.
+
+LLM calls are awaited (natively for clients whose extract_json is a coroutine, such as
+src.llm.ollama_client.AsyncOllamaClient, otherwise on a worker thread); file, cache and
+vector-store work runs in an executor. Results match the sync classes, which these wrap and
+share all retrieval/parsing logic with.
+"""
+
+import asyncio
+import functools
+import inspect
+import logging
+import threading
+from concurrent.futures import Executor
+from typing import Any, Callable
+
+from src.llm.schemas import CPTMapping, InputParse, PolicyRequirements, StaffRewrite
+from src.lookup.cpt_lookup import CPTLookup, _keyword_match_ok, _speculation_config
+from src.lookup.deadline import Deadline, DeadlineExceededError, accepts_cancel
+from src.lookup.policy_lookup import (
+    PolicyLookup,
+    _cms_live_rewrite,
+    _default_requirements,
+    _finish_staff_rewrite,
+    _has_requirement_content,
+    _lookup_identity,
+    _mark_uncacheable,
+    _merge_staff_rewrite,
+    _prepare_staff_rewrite,
+    _Retrieved,
+)
+
+logger = logging.getLogger(__name__)
+
+
+async def _await_llm(
+    client: Any, prompt: str, deadline: Deadline | None = None, step: str = "llm", **kwargs: Any
+) -> dict[str, Any]:
+    """
+    Await client.extract_json (coroutine or blocking) within deadline.
+
+    A blocking call runs on a worker thread that cancellation cannot interrupt; if it takes
+    cancel= it is signalled when this coroutine is cancelled or the deadline cuts it.
+    """
+    extract = client.extract_json
+    if inspect.iscoroutinefunction(extract):
+        return await (deadline or Deadline()).run_async(step, extract(prompt, **kwargs))
+    cancel = threading.Event()
+    if accepts_cancel(extract):
+        kwargs["cancel"] = cancel
+    try:
+        call = asyncio.to_thread(extract, prompt, **kwargs)
+        return await (deadline or Deadline()).run_async(step, call)
+    except BaseException:
+        cancel.set()
+        raise
+
+
+async def parse_input_async(query: str, client: Any) -> tuple[str, str]:
+    """Async parse of procedure and payer from a query (see streamlit_app.parse_input_with_llm)."""
+    from src.llm.prompt_manager import format_prompt
+    prompt = format_prompt("input_parser", query=query)
+    result = await _await_llm(
+        client, prompt, step="input_parse", schema=InputParse, priority="interactive"
+    )
+    return result.get("procedure", query), result.get("payer", "Unknown")
+
+
+class AsyncCPTLookup:
+    """Async CPTLookup: keyword matching inline, LLM fallback awaited."""
+
+    def __init__(self, cpt_lookup: CPTLookup | None = None) -> None:
+        self.sync = cpt_lookup or CPTLookup()
+
+    def find_code(self, procedure: str) -> dict[str, Any]:
+        """Keyword match (CPU only, no I/O)."""
+        return self.sync.find_code(procedure)
+
+    async def find_code_with_llm(
+        self, procedure: str, ollama_client: Any = None, speculative: bool | None = None
+    ) -> dict[str, Any]:
+        """Same contract as CPTLookup.find_code_with_llm (including speculative mode)."""
+        if speculative is None:
+            speculative = _speculation_config()[0]
+        speculate = speculative and self.sync.looks_ambiguous(procedure)
+        r = None if speculate else self.sync.find_code(procedure)
+        if r is not None and _keyword_match_ok(r):
+            return r
+        if ollama_client is None:
+            try:
+                from src.llm.ollama_client import AsyncOllamaClient
+                ollama_client = AsyncOllamaClient()
+            except ImportError:
+                return r if r is not None else self.sync.find_code(procedure)
+        if r is None:
+            return await self._find_code_speculative(procedure, ollama_client)
+        prompt = self.sync._llm_mapping_prompt(procedure)
+        out = await _await_llm(
+            ollama_client, prompt, step="cpt_mapping", schema=CPTMapping, priority="interactive"
+        )
+        return self.sync._resolve_llm_mapping(out, r)
+
+    async def _find_code_speculative(self, procedure: str, ollama_client: Any) -> dict[str, Any]:
+        """Keyword match on a worker thread while the LLM mapping task queues and generates."""
+        prompt = self.sync._llm_mapping_prompt(procedure)
+        task = asyncio.create_task(
+            _await_llm(
+                ollama_client, prompt, step="cpt_mapping", schema=CPTMapping, priority="interactive"
+            )
+        )
+        try:
+            r = await asyncio.to_thread(self.sync.find_code, procedure)
+            if not _keyword_match_ok(r):
+                return self.sync._resolve_llm_mapping(await task, r)
+        finally:
+            if not task.done():
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+        return r
+
+
+class AsyncPolicyLookup:
+    """
+    Async PolicyLookup with the same routing, caching, deadline and tier semantics.
+
+    Many lookups can be in flight in one process: each waits on Ollama without holding a
+    thread (for async clients) and blocking source work is bounded by the executor.
+    """
+
+    def __init__(
+        self, policy_lookup: PolicyLookup | None = None, executor: Executor | None = None
+    ) -> None:
+        self.sync = policy_lookup or PolicyLookup()
+        self._executor = executor
+
+    async def _run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+
+    async def get_requirements(
+        self,
+        cpt_code: str,
+        payer: str,
+        ollama_client: Any = None,
+        deadline_seconds: float | None = None,
+    ) -> dict[str, Any]:
+        """Async PolicyLookup.get_requirements."""
+        request = await self._run(
+            self.sync._begin_request, cpt_code, payer, ollama_client, deadline_seconds
+        )
+        if request.cached is not None:
+            return request.cached
+        deadline = request.deadline
+        result = None
+        if request.source_config:
+            retrieved = await self._run(
+                self.sync._retrieve_source,
+                request.source_config,
+                cpt_code,
+                request.canonical_payer,
+                deadline,
+            )
+            result = await self._resolve(retrieved, cpt_code, ollama_client, deadline)
+            if result and (request.source_config.get("type") != "cms_api" or _cms_live_rewrite()):
+                result = await self._maybe_rewrite_for_staff(result, ollama_client, deadline)
+        if not result:
+            retrieved = await self._run(
+                self.sync._retrieve_generic, cpt_code, payer, deadline, ollama_client is not None
+            )
+            result = await self._resolve(retrieved, cpt_code, ollama_client, deadline)
+            if result:
+                result = await self._maybe_rewrite_for_staff(result, ollama_client, deadline)
+        if not result:
+            result = _default_requirements()
+        return await self._run(self.sync._finish_request, request, result)
+
+    async def get_requirements_many(
+        self,
+        cpt_code: str,
+        payers: list[str],
+        ollama_client: Any = None,
+        deadline_seconds: float | None = None,
+    ) -> dict[str, dict[str, Any]]:
+        """Async PolicyLookup.get_requirements_many (one task per canonical payer)."""
+        unique: dict[str, str] = {}
+        for payer in payers:
+            unique.setdefault(_lookup_identity(payer), payer)
+
+        async def _one(payer: str) -> dict[str, Any]:
+            try:
+                return await self.get_requirements(cpt_code, payer, ollama_client, deadline_seconds)
+            except Exception:
+                logger.exception("Requirements lookup failed for payer %s", payer)
+                return _default_requirements()
+
+        results = await asyncio.gather(*(_one(p) for p in unique.values()))
+        by_canonical = dict(zip(unique, results))
+        return {payer: dict(by_canonical[_lookup_identity(payer)]) for payer in payers}
+
+    async def _resolve(
+        self,
+        retrieved: _Retrieved | None,
+        cpt_code: str,
+        ollama_client: Any,
+        deadline: Deadline,
+    ) -> dict[str, Any] | None:
+        """Async PolicyLookup._resolve_retrieved."""
+        if retrieved is None:
+            return None
+        if retrieved.requirements is not None:
+            return retrieved.requirements
+        if ollama_client and retrieved.policy_chunks:
+            try:
+                chunks = retrieved.policy_chunks
+                return await self._extract_with_llm(chunks, cpt_code, ollama_client, deadline)
+            except DeadlineExceededError:
+                return self.sync._parse_chunk_to_requirements(retrieved.chunk or {}, cpt_code)
+        if retrieved.llm_only or retrieved.chunk is None:
+            return None
+        return self.sync._parse_chunk_to_requirements(retrieved.chunk, cpt_code)
+
+    async def _extract_with_llm(
+        self, policy_text: str | list[str], cpt_code: str, ollama_client: Any, deadline: Deadline
+    ) -> dict[str, Any]:
+        memoized, prompt, memo_key = await self._run(
+            self.sync._prepare_extraction, policy_text, cpt_code, ollama_client
+        )
+        if memoized is not None:
+            return memoized
+        result = await _await_llm(
+            ollama_client, prompt, deadline, "llm_extract", schema=PolicyRequirements
+        )
+        return await self._run(self.sync._finish_extraction, result, memo_key)
+
+    async def _maybe_rewrite_for_staff(
+        self, result: dict[str, Any], ollama_client: Any, deadline: Deadline
+    ) -> dict[str, Any]:
+        if ollama_client is None or not _has_requirement_content(result):
+            return result
+        memo = self.sync.llm_memo
+        try:
+            memoized, prompt, memo_key = await self._run(
+                _prepare_staff_rewrite, result, ollama_client, memo
+            )
+            if memoized is not None:
+                rewritten = _finish_staff_rewrite(memoized, None, None)
+            else:
+                out = await _await_llm(
+                    ollama_client,
+                    prompt,
+                    deadline,
+                    "staff_rewrite",
+                    schema=StaffRewrite,
+                    priority="background",
+                )
+                rewritten = await self._run(_finish_staff_rewrite, out, memo_key, memo)
+        except Exception:
+            return _mark_uncacheable(result)
+        return _merge_staff_rewrite(result, rewritten)
+
@@ -1,11 +1,26 @@
 """CMS Medicare Coverage Database policy lookup via cached API data."""
 
+import hashlib
 import json
 from pathlib import Path
 from typing import Any
 
 from src.config import get_config
 
+# Cache entry key holding precomputed staff-friendly bullets (scripts/precompute_staff_rewrites.py)
+STAFF_REWRITE_KEY = "staff_rewrite"
+REQUIREMENT_LIST_KEYS = (
+    "documentation_required",
+    "medical_necessity_criteria",
+    "common_denial_reasons",
+)
+
+
+def requirements_hash(entry: dict[str, Any]) -> str:
+    """Hash of the raw requirement bullets; identifies the bullets a staff rewrite came from."""
+    sub = {k: entry.get(k, []) for k in REQUIREMENT_LIST_KEYS}
+    return hashlib.sha256(json.dumps(sub, sort_keys=True).encode("utf-8")).hexdigest()
+
 
 class CMSPolicyLookup:
     """Look up Medicare coverage requirements from CMS MCD cache."""
@@ -39,14 +54,15 @@ class CMSPolicyLookup:
         """
         Get PA requirements for CPT code from CMS cache.
 
-        Returns requirements dict if found, None otherwise.
+        Returns requirements dict if found, None otherwise. When the entry carries a precomputed
+        staff rewrite made from its current bullets, the staff-friendly bullets are returned.
         """
         cpt_clean = str(cpt_code).strip()
         if cpt_clean not in self._cache:
             return None
         entry = self._cache[cpt_clean]
         if isinstance(entry, dict) and "prior_auth_required" in entry:
-            return entry
+            return _apply_staff_rewrite(entry)
         return self._map_entry_to_requirements(cpt_clean, entry)
 
     def _map_entry_to_requirements(self, cpt_code: str, entry: Any) -> dict[str, Any]:
@@ -66,3 +82,14 @@ class CMSPolicyLookup:
             "common_denial_reasons": ["Criteria not met"],
             "source_section": "CMS MCD",
         }
+
+
+def _apply_staff_rewrite(entry: dict[str, Any]) -> dict[str, Any]:
+    """Copy of entry with precomputed staff bullets applied (if still matching the raw bullets)."""
+    result = {k: v for k, v in entry.items() if k != STAFF_REWRITE_KEY}
+    staff = entry.get(STAFF_REWRITE_KEY)
+    if isinstance(staff, dict) and staff.get("source_hash") == requirements_hash(entry):
+        for key in REQUIREMENT_LIST_KEYS:
+            if staff.get(key):
+                result[key] = staff[key]
+    return result
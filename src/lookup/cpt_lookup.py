@@ -1,11 +1,16 @@
 """CPT code lookup."""
 
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any
 
 from src.config import get_config
+from src.lookup.deadline import accepts_cancel
 
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
 
 # Body-part alignment: procedure terms -> description/keyword terms that indicate a match.
 # E.g. "knee" in query should strongly prefer codes with "lower extremity" / "joint".
@@ -21,6 +26,30 @@ BODY_PART_ALIGNMENT: dict[str, list[str]] = {
 }
 
 
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            workers = int(get_config().get("cpt_lookup", {}).get("speculative_workers", 4))
+            _executor = ThreadPoolExecutor(
+                max_workers=max(1, workers), thread_name_prefix="cpt-speculative"
+            )
+        return _executor
+
+
+def _keyword_match_ok(result: dict[str, Any]) -> bool:
+    """Keyword result good enough to skip the LLM."""
+    return bool(result["code"]) and result["confidence"] in ("high", "medium")
+
+
+def _speculation_config() -> tuple[bool, int]:
+    cpt_config = get_config().get("cpt_lookup", {})
+    return (
+        bool(cpt_config.get("speculative_llm", False)),
+        int(cpt_config.get("speculative_min_hits", 2)),
+    )
+
+
 class CPTLookup:
     """Map procedure description to CPT code."""
 
@@ -139,28 +168,92 @@ class CPTLookup:
         lines = [f"{c}: {i.get('description', '')}" for c, i in candidates[:max_codes]]
         return "\n".join(lines)
 
-    def find_code_with_llm(self, procedure: str, ollama_client: Any = None) -> dict[str, Any]:
-        """LLM fallback when keyword match fails or confidence low; uses cpt_mapper prompt with filtered CMS codes."""
+    def looks_ambiguous(self, procedure: str, min_hits: int | None = None) -> bool:
+        """Cheap pre-check: fewer than min_hits query words appear in the keyword index."""
+        if min_hits is None:
+            min_hits = _speculation_config()[1]
+        hits = sum(1 for word in procedure.lower().split() if word.strip(".,;") in self._index)
+        return hits < min_hits
+
+    def find_code_with_llm(
+        self, procedure: str, ollama_client: Any = None, speculative: bool | None = None
+    ) -> dict[str, Any]:
+        """
+        LLM fallback when keyword match fails or confidence is low (cpt_mapper, filtered CMS codes).
+
+        With speculative (default: cpt_lookup.speculative_llm) an ambiguous query starts the LLM
+        mapping before keyword matching instead of after it. If the keyword result is good enough
+        the LLM call is cancelled (dropped from the scheduler queue, or its stream closed);
+        otherwise it is awaited, already under way. Results are the same as sequential mode.
+        Clients whose extract_json takes no cancel= keyword always run sequentially.
+        """
+        if speculative is None:
+            speculative = _speculation_config()[0]
+        speculate = speculative and self.looks_ambiguous(procedure)
+        if speculate and ollama_client is None:
+            ollama_client = _default_llm_client()
+        if speculate and ollama_client is not None and accepts_cancel(ollama_client.extract_json):
+            return self._find_code_speculative(procedure, ollama_client)
         r = self.find_code(procedure)
-        if r["code"] and r["confidence"] in ("high", "medium"):
+        if _keyword_match_ok(r):
             return r
         if ollama_client is None:
-            try:
-                from src.llm.ollama_client import OllamaClient
-                ollama_client = OllamaClient()
-            except ImportError:
+            ollama_client = _default_llm_client()
+            if ollama_client is None:
                 return r
+        from src.llm.schemas import CPTMapping
+        out = ollama_client.extract_json(
+            self._llm_mapping_prompt(procedure), schema=CPTMapping, priority="interactive"
+        )
+        return self._resolve_llm_mapping(out, r)
+
+    def _find_code_speculative(self, procedure: str, ollama_client: Any) -> dict[str, Any]:
+        """Keyword match while the LLM mapping runs on a worker thread."""
+        from src.llm.schemas import CPTMapping
+        cancel = threading.Event()
+        future = _get_executor().submit(
+            ollama_client.extract_json,
+            self._llm_mapping_prompt(procedure),
+            schema=CPTMapping,
+            priority="interactive",
+            cancel=cancel,
+        )
+        r = self.find_code(procedure)
+        if _keyword_match_ok(r):
+            cancel.set()
+            future.cancel()
+            return r
+        return self._resolve_llm_mapping(future.result(), r)
+
+    def _llm_mapping_prompt(self, procedure: str) -> str:
+        """cpt_mapper prompt with the filtered CMS code list (inline fallback if prompt missing)."""
         try:
             from src.llm.prompt_manager import format_prompt
             cpt_list = self._cpt_list_for_llm(procedure)
-            prompt = format_prompt("cpt_mapper", procedure=procedure, cpt_list=cpt_list)
+            return format_prompt("cpt_mapper", procedure=procedure, cpt_list=cpt_list)
         except FileNotFoundError:
             cpt_list = "\n".join(f"{c}: {i.get('description','')}" for c, i in list(self.cpt_codes.items())[:80])
-            prompt = f'Map to CPT: "{procedure}"\n{cpt_list}\nJSON: {{"code":"XXX","description":"...","confidence":"high"}}'
-        out = ollama_client.extract_json(prompt)
+            return (
+                f'Map to CPT: "{procedure}"\n{cpt_list}\n'
+                'JSON: {"code":"XXX","description":"...","confidence":"high"}'
+            )
+
+    def _resolve_llm_mapping(
+        self, out: dict[str, Any], keyword_result: dict[str, Any]
+    ) -> dict[str, Any]:
+        """Accept the LLM's code only if it is known and allowed; else keep the keyword result."""
         allowed = self._allowed_codes()
         if out.get("code"):
             c = str(out["code"]).strip()
             if c in self.cpt_codes and (not allowed or c in allowed):
                 return {"code": c, "description": self.cpt_codes[c].get("description", ""), "match": "llm", "confidence": out.get("confidence", "medium")}
-        return r
+        return keyword_result
+
+
+def _default_llm_client() -> Any:
+    """OllamaClient, or None if the ollama package is not installed."""
+    try:
+        from src.llm.ollama_client import OllamaClient
+        return OllamaClient()
+    except ImportError:
+        return None
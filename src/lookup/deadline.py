@@ -0,0 +1,105 @@
+"""Per-request latency budget for policy lookups."""
+
+import asyncio
+import inspect
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Any, Awaitable, Callable
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+class DeadlineExceededError(TimeoutError):
+    """Raised when a lookup step does not finish within the remaining budget."""
+
+
+def accepts_cancel(fn: Callable[..., Any]) -> bool:
+    """True if fn takes a cancel= keyword (e.g. OllamaClient.extract_json)."""
+    try:
+        params = inspect.signature(fn).parameters.values()
+    except (TypeError, ValueError):
+        return False
+    return any(p.name == "cancel" or p.kind is inspect.Parameter.VAR_KEYWORD for p in params)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="lookup-deadline")
+        return _executor
+
+
+class Deadline:
+    """
+    Latency budget shared by all steps of one lookup.
+
+    Steps run through run(); once the budget is spent a step raises DeadlineExceededError and
+    is recorded in cut_steps so the caller can degrade (and report that it did). A Deadline
+    with seconds=None is unlimited and runs steps inline.
+    """
+
+    def __init__(self, seconds: float | None = None) -> None:
+        self.expires_at = time.monotonic() + seconds if seconds is not None else None
+        self.cut_steps: list[str] = []
+
+    def remaining(self) -> float | None:
+        """Seconds left (may be negative), or None if unlimited."""
+        if self.expires_at is None:
+            return None
+        return self.expires_at - time.monotonic()
+
+    def expired(self) -> bool:
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    @property
+    def degraded(self) -> bool:
+        """True if any step was cut by the budget."""
+        return bool(self.cut_steps)
+
+    def run(self, step: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run fn within the remaining budget.
+
+        If fn takes a cancel= keyword it gets a threading.Event that is set when the budget
+        runs out, so an LLM call stops generating and frees its scheduler slot. Other steps
+        that overrun keep running in the background worker until they return on their own;
+        the caller just stops waiting for them.
+        """
+        remaining = self.remaining()
+        if remaining is None:
+            return fn(*args, **kwargs)
+        if remaining <= 0:
+            self.cut_steps.append(step)
+            raise DeadlineExceededError(step)
+        cancel = threading.Event()
+        if accepts_cancel(fn):
+            kwargs["cancel"] = cancel
+        future = _get_executor().submit(fn, *args, **kwargs)
+        try:
+            return future.result(timeout=remaining)
+        except FutureTimeout:
+            cancel.set()
+            future.cancel()
+            self.cut_steps.append(step)
+            raise DeadlineExceededError(step) from None
+
+    async def run_async(self, step: str, awaitable: Awaitable[Any]) -> Any:
+        """Await within the remaining budget; the awaitable is cancelled once it runs out."""
+        remaining = self.remaining()
+        if remaining is None:
+            return await awaitable
+        if remaining <= 0:
+            if asyncio.iscoroutine(awaitable):
+                awaitable.close()
+            self.cut_steps.append(step)
+            raise DeadlineExceededError(step)
+        try:
+            return await asyncio.wait_for(awaitable, timeout=remaining)
+        except asyncio.TimeoutError:
+            self.cut_steps.append(step)
+            raise DeadlineExceededError(step) from None
@@ -0,0 +1,129 @@
+"""Persistent embedding cache keyed by embedding model and chunk-text hash."""
+
+import hashlib
+import sqlite3
+import threading
+from array import array
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Sequence
+
+from src.config import get_config
+
+# SQLite limits bound parameters per statement; look keys up in slices of this size.
+_LOOKUP_SLICE = 500
+
+
+def text_hash(text: str) -> str:
+    """sha256 of the text that is embedded."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    float32 embeddings on a local SQLite file, keyed by (model, text hash).
+
+    Rebuilding a collection or re-running a query then reuses vectors instead of running the
+    embedding model again. Vectors are stored as raw float32 blobs.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "model TEXT NOT NULL, text_hash TEXT NOT NULL, dim INTEGER NOT NULL, "
+                "vector BLOB NOT NULL, PRIMARY KEY (model, text_hash))"
+            )
+
+    @classmethod
+    def from_config(cls) -> "EmbeddingCache | None":
+        """Cache at {cache_dir}/embeddings.sqlite; None if vector_store.embedding_cache is false."""
+        config = get_config()
+        if not config.get("vector_store", {}).get("embedding_cache", True):
+            return None
+        path = Path(config.get("paths", {}).get("cache_dir", "data/cache"))
+        if not path.is_absolute():
+            path = Path(__file__).resolve().parent.parent.parent / path
+        return cls(path / "embeddings.sqlite")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Short-lived connection; commits on success and always closes."""
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get_many(self, model: str, hashes: Sequence[str]) -> dict[str, list[float]]:
+        """text hash -> vector for the hashes that are cached."""
+        found: dict[str, list[float]] = {}
+        unique = list(dict.fromkeys(hashes))
+        with self._lock, self._connect() as conn:
+            for start in range(0, len(unique), _LOOKUP_SLICE):
+                part = unique[start : start + _LOOKUP_SLICE]
+                marks = ",".join("?" * len(part))
+                rows = conn.execute(
+                    "SELECT text_hash, vector FROM embeddings"
+                    f" WHERE model = ? AND text_hash IN ({marks})",
+                    (model, *part),
+                )
+                for h, blob in rows:
+                    vec = array("f")
+                    vec.frombytes(blob)
+                    found[h] = vec.tolist()
+        return found
+
+    def set_many(self, model: str, items: dict[str, Sequence[float]]) -> None:
+        """Store vectors by text hash (overwrites)."""
+        rows = [(model, h, len(v), array("f", v).tobytes()) for h, v in items.items()]
+        if not rows:
+            return
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, dim, vector)"
+                " VALUES (?, ?, ?, ?)",
+                rows,
+            )
+
+    def embed(
+        self, model: str, texts: Sequence[str], embed_fn: Callable[[list[str]], Any]
+    ) -> list[list[float]]:
+        """Embeddings for texts; only cache misses are passed (once each) to embed_fn."""
+        hashes = [text_hash(t) for t in texts]
+        cached = self.get_many(model, hashes)
+        missing: dict[str, str] = {}
+        for h, t in zip(hashes, texts):
+            if h not in cached:
+                missing.setdefault(h, t)
+        if missing:
+            computed = embed_fn(list(missing.values()))
+            fresh = {h: [float(x) for x in vec] for h, vec in zip(missing, computed)}
+            self.set_many(model, fresh)
+            cached.update(fresh)
+        with self._lock:
+            self.misses += len(missing)
+            self.hits += len(texts) - len(missing)
+        return [cached[h] for h in hashes]
+
+    def stats(self) -> dict[str, Any]:
+        """Hit/miss counters (per text) and hit rate."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+    def __len__(self) -> int:
+        with self._lock, self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
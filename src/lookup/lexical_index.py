@@ -0,0 +1,194 @@
+"""BM25 lexical index over policy chunks, kept next to the vector store."""
+
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Any
+
+LEXICAL_INDEX_VERSION = 1
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase alphanumeric tokens; CPT/HCPCS codes survive as single tokens."""
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+def matches_where(meta: dict[str, Any], where: dict[str, Any] | None) -> bool:
+    """
+    Evaluate a Chroma-style metadata filter against one metadata dict.
+
+    Supports {key: value}, {key: {"$eq"|"$ne"|"$in"|"$nin": ...}}, "$and" and "$or"; other
+    operators raise ValueError (as NumpyBackend does) rather than being ignored.
+    """
+    if not where:
+        return True
+    for key, cond in where.items():
+        if key == "$and":
+            if not all(matches_where(meta, c) for c in cond):
+                return False
+        elif key == "$or":
+            if not any(matches_where(meta, c) for c in cond):
+                return False
+        elif key.startswith("$"):
+            raise ValueError(f"Unsupported where operator: {key}")
+        elif isinstance(cond, dict):
+            value = meta.get(key)
+            for op, operand in cond.items():
+                if op == "$eq":
+                    matched = value == operand
+                elif op == "$ne":
+                    matched = value != operand
+                elif op == "$in":
+                    matched = value in operand
+                elif op == "$nin":
+                    matched = value not in operand
+                else:
+                    raise ValueError(f"Unsupported where operator: {op}")
+                if not matched:
+                    return False
+        elif meta.get(key) != cond:
+            return False
+    return True
+
+
+class BM25Index:
+    """
+    Okapi BM25 over chunk text with per-chunk metadata for filtering.
+
+    Exact tokens such as five-digit CPT codes score strongly here, which embeddings do not.
+    Persisted as JSON; document frequencies are rebuilt on load.
+    """
+
+    def __init__(self, path: str | Path | None = None, k1: float = 1.5, b: float = 0.75) -> None:
+        self.path = Path(path) if path else None
+        self.k1 = k1
+        self.b = b
+        self._docs: dict[str, dict[str, Any]] = {}
+        self._df: Counter[str] = Counter()
+        self._total_len = 0
+        self._lock = threading.Lock()
+        if self.path is not None and self.path.exists():
+            self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+        if data.get("version") != LEXICAL_INDEX_VERSION:
+            return
+        for doc_id, doc in data.get("docs", {}).items():
+            self._insert(doc_id, doc["tf"], doc["len"], doc.get("metadata", {}))
+
+    def reload(self) -> None:
+        """Re-read the persisted index (after another process rewrote it)."""
+        with self._lock:
+            self._docs.clear()
+            self._df.clear()
+            self._total_len = 0
+            if self.path is not None and self.path.exists():
+                self._load()
+
+    def exists(self) -> bool:
+        """True if the index has been persisted."""
+        return self.path is not None and self.path.exists()
+
+    def save(self) -> None:
+        """Write the index atomically (temp file + replace)."""
+        if self.path is None:
+            return
+        with self._lock:
+            payload = {"version": LEXICAL_INDEX_VERSION, "docs": self._docs}
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(payload, f)
+            os.replace(tmp, self.path)
+
+    def _insert(
+        self, doc_id: str, tf: dict[str, int], length: int, metadata: dict[str, Any]
+    ) -> None:
+        self._docs[doc_id] = {"tf": tf, "len": length, "metadata": metadata}
+        self._df.update(tf.keys())
+        self._total_len += length
+
+    def _drop(self, doc_id: str) -> None:
+        doc = self._docs.pop(doc_id, None)
+        if doc is None:
+            return
+        self._df.subtract(doc["tf"].keys())
+        self._total_len -= doc["len"]
+
+    def add(
+        self, ids: list[str], texts: list[str], metadatas: list[dict[str, Any]] | None = None
+    ) -> None:
+        """Add or replace documents."""
+        metadatas = metadatas or [{}] * len(ids)
+        with self._lock:
+            for doc_id, text, meta in zip(ids, texts, metadatas):
+                self._drop(doc_id)
+                toks = tokenize(text)
+                self._insert(doc_id, dict(Counter(toks)), len(toks), dict(meta or {}))
+            self._df = +self._df
+
+    def remove(self, ids: list[str]) -> None:
+        """Remove documents by id."""
+        with self._lock:
+            for doc_id in ids:
+                self._drop(doc_id)
+            self._df = +self._df
+
+    def clear(self) -> None:
+        with self._lock:
+            self._docs.clear()
+            self._df.clear()
+            self._total_len = 0
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def search(
+        self, query: str, n_results: int = 5, where: dict[str, Any] | None = None
+    ) -> list[tuple[str, float]]:
+        """Top (id, score) pairs for query among documents matching where."""
+        terms = set(tokenize(query))
+        with self._lock:
+            n_docs = len(self._docs)
+            if not n_docs or not terms:
+                return []
+            avgdl = self._total_len / n_docs or 1.0
+            idf = {
+                t: math.log(1 + (n_docs - self._df[t] + 0.5) / (self._df[t] + 0.5))
+                for t in terms
+                if self._df.get(t)
+            }
+            scored = []
+            for doc_id, doc in self._docs.items():
+                tf = doc["tf"]
+                if not any(t in tf for t in idf):
+                    continue
+                if not matches_where(doc["metadata"], where):
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * doc["len"] / avgdl)
+                score = sum(
+                    idf[t] * tf[t] * (self.k1 + 1) / (tf[t] + norm) for t in idf if t in tf
+                )
+                scored.append((doc_id, score))
+        scored.sort(key=lambda x: -x[1])
+        return scored[:n_results]
+
+
+def reciprocal_rank_fusion(rankings: list[list[str]], k: int = 60) -> list[tuple[str, float]]:
+    """Fuse ranked id lists: score(id) = sum 1 / (k + rank). Highest first."""
+    scores: dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, 1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda x: -x[1])
@@ -1,22 +1,186 @@
 """Payer name normalization via config-driven aliases."""
 
+import re
+import threading
+from dataclasses import dataclass
+from typing import Any
+
 from src.config import get_config
 
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_END = "\0"
+
+# Fuzzy matching (one edit) only for tokens this long; "mac", "uhc" are too ambiguous.
+_FUZZY_MIN_LEN = 5
+_FUZZY_CONFIDENCE = 0.5
+
+_resolver: "PayerResolver | None" = None
+_resolver_key: tuple | None = None
+_resolver_lock = threading.Lock()
+
+
+def _tokens(text: str) -> tuple[str, ...]:
+    """Lowercase alphanumeric tokens ("Blue_Cross of TX" -> ("blue", "cross", "of", "tx"))."""
+    return tuple(_TOKEN_RE.findall(text.lower()))
+
+
+def _within_distance(a: str, b: str, limit: int) -> bool:
+    """True if Levenshtein distance(a, b) <= limit (banded DP, early exit)."""
+    if abs(len(a) - len(b)) > limit:
+        return False
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb))
+        if min(cur) > limit:
+            return False
+        prev = cur
+    return prev[-1] <= limit
+
+
+@dataclass(frozen=True)
+class PayerMatch:
+    """Resolved payer: canonical name, confidence in [0, 1] and the alias that matched."""
+
+    canonical: str
+    confidence: float
+    matched_alias: str
+
+
+class PayerResolver:
+    """
+    Payer resolver compiled once from payer_aliases and policy_sources.
+
+    Lookup order: exact alias (whole input), longest alias contained in the input (token trie),
+    then a one-edit match per long token for typos. Among equally long contained aliases a
+    specific carrier beats a generic program payer ("UHC Medicare Advantage" and "Medicare
+    Advantage UHC" are both UnitedHealthcare). Fuzzy matching never maps a denylisted near-miss
+    word onto a payer ("medicaid" is not a typo of "medicare").
+    """
+
+    def __init__(
+        self,
+        aliases: dict[str, str],
+        canonical_names: list[str] | None = None,
+        generic_payers: list[str] | None = None,
+        fuzzy_denylist: list[list[str]] | None = None,
+    ) -> None:
+        self._exact: dict[str, str] = {}
+        self._trie: dict[str, Any] = {}
+        self._fuzzy: dict[str, str] = {}
+        self._generic = set(generic_payers or [])
+        self._near_miss = {frozenset(t.lower() for t in pair) for pair in fuzzy_denylist or []}
+        for name in canonical_names or []:
+            self._add(name, name)
+        for alias, canonical in aliases.items():
+            self._add(str(alias), str(canonical))
+            self._add(str(canonical), str(canonical))
+
+    def _add(self, alias: str, canonical: str) -> None:
+        toks = _tokens(alias)
+        if not toks:
+            return
+        for key in (" ".join(toks), "".join(toks)):
+            self._exact.setdefault(key, canonical)
+        node = self._trie
+        for tok in toks:
+            node = node.setdefault(tok, {})
+        node.setdefault(_END, (canonical, " ".join(toks)))
+        if len(toks) == 1 and len(toks[0]) >= _FUZZY_MIN_LEN:
+            self._fuzzy.setdefault(toks[0], canonical)
+        compact = "".join(toks)
+        if len(toks) > 1:
+            self._trie.setdefault(compact, {}).setdefault(_END, (canonical, compact))
+
+    def resolve(self, text: str) -> PayerMatch | None:
+        """Best match for free-text payer input, or None if nothing plausible."""
+        toks = _tokens(text or "")
+        if not toks:
+            return None
+        for key in (" ".join(toks), "".join(toks)):
+            if key in self._exact:
+                return PayerMatch(self._exact[key], 1.0, key)
+
+        # (-tokens, generic program, -alias length, start, canonical, alias): longest, most specific
+        best: tuple[int, bool, int, int, str, str] | None = None
+        for start in range(len(toks)):
+            node = self._trie
+            for end in range(start, len(toks)):
+                node = node.get(toks[end])
+                if node is None:
+                    break
+                if _END in node:
+                    canonical, alias = node[_END]
+                    candidate = (
+                        -(end - start + 1),
+                        canonical in self._generic,
+                        -len(alias),
+                        start,
+                        canonical,
+                        alias,
+                    )
+                    if best is None or candidate < best:
+                        best = candidate
+        if best is not None:
+            coverage = -best[0] / len(toks)
+            return PayerMatch(best[4], round(0.6 + 0.3 * coverage, 3), best[5])
+
+        for tok in sorted(toks, key=len, reverse=True):
+            if len(tok) < _FUZZY_MIN_LEN:
+                continue
+            for alias, canonical in self._fuzzy.items():
+                if frozenset((tok, alias)) in self._near_miss:
+                    continue
+                if _within_distance(tok, alias, 1):
+                    return PayerMatch(canonical, _FUZZY_CONFIDENCE, alias)
+        return None
+
 
-def normalize_payer(payer_input: str) -> str:
+def get_payer_resolver() -> PayerResolver:
+    """Process-wide resolver; recompiled only when the payer config objects change."""
+    global _resolver, _resolver_key
+    config = get_config()
+    aliases = config.get("payer_aliases", {}) or {}
+    sources = config.get("policy_sources", {}) or {}
+    resolution = config.get("payer_resolution", {}) or {}
+    key = (id(aliases), len(aliases), id(sources), len(sources), id(resolution), len(resolution))
+    resolver = _resolver
+    if resolver is not None and _resolver_key == key:
+        return resolver
+    with _resolver_lock:
+        if _resolver is None or _resolver_key != key:
+            _resolver = PayerResolver(
+                aliases,
+                list(sources),
+                generic_payers=resolution.get("generic_payers"),
+                fuzzy_denylist=resolution.get("fuzzy_denylist"),
+            )
+            _resolver_key = key
+        return _resolver
+
+
+def resolve_payer(payer_input: str) -> PayerMatch | None:
+    """Resolve free-text payer input to a canonical payer with confidence."""
+    if not payer_input or not isinstance(payer_input, str):
+        return None
+    return get_payer_resolver().resolve(payer_input)
+
+
+def normalize_payer(payer_input: str, min_confidence: float | None = None) -> str:
     """
     Map user input to canonical payer name via config payer_aliases.
 
-    Returns canonical name if found, otherwise passes through input as-is.
+    Returns the canonical name if it resolves with at least min_confidence (default:
+    payer_resolution.min_confidence), otherwise passes through input as-is. Use resolve_payer
+    for the confidence itself.
     """
     if not payer_input or not isinstance(payer_input, str):
         return payer_input or "Unknown"
-    raw = payer_input.strip()
-    key = raw.lower().replace(" ", "_")
-    key_alt = raw.lower()
-    config = get_config()
-    aliases = config.get("payer_aliases", {})
-    for k in (key, key_alt, key.replace("_", "")):
-        if k in aliases:
-            return aliases[k]
-    return raw or "Unknown"
+    if min_confidence is None:
+        resolution = get_config().get("payer_resolution", {}) or {}
+        min_confidence = float(resolution.get("min_confidence", 0.0))
+    match = resolve_payer(payer_input)
+    if match is not None and match.confidence >= min_confidence:
+        return match.canonical
+    return payer_input.strip() or "Unknown"
@@ -1,11 +1,37 @@
 """Policy lookup - CPT + payer to PA requirements (config-driven)."""
 
+import hashlib
 import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
 from src.config import get_config
+from src.ingestion.cpt_index import (
+    CPT_INDEX_FILENAME,
+    chunk_mentions_cpt,
+    is_policy_file,
+    load_cpt_index,
+)
+from src.llm.llm_memo import LLMMemo
+from src.llm.schemas import PolicyRequirements, StaffRewrite
+from src.lookup.cms_policy_lookup import REQUIREMENT_LIST_KEYS
+from src.lookup.deadline import Deadline, DeadlineExceededError, accepts_cancel
 from src.lookup.payer_aliases import normalize_payer
+from src.lookup.result_cache import RequirementsCache, make_cache_key
+
+logger = logging.getLogger(__name__)
+
+# Result key marking failed LLM work (unparseable extraction, failed rewrite); removed by
+# _finish_request, which then skips the result cache so a later call retries the LLM.
+_UNCACHEABLE = "_uncacheable"
 
 
 def _default_requirements() -> dict[str, Any]:
@@ -16,16 +42,44 @@ def _default_requirements() -> dict[str, Any]:
         "medical_necessity_criteria": ["See policy for medical necessity criteria"],
         "common_denial_reasons": ["See policy for denial criteria"],
         "source_section": "default",
+        "answer_tier": "default",
     }
 
 
+@dataclass
+class _Retrieved:
+    """
+    What a policy source produced for a CPT: ready requirements (e.g. CMS), or policy text to
+    extract with the LLM plus the chunk to parse heuristically without one.
+    """
+
+    requirements: dict[str, Any] | None = None
+    policy_chunks: list[str] = field(default_factory=list)  # most relevant first
+    chunk: dict | None = None
+    llm_only: bool = False  # no heuristic answer without an LLM (generic vector fallback)
+
+
 class PolicyLookup:
     """Look up prior auth requirements by CPT code and payer (config-driven)."""
 
-    def __init__(self, vector_store: Any = None, cms_lookup: Any = None) -> None:
+    def __init__(
+        self,
+        vector_store: Any = None,
+        cms_lookup: Any = None,
+        result_cache: RequirementsCache | None = None,
+        llm_memo: LLMMemo | None = None,
+    ) -> None:
         self.vector_store = vector_store
         self.cms_lookup = cms_lookup
+        self.result_cache = (
+            result_cache if result_cache is not None else RequirementsCache.from_config()
+        )
+        self.llm_memo = llm_memo if llm_memo is not None else LLMMemo.from_config()
         self._parsed_base: Path | None = None
+        self._cpt_indexes: dict[Path, tuple[int, dict[str, Any]] | None] = {}
+        # (source config, canonical payer) -> (monotonic expiry, source data fingerprint)
+        self._source_versions: dict[str, tuple[float, str]] = {}
+        self._init_lock = threading.Lock()
         config = get_config()
         paths = config.get("paths", {})
         if paths.get("policies_parsed"):
@@ -40,42 +94,199 @@ class PolicyLookup:
         cpt_code: str,
         payer: str,
         ollama_client: Any = None,
+        deadline_seconds: float | None = None,
     ) -> dict[str, Any]:
         """
         Get PA requirements for CPT + payer (config-driven routing).
 
         Flow: normalize payer -> policy_sources config -> cms_api | vector_store | parsed_json -> default.
         When ollama_client is available, rewrites raw policy bullets into staff-friendly language.
+        Non-default results are cached (see result_cache); a hit skips all source and LLM work.
+
+        deadline_seconds (default: policy_lookup.deadline_seconds) caps the lookup: vector search
+        and LLM steps that would overrun it are abandoned and the lookup degrades to the heuristic
+        chunk parse or the un-rewritten bullets. The result reports answer_tier (llm_rewrite,
+        llm_extract, source, heuristic, default) and degraded (True if the budget cut a step).
         """
+        request = self._begin_request(cpt_code, payer, ollama_client, deadline_seconds)
+        if request.cached is not None:
+            return request.cached
+        result = self._lookup_requirements(
+            cpt_code,
+            payer,
+            request.canonical_payer,
+            request.source_config,
+            ollama_client,
+            request.deadline,
+        )
+        return self._finish_request(request, result)
+
+    def _begin_request(
+        self,
+        cpt_code: str,
+        payer: str,
+        ollama_client: Any,
+        deadline_seconds: float | None,
+    ) -> "_Request":
+        """Normalize payer, resolve source config and deadline, and check the result cache."""
+        if deadline_seconds is None:
+            deadline_seconds = get_config().get("policy_lookup", {}).get("deadline_seconds")
         canonical_payer = normalize_payer(payer)
-        config = get_config()
-        policy_sources = config.get("policy_sources", {})
+        policy_sources = get_config().get("policy_sources", {})
+        request = _Request(
+            canonical_payer=canonical_payer,
+            source_config=policy_sources.get(canonical_payer),
+            deadline=Deadline(deadline_seconds),
+        )
+        if self.result_cache is not None:
+            request.cache_key = self._result_cache_key(
+                cpt_code, canonical_payer, request.source_config, ollama_client, payer
+            )
+            request.cached = self.result_cache.get(request.cache_key)
+        return request
+
+    def _finish_request(self, request: "_Request", result: dict[str, Any]) -> dict[str, Any]:
+        """Stamp degraded and cache complete, non-default results."""
+        uncacheable = result.pop(_UNCACHEABLE, False)
+        result["degraded"] = request.deadline.degraded
+        if (
+            request.cache_key is not None
+            and result.get("source_section") != "default"
+            and not request.deadline.degraded
+            and not uncacheable
+        ):
+            self.result_cache.set(request.cache_key, result)
+        return result
+
+    def get_requirements_many(
+        self,
+        cpt_code: str,
+        payers: list[str],
+        ollama_client: Any = None,
+        max_workers: int | None = None,
+        deadline_seconds: float | None = None,
+    ) -> dict[str, dict[str, Any]]:
+        """
+        Get PA requirements for one CPT across several payers concurrently.
+
+        Payers that normalize to the same configured payer (or, without a source config, are the
+        same text) are looked up once. All lookups share
+        this PolicyLookup (caches, vector store) and ollama_client, so total latency is close to
+        the slowest source. deadline_seconds applies to each payer's lookup. A payer whose lookup
+        raises gets default requirements.
+        Returns {payer as given: requirements}, in input order.
+        """
+        unique: dict[str, str] = {}
+        for payer in payers:
+            unique.setdefault(_lookup_identity(payer), payer)
+        if not unique:
+            return {}
+        if max_workers is None:
+            max_workers = get_config().get("policy_lookup", {}).get("max_workers", 4)
+        workers = max(1, min(max_workers, len(unique)))
 
-        source_config = policy_sources.get(canonical_payer)
+        def _one(payer: str) -> dict[str, Any]:
+            try:
+                return self.get_requirements(cpt_code, payer, ollama_client, deadline_seconds)
+            except Exception:
+                logger.exception("Requirements lookup failed for payer %s", payer)
+                return _default_requirements()
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="policy-lookup") as pool:
+            futures = {canonical: pool.submit(_one, payer) for canonical, payer in unique.items()}
+            by_canonical = {canonical: fut.result() for canonical, fut in futures.items()}
+        return {payer: dict(by_canonical[_lookup_identity(payer)]) for payer in payers}
+
+    def _lookup_requirements(
+        self,
+        cpt_code: str,
+        payer: str,
+        canonical_payer: str,
+        source_config: dict | None,
+        ollama_client: Any,
+        deadline: Deadline | None = None,
+    ) -> dict[str, Any]:
+        """Uncached lookup: configured source, then generic parsed/vector fallback, then default."""
         if source_config:
-            result = self._query_source(source_config, cpt_code, canonical_payer, ollama_client)
+            result = self._query_source(
+                source_config, cpt_code, canonical_payer, ollama_client, deadline
+            )
             if result:
-                return self._maybe_rewrite_for_staff(result, ollama_client)
+                if source_config.get("type") == "cms_api" and not _cms_live_rewrite():
+                    # CMS bullets are rewritten offline (scripts/precompute_staff_rewrites.py)
+                    return result
+                return self._maybe_rewrite_for_staff(result, ollama_client, deadline)
 
-        result = self._try_generic_parsed_vector(cpt_code, payer, ollama_client)
+        result = self._try_generic_parsed_vector(cpt_code, payer, ollama_client, deadline)
         if result:
-            return self._maybe_rewrite_for_staff(result, ollama_client)
+            return self._maybe_rewrite_for_staff(result, ollama_client, deadline)
         return _default_requirements()
 
+    def _result_cache_key(
+        self,
+        cpt_code: str,
+        canonical_payer: str,
+        source_config: dict | None,
+        ollama_client: Any,
+        payer: str | None = None,
+    ) -> str:
+        """
+        Key over payer, CPT, source data version, prompt versions and model. Without a source
+        config the generic fallback matches on the payer text as given, so that is keyed too.
+        """
+        from src.llm.prompt_manager import prompt_version
+        model = _model_name(ollama_client) if ollama_client is not None else "none"
+        try:
+            prompts = "+".join(prompt_version(n) for n in ("policy_extractor", "staff_rewriter"))
+        except FileNotFoundError:
+            prompts = "none"
+        source_version = self._source_version(source_config, canonical_payer)
+        payer_key = canonical_payer
+        if not source_config and payer is not None:
+            payer_key = _lookup_identity(payer)
+        return make_cache_key(payer_key, cpt_code, source_version, prompts, str(model))
+
+    def _source_version(self, source_config: dict | None, canonical_payer: str) -> str:
+        """
+        Cheap fingerprint (file stats / collection size) of the data a lookup would read.
+
+        Reused for result_cache.source_check_seconds, so cache hits do not stat every parsed
+        directory; data changes are noticed within that window.
+        """
+        ttl = float(get_config().get("result_cache", {}).get("source_check_seconds", 2))
+        key = json.dumps([source_config, canonical_payer], sort_keys=True, default=str)
+        now = time.monotonic()
+        cached = self._source_versions.get(key)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+        version = self._compute_source_version(source_config, canonical_payer)
+        if ttl > 0:
+            self._source_versions[key] = (now + ttl, version)
+        return version
+
+    def _compute_source_version(self, source_config: dict | None, canonical_payer: str) -> str:
+        parts: list[Any] = []
+        stype = source_config.get("type") if source_config else None
+        if stype == "cms_api":
+            if self.cms_lookup is not None and getattr(self.cms_lookup, "cache_path", None):
+                parts.append(_file_stamp(Path(self.cms_lookup.cache_path)))
+            else:
+                parts.append(_file_stamp(_cms_cache_path()))
+        elif stype == "parsed_json":
+            parts.append(_dir_stamp(self._parsed_dir(source_config, canonical_payer)))
+        # Generic fallback (used when the source misses) reads the parsed tree and vector store
+        if self._parsed_base is not None and self._parsed_base.exists():
+            parts.extend(_dir_stamp(d) for d in _walk_dirs(self._parsed_base))
+        parts.append(_vector_store_stamp(self.vector_store))
+        return hashlib.sha256(json.dumps(parts, default=str).encode("utf-8")).hexdigest()[:16]
+
     def _maybe_rewrite_for_staff(
-        self, result: dict[str, Any], ollama_client: Any | None
+        self, result: dict[str, Any], ollama_client: Any | None, deadline: Deadline | None = None
     ) -> dict[str, Any]:
         """Rewrite raw policy bullets into staff-friendly language when LLM is available."""
-        if ollama_client is None:
+        if ollama_client is None or not _has_requirement_content(result):
             return result
-        has_content = (
-            result.get("documentation_required")
-            or result.get("medical_necessity_criteria")
-            or result.get("common_denial_reasons")
-        )
-        if not has_content:
-            return result
-        return _rewrite_for_staff(result, ollama_client)
+        return _rewrite_for_staff(result, ollama_client, self.llm_memo, deadline)
 
     def _query_source(
         self,
@@ -83,77 +294,211 @@ class PolicyLookup:
         cpt_code: str,
         canonical_payer: str,
         ollama_client: Any,
+        deadline: Deadline | None = None,
     ) -> dict[str, Any] | None:
         """Query configured policy source."""
+        deadline = deadline or Deadline()
+        retrieved = self._retrieve_source(source_config, cpt_code, canonical_payer, deadline)
+        return self._resolve_retrieved(retrieved, cpt_code, ollama_client, deadline)
+
+    def _retrieve_source(
+        self,
+        source_config: dict,
+        cpt_code: str,
+        canonical_payer: str,
+        deadline: Deadline,
+    ) -> _Retrieved | None:
+        """Retrieval half of _query_source (no LLM work)."""
         stype = source_config.get("type")
         if stype == "cms_api":
-            if self.cms_lookup is None:
-                try:
-                    from src.lookup.cms_policy_lookup import CMSPolicyLookup
-                    self.cms_lookup = CMSPolicyLookup()
-                except Exception:
-                    return None
-            return self.cms_lookup.get_requirements(cpt_code)
+            with self._init_lock:
+                if self.cms_lookup is None:
+                    try:
+                        from src.lookup.cms_policy_lookup import CMSPolicyLookup
+                        self.cms_lookup = CMSPolicyLookup()
+                    except Exception:
+                        return None
+            result = self.cms_lookup.get_requirements(cpt_code)
+            return _Retrieved(requirements={**result, "answer_tier": "source"}) if result else None
 
         if stype == "vector_store":
             if not self.vector_store:
                 return None
             meta_filter = source_config.get("metadata_filter", {})
             where = meta_filter if meta_filter else None
-            chunks = self.vector_store.search(
-                f"CPT {cpt_code} prior authorization {canonical_payer}",
-                n_results=5,
-                where=where,
+            return self._retrieve_vector(
+                f"CPT {cpt_code} prior authorization {canonical_payer}", cpt_code, where, deadline
             )
-            if chunks and ollama_client:
-                combined = "\n\n".join(c["text"] for c in chunks[:3])
-                return self._extract_with_llm(combined[:8000], cpt_code, ollama_client)
-            if chunks:
-                return self._parse_chunk_to_requirements(chunks[0], cpt_code)
-            return None
 
         if stype == "parsed_json":
-            parsed_dir = source_config.get("parsed_dir")
-            base = Path(__file__).resolve().parent.parent.parent
-            p = Path(parsed_dir) if parsed_dir else base / "data/policies/parsed" / canonical_payer.lower()
-            if not p.is_absolute():
-                p = base / p
+            p = self._parsed_dir(source_config, canonical_payer)
             if p.exists():
-                for f in p.glob("*.json"):
-                    with open(f, encoding="utf-8") as fp:
-                        data = json.load(fp)
-                    for chunk in data.get("chunks", []):
-                        if cpt_code in chunk.get("text", ""):
-                            if ollama_client:
-                                return self._extract_with_llm(
-                                    chunk["text"], cpt_code, ollama_client
-                                )
-                            return self._parse_chunk_to_requirements(chunk, cpt_code)
+                chunk = self._find_parsed_chunk(p, cpt_code)
+                if chunk is not None:
+                    return _Retrieved(policy_chunks=[chunk["text"]], chunk=chunk)
             return None
         return None
 
+    def _resolve_retrieved(
+        self,
+        retrieved: _Retrieved | None,
+        cpt_code: str,
+        ollama_client: Any,
+        deadline: Deadline,
+    ) -> dict[str, Any] | None:
+        """Turn retrieved source output into requirements (LLM extraction or heuristic parse)."""
+        if retrieved is None:
+            return None
+        if retrieved.requirements is not None:
+            return retrieved.requirements
+        if ollama_client and retrieved.policy_chunks:
+            return self._extract_or_heuristic(
+                retrieved.policy_chunks, retrieved.chunk or {}, cpt_code, ollama_client, deadline
+            )
+        if retrieved.llm_only or retrieved.chunk is None:
+            return None
+        return self._parse_chunk_to_requirements(retrieved.chunk, cpt_code)
+
+    def _parsed_dir(self, source_config: dict, canonical_payer: str) -> Path:
+        """Resolve parsed_dir for a parsed_json source (defaults to parsed/{payer})."""
+        parsed_dir = source_config.get("parsed_dir")
+        base = Path(__file__).resolve().parent.parent.parent
+        p = Path(parsed_dir) if parsed_dir else base / "data/policies/parsed" / canonical_payer.lower()
+        if not p.is_absolute():
+            p = base / p
+        return p
+
     def _try_generic_parsed_vector(
-        self, cpt_code: str, payer: str, ollama_client: Any
+        self, cpt_code: str, payer: str, ollama_client: Any, deadline: Deadline | None = None
     ) -> dict[str, Any] | None:
         """Fallback: scan parsed dir and vector store (existing logic)."""
+        deadline = deadline or Deadline()
+        retrieved = self._retrieve_generic(cpt_code, payer, deadline, ollama_client is not None)
+        return self._resolve_retrieved(retrieved, cpt_code, ollama_client, deadline)
+
+    def _retrieve_generic(
+        self, cpt_code: str, payer: str, deadline: Deadline, llm_available: bool
+    ) -> _Retrieved | None:
+        """Retrieval half of _try_generic_parsed_vector (vector hits need an LLM to be usable)."""
         if self._parsed_base and self._parsed_base.exists():
-            for f in self._parsed_base.rglob("*.json"):
-                if payer.lower() in f.stem.lower() or payer.lower() in str(f.parent).lower():
-                    with open(f, encoding="utf-8") as fp:
-                        data = json.load(fp)
-                    for chunk in data.get("chunks", []):
-                        if cpt_code in chunk.get("text", ""):
-                            if ollama_client:
-                                return self._extract_with_llm(
-                                    chunk["text"], cpt_code, ollama_client
-                                )
-                            return self._parse_chunk_to_requirements(chunk, cpt_code)
-        if self.vector_store:
-            query = f"CPT {cpt_code} prior authorization {payer}"
-            chunks = self.vector_store.search(query)
-            if chunks and ollama_client:
-                combined = "\n\n".join(c["text"] for c in chunks[:3])
-                return self._extract_with_llm(combined[:8000], cpt_code, ollama_client)
+            payer_l = payer.lower()
+            for d in _walk_dirs(self._parsed_base):
+                if payer_l in str(d).lower():
+                    chunk = self._find_parsed_chunk(d, cpt_code)
+                else:
+                    chunk = self._find_parsed_chunk(
+                        d, cpt_code, lambda f: payer_l in f.stem.lower()
+                    )
+                if chunk is not None:
+                    return _Retrieved(policy_chunks=[chunk["text"]], chunk=chunk)
+        if self.vector_store and llm_available:
+            return self._retrieve_vector(
+                f"CPT {cpt_code} prior authorization {payer}",
+                cpt_code,
+                None,
+                deadline,
+                llm_only=True,
+            )
+        return None
+
+    def _retrieve_vector(
+        self,
+        query: str,
+        cpt_code: str,
+        where: dict | None,
+        deadline: Deadline,
+        llm_only: bool = False,
+    ) -> _Retrieved | None:
+        """
+        Hybrid (CPT-prefiltered lexical + vector) search. All n_results fused chunks go to the
+        LLM, most relevant first, and build_prompt packs as many as fit the policy_extractor
+        token budget; vector_store.llm_chunks optionally caps the count.
+        """
+        vs_config = get_config().get("vector_store", {})
+        n = int(vs_config.get("n_results", 5))
+        try:
+            chunks = deadline.run(
+                "vector_search",
+                self.vector_store.hybrid_search,
+                query,
+                cpt_code=cpt_code,
+                n_results=n,
+                where=where,
+            )
+        except DeadlineExceededError:
+            return None
+        if not chunks:
+            return None
+        cap = vs_config.get("llm_chunks")
+        texts = [c["text"] for c in (chunks[: int(cap)] if cap else chunks)]
+        return _Retrieved(policy_chunks=texts, chunk=chunks[0], llm_only=llm_only)
+
+    def _extract_or_heuristic(
+        self,
+        policy_text: str | Sequence[str],
+        chunk: dict,
+        cpt_code: str,
+        ollama_client: Any,
+        deadline: Deadline,
+    ) -> dict[str, Any]:
+        """LLM extraction within the deadline; heuristic parse of chunk if the budget runs out."""
+        try:
+            return self._extract_with_llm(policy_text, cpt_code, ollama_client, deadline)
+        except DeadlineExceededError:
+            return self._parse_chunk_to_requirements(chunk, cpt_code)
+
+    def _get_cpt_index(self, directory: Path) -> tuple[int, dict[str, Any]] | None:
+        """CPT index for directory as (index mtime_ns, index); reloaded when the file changes."""
+        try:
+            mtime = (directory / CPT_INDEX_FILENAME).stat().st_mtime_ns
+        except OSError:
+            self._cpt_indexes.pop(directory, None)
+            return None
+        cached = self._cpt_indexes.get(directory)
+        if cached is None or cached[0] != mtime:
+            index = load_cpt_index(directory)
+            cached = (mtime, index) if index is not None else None
+            self._cpt_indexes[directory] = cached
+        return cached
+
+    def _find_parsed_chunk(
+        self,
+        directory: Path,
+        cpt_code: str,
+        file_filter: Callable[[Path], bool] | None = None,
+    ) -> dict | None:
+        """
+        First chunk in directory whose text mentions cpt_code as a whole token.
+
+        Indexed files are resolved through the directory's CPT index (see parse_policy_pdfs.py);
+        only files missing from the index or modified after it was built are scanned.
+        """
+        cpt_code = str(cpt_code).strip()
+        indexed: set[str] = set()
+        cached = self._get_cpt_index(directory)
+        if cached is not None:
+            index_mtime, index = cached
+            for name in index.get("files", []):
+                try:
+                    if (directory / name).stat().st_mtime_ns <= index_mtime:
+                        indexed.add(name)
+                except OSError:
+                    continue
+            for name, pos in index.get("postings", {}).get(cpt_code, []):
+                path = directory / name
+                if name not in indexed or (file_filter and not file_filter(path)):
+                    continue
+                chunks = _load_parsed_chunks(str(path), path.stat().st_mtime_ns)
+                if pos < len(chunks):
+                    return chunks[pos]
+        for f in sorted(directory.glob("*.json")):
+            if not is_policy_file(f) or f.name in indexed:
+                continue
+            if file_filter and not file_filter(f):
+                continue
+            for chunk in _load_parsed_chunks(str(f), f.stat().st_mtime_ns):
+                if chunk_mentions_cpt(chunk.get("text", ""), cpt_code):
+                    return chunk
         return None
 
     def _parse_chunk_to_requirements(self, chunk: dict, cpt_code: str) -> dict[str, Any]:
@@ -170,52 +515,271 @@ class PolicyLookup:
             "medical_necessity_criteria": _extract_list_items(text, "criteria", "necessity"),
             "common_denial_reasons": _extract_list_items(text, "denial"),
             "source_section": source,
+            "answer_tier": "heuristic",
         }
 
     def _extract_with_llm(
-        self, policy_text: str, cpt_code: str, ollama_client: Any
+        self,
+        policy_text: str | Sequence[str],
+        cpt_code: str,
+        ollama_client: Any,
+        deadline: Deadline | None = None,
     ) -> dict[str, Any]:
-        """Use LLM to extract requirements from policy text."""
-        from src.llm.prompt_manager import format_prompt
-        prompt = format_prompt(
+        """
+        Use LLM to extract requirements from policy text, or chunks most relevant first
+        (memoized by prompt/inputs/model).
+
+        Raises DeadlineExceededError if the LLM call does not finish within deadline.
+        """
+        memoized, prompt, memo_key = self._prepare_extraction(policy_text, cpt_code, ollama_client)
+        if memoized is not None:
+            return memoized
+        result = (deadline or Deadline()).run(
+            "llm_extract", ollama_client.extract_json, prompt, schema=PolicyRequirements
+        )
+        return self._finish_extraction(result, memo_key)
+
+    def _prepare_extraction(
+        self, policy_text: str | Sequence[str], cpt_code: str, ollama_client: Any
+    ) -> tuple[dict[str, Any] | None, str, str | None]:
+        """
+        (memoized result, prompt, memo key) for a policy_extractor call. The policy text is
+        packed into the prompt's token budget (llm_prompts.budgets) for the client's model.
+        """
+        from src.llm.prompt_manager import build_prompt
+        chunks = [policy_text] if isinstance(policy_text, str) else list(policy_text)
+        built = build_prompt(
             "policy_extractor",
+            pack="policy_text",
+            chunks=chunks,
+            model=_model_name(ollama_client),
             cpt_code=cpt_code,
-            policy_text=policy_text[:8000],
         )
-        result = ollama_client.extract_json(prompt)
-        return {
+        policy_text = built.packed
+        memo_key = None
+        if self.llm_memo is not None:
+            memo_key = LLMMemo.make_key(
+                "policy_extractor",
+                _model_name(ollama_client),
+                cpt_code=cpt_code,
+                policy_text=policy_text,
+            )
+            memoized = self.llm_memo.get(memo_key)
+            if memoized is not None:
+                return memoized, "", memo_key
+        return None, built.text, memo_key
+
+    def _finish_extraction(self, result: dict[str, Any], memo_key: str | None) -> dict[str, Any]:
+        """
+        Normalize policy_extractor output to the requirements schema and memoize it.
+
+        Unparseable output ("raw") yields empty lists that are neither memoized nor cached.
+        """
+        extracted = {
             "prior_auth_required": result.get("prior_auth_required", True),
             "documentation_required": result.get("documentation_required", []),
             "medical_necessity_criteria": result.get("medical_necessity_criteria", []),
             "common_denial_reasons": result.get("common_denial_reasons", []),
-            "source_section": result.get("source_section", "llm"),
+            # Schema-constrained output always has the field, often as ""
+            "source_section": str(result.get("source_section") or "").strip() or "llm",
+            "answer_tier": "llm_extract",
         }
+        if "raw" in result:
+            extracted[_UNCACHEABLE] = True
+        elif memo_key is not None and self.llm_memo is not None:
+            self.llm_memo.set(memo_key, extracted)
+        return extracted
+
+
+@dataclass
+class _Request:
+    """Per-call state of get_requirements (shared with AsyncPolicyLookup)."""
+
+    canonical_payer: str
+    source_config: dict | None
+    deadline: Deadline
+    cache_key: str | None = None
+    cached: dict[str, Any] | None = None
+
+
+def _model_name(ollama_client: Any) -> str:
+    """Model identifier used in cache/memo keys."""
+    return str(getattr(ollama_client, "model", "unknown"))
+
+
+def staff_rewrite_bullets(
+    result: dict[str, Any],
+    ollama_client: Any,
+    memo: LLMMemo | None = None,
+    cancel: threading.Event | None = None,
+) -> dict[str, list] | None:
+    """
+    Rewrite requirement bullets with the staff_rewriter prompt.
+
+    Returns only the rewritten lists (documentation_required, medical_necessity_criteria,
+    common_denial_reasons) or None if the LLM output was unusable. LLM errors propagate.
+    cancel is forwarded to clients whose extract_json accepts it.
+    """
+    memoized, prompt, memo_key = _prepare_staff_rewrite(result, ollama_client, memo)
+    if memoized is not None:
+        return _finish_staff_rewrite(memoized, None, None)
+    kwargs = {}
+    if cancel is not None and accepts_cancel(ollama_client.extract_json):
+        kwargs["cancel"] = cancel
+    out = ollama_client.extract_json(prompt, schema=StaffRewrite, priority="background", **kwargs)
+    return _finish_staff_rewrite(out, memo_key, memo)
+
+
+def _prepare_staff_rewrite(
+    result: dict[str, Any], ollama_client: Any, memo: LLMMemo | None
+) -> tuple[dict[str, Any] | None, str, str | None]:
+    """(memoized output, prompt, memo key) for a staff_rewriter call."""
+    from src.llm.prompt_manager import build_prompt
+    sub = {k: result.get(k, []) for k in REQUIREMENT_LIST_KEYS}
+    requirements_json = json.dumps(sub, indent=2)
+    memo_key = None
+    if memo is not None:
+        memo_key = LLMMemo.make_key(
+            "staff_rewriter", _model_name(ollama_client), requirements_json=requirements_json
+        )
+        memoized = memo.get(memo_key)
+        if memoized is not None:
+            return memoized, "", memo_key
+    model = _model_name(ollama_client)
+    prompt = build_prompt("staff_rewriter", model=model, requirements_json=requirements_json).text
+    return None, prompt, memo_key
+
+
+def _finish_staff_rewrite(
+    out: Any, memo_key: str | None, memo: LLMMemo | None
+) -> dict[str, list] | None:
+    """Memoize usable staff_rewriter output and keep only the non-empty rewritten lists."""
+    if not isinstance(out, dict):
+        return None
+    if memo_key is not None and memo is not None and "raw" not in out:
+        memo.set(memo_key, out)
+    rewritten = {
+        k: out[k] for k in REQUIREMENT_LIST_KEYS if isinstance(out.get(k), list) and out[k]
+    }
+    return rewritten or None
+
+
+def _merge_staff_rewrite(
+    result: dict[str, Any], rewritten: dict[str, list] | None
+) -> dict[str, Any]:
+    """result with rewritten lists applied (tier llm_rewrite), or result unchanged."""
+    if not rewritten:
+        return result
+    merged = dict(result)
+    merged.update(rewritten)
+    merged["answer_tier"] = "llm_rewrite"
+    return merged
+
+
+def _has_requirement_content(result: dict[str, Any]) -> bool:
+    """True if any requirement list is non-empty (worth a staff rewrite)."""
+    return any(result.get(k) for k in REQUIREMENT_LIST_KEYS)
 
 
-def _rewrite_for_staff(result: dict[str, Any], ollama_client: Any) -> dict[str, Any]:
-    """Use LLM to rewrite policy bullets into staff-friendly, actionable language."""
+def _rewrite_for_staff(
+    result: dict[str, Any],
+    ollama_client: Any,
+    memo: LLMMemo | None = None,
+    deadline: Deadline | None = None,
+) -> dict[str, Any]:
+    """
+    Use LLM to rewrite policy bullets into staff-friendly, actionable language.
+
+    Returns result un-rewritten (and not result-cached) if the rewrite fails or does not finish
+    within deadline.
+    """
     try:
-        from src.llm.prompt_manager import format_prompt
-        sub = {
-            "documentation_required": result.get("documentation_required", []),
-            "medical_necessity_criteria": result.get("medical_necessity_criteria", []),
-            "common_denial_reasons": result.get("common_denial_reasons", []),
-        }
-        requirements_json = json.dumps(sub, indent=2)
-        prompt = format_prompt("staff_rewriter", requirements_json=requirements_json)
-        out = ollama_client.extract_json(prompt)
-        if isinstance(out, dict):
-            merged = dict(result)
-            if out.get("documentation_required"):
-                merged["documentation_required"] = out["documentation_required"]
-            if out.get("medical_necessity_criteria"):
-                merged["medical_necessity_criteria"] = out["medical_necessity_criteria"]
-            if out.get("common_denial_reasons"):
-                merged["common_denial_reasons"] = out["common_denial_reasons"]
-            return merged
+        rewritten = (deadline or Deadline()).run(
+            "staff_rewrite", staff_rewrite_bullets, result, ollama_client, memo
+        )
     except (FileNotFoundError, json.JSONDecodeError, KeyError, TypeError, Exception):
-        pass
-    return result
+        return _mark_uncacheable(result)
+    return _merge_staff_rewrite(result, rewritten)
+
+
+def _mark_uncacheable(result: dict[str, Any]) -> dict[str, Any]:
+    """Copy of result that _finish_request returns without writing to the result cache."""
+    marked = dict(result)
+    marked[_UNCACHEABLE] = True
+    return marked
+
+
+@lru_cache(maxsize=32)
+def _load_parsed_chunks(path: str, mtime_ns: int) -> list[dict]:
+    """Chunks of a parsed policy file (cached per path + mtime)."""
+    try:
+        with open(path, encoding="utf-8") as fp:
+            data = json.load(fp)
+    except (json.JSONDecodeError, OSError):
+        return []
+    return data.get("chunks", []) if isinstance(data, dict) else []
+
+
+def _cms_live_rewrite() -> bool:
+    """Whether CMS results get a live staff rewrite (default: served precomputed)."""
+    return bool(get_config().get("cms_api", {}).get("live_staff_rewrite", False))
+
+
+def _cms_cache_path() -> Path:
+    """CMS cache path from config (same resolution as CMSPolicyLookup)."""
+    p = Path(get_config().get("cms_api", {}).get("cache_path", "data/cms/articles_cache.json"))
+    if not p.is_absolute():
+        p = Path(__file__).resolve().parent.parent.parent / p
+    return p
+
+
+def _lookup_identity(payer: str) -> str:
+    """
+    What a lookup's result depends on: the canonical payer when it has a configured source,
+    else the payer text itself (the generic fallback matches directories and files on it).
+    """
+    canonical = normalize_payer(payer)
+    if canonical in get_config().get("policy_sources", {}):
+        return canonical
+    return f"{canonical}|{(payer or '').strip().lower()}"
+
+
+def _file_stamp(path: Path) -> list[Any]:
+    """(name, mtime_ns, size) of a file, or (name, None) if missing."""
+    try:
+        st = path.stat()
+    except OSError:
+        return [path.name, None]
+    return [path.name, st.st_mtime_ns, st.st_size]
+
+
+def _dir_stamp(directory: Path) -> list[Any]:
+    """Stamps of every JSON file directly in directory (policy files and CPT index)."""
+    if not directory.exists():
+        return [str(directory), None]
+    return [str(directory), [_file_stamp(f) for f in sorted(directory.glob("*.json"))]]
+
+
+def _vector_store_stamp(vector_store: Any) -> Any:
+    """
+    Collection generation of the vector store. Unlike the chunk count it changes when a reseed
+    replaces chunk text (new content-hash ids, old ones pruned) without changing the size.
+    """
+    if vector_store is None:
+        return None
+    try:
+        return list(vector_store._collection_version())
+    except Exception:
+        return None
+
+
+def _walk_dirs(base: Path) -> list[Path]:
+    """base and all of its subdirectories, in sorted walk order."""
+    dirs = []
+    for root, subdirs, _files in os.walk(base):
+        subdirs.sort()
+        dirs.append(Path(root))
+    return dirs
 
 
 def _extract_list_items(text: str, *keywords: str) -> list[str]:
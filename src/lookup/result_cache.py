@@ -0,0 +1,147 @@
+"""Two-tier (in-memory LRU + SQLite) cache for PolicyLookup.get_requirements results."""
+
+import copy
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+from src.config import get_config
+from src.sqlite_cache import SQLiteCache
+
+logger = logging.getLogger(__name__)
+
+_shared: dict[tuple, "RequirementsCache"] = {}
+_shared_lock = threading.Lock()
+
+
+def make_cache_key(
+    canonical_payer: str,
+    cpt_code: str,
+    source_version: str,
+    prompt_version: str,
+    model: str,
+) -> str:
+    """Cache key for a requirements result; any component change yields a new key."""
+    parts = [canonical_payer, str(cpt_code).strip(), source_version, prompt_version, model]
+    return hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()
+
+
+class RequirementsCache:
+    """
+    Requirements result cache: in-memory LRU in front of an on-disk SQLite store.
+
+    Disk hits are promoted into memory. Both tiers honour the same TTL.
+    """
+
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        memory_entries: int = 512,
+        ttl_seconds: float | None = None,
+        max_disk_entries: int | None = None,
+    ) -> None:
+        self.memory_entries = memory_entries
+        self.ttl_seconds = ttl_seconds
+        self._memory: OrderedDict[str, tuple[float | None, dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = (
+            SQLiteCache(
+                path, table="requirements", ttl_seconds=ttl_seconds, max_entries=max_disk_entries
+            )
+            if path
+            else None
+        )
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_config(cls) -> "RequirementsCache | None":
+        """Process-wide cache built from config result_cache section; None when disabled."""
+        config = get_config()
+        rc_config = config.get("result_cache", {})
+        if not rc_config.get("enabled", True):
+            return None
+        cache_dir = config.get("paths", {}).get("cache_dir", "data/cache")
+        path = Path(cache_dir)
+        if not path.is_absolute():
+            path = Path(__file__).resolve().parent.parent.parent / path
+        ttl_hours = rc_config.get("ttl_hours")
+        key = (
+            str(path / "requirements.sqlite"),
+            rc_config.get("memory_entries", 512),
+            ttl_hours,
+            rc_config.get("max_disk_entries"),
+        )
+        with _shared_lock:
+            if key not in _shared:
+                _shared[key] = cls(
+                    path=key[0],
+                    memory_entries=key[1],
+                    ttl_seconds=ttl_hours * 3600 if ttl_hours else None,
+                    max_disk_entries=key[3],
+                )
+            return _shared[key]
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """Return a copy of the cached result or None."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at is None or expires_at >= now:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return copy.deepcopy(value)
+                del self._memory[key]
+        value = self._disk.get(key) if self._disk is not None else None
+        if value is None:
+            with self._lock:
+                self.misses += 1
+            logger.debug("requirements cache miss %s", key[:12])
+            return None
+        with self._lock:
+            self.disk_hits += 1
+            self._remember(key, value, now)
+        return copy.deepcopy(value)
+
+    def set(self, key: str, value: dict[str, Any]) -> None:
+        """Store result in both tiers."""
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._remember(key, value, time.time())
+        if self._disk is not None:
+            self._disk.set(key, value)
+
+    def _remember(self, key: str, value: dict[str, Any], now: float) -> None:
+        expires_at = now + self.ttl_seconds if self.ttl_seconds else None
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all entries from both tiers (stats are kept)."""
+        with self._lock:
+            self._memory.clear()
+        if self._disk is not None:
+            self._disk.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """Hit/miss counters and hit rate."""
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            total = hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": hits / total if total else 0.0,
+                "memory_entries": len(self._memory),
+            }
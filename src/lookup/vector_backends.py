@@ -0,0 +1,587 @@
+"""Storage/search backends for PolicyVectorStore: ChromaDB or a local NumPy index."""
+
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, ContextManager
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+NUMPY_INDEX_VERSION = 1
+QUANTIZATION_MODES = ("none", "float16", "int8")
+# Quantized codes are widened to float32 this many rows at a time, so a scan never holds a
+# float32 copy of the whole matrix (1024 x 384 dims = 1.5 MB)
+SCAN_BLOCK_ROWS = 1024
+
+
+def _import_chromadb() -> tuple[Any, Any]:
+    """(chromadb module, Settings); imported lazily because chromadb is slow to import."""
+    try:
+        import chromadb
+        from chromadb.config import Settings
+    except ImportError:
+        raise ImportError("chromadb required. Install with: pip install chromadb") from None
+    return chromadb, Settings
+
+
+class VectorBackend(ABC):
+    """
+    Interface PolicyVectorStore stores and searches through.
+
+    Embeddings are always computed by the store (see PolicyVectorStore.embed) and passed in.
+    Results use Chroma's column layout: {"ids": [...], "documents": [...], "metadatas": [...]}.
+    """
+
+    max_batch_size: int | None = None
+
+    @abstractmethod
+    def upsert(
+        self,
+        ids: list[str],
+        embeddings: list[list[float]],
+        documents: list[str],
+        metadatas: list[dict[str, Any]],
+    ) -> None:
+        """Insert or replace chunks by id."""
+
+    @abstractmethod
+    def get(
+        self,
+        ids: list[str] | None = None,
+        where: dict[str, Any] | None = None,
+        limit: int | None = None,
+        offset: int = 0,
+    ) -> dict[str, list]:
+        """Chunks by id and/or Chroma-style where filter, paged by limit/offset."""
+
+    @abstractmethod
+    def delete(self, ids: list[str]) -> None:
+        """Remove chunks by id (unknown ids are ignored)."""
+
+    @abstractmethod
+    def query(
+        self, embedding: list[float], n_results: int, where: dict[str, Any] | None = None
+    ) -> dict[str, list]:
+        """Nearest chunks to embedding, closest first; adds a "distances" column."""
+
+    def query_many(
+        self, embeddings: list[list[float]], n_results: int, where: dict[str, Any] | None = None
+    ) -> list[dict[str, list]]:
+        """query() for several embeddings; backends override this with a single batched call."""
+        return [self.query(e, n_results, where) for e in embeddings]
+
+    @abstractmethod
+    def count(self) -> int:
+        """Number of stored chunks."""
+
+    def bulk(self) -> ContextManager[None]:
+        """Block whose writes may be persisted once, when it exits (default: write-through)."""
+        return nullcontext()
+
+
+class ChromaBackend(VectorBackend):
+    """Chroma PersistentClient collection."""
+
+    def __init__(
+        self, persist_directory: str, collection_name: str, embedding_function: Any = None
+    ) -> None:
+        chromadb, settings_cls = _import_chromadb()
+        self._client = chromadb.PersistentClient(
+            path=persist_directory, settings=settings_cls(anonymized_telemetry=False)
+        )
+        kwargs = (
+            {"embedding_function": embedding_function} if embedding_function is not None else {}
+        )
+        self.collection = self._client.get_or_create_collection(
+            name=collection_name, metadata={"description": "Policy chunks"}, **kwargs
+        )
+        max_size = getattr(self._client, "max_batch_size", None)
+        max_size = max_size or getattr(self._client, "get_max_batch_size", None)
+        if callable(max_size):
+            max_size = max_size()
+        self.max_batch_size = max_size if isinstance(max_size, int) and max_size > 0 else None
+
+    def upsert(self, ids, embeddings, documents, metadatas) -> None:
+        self.collection.upsert(
+            ids=ids, embeddings=embeddings, documents=documents, metadatas=metadatas
+        )
+
+    def get(self, ids=None, where=None, limit=None, offset=0) -> dict[str, list]:
+        kwargs: dict[str, Any] = {"include": ["documents", "metadatas"]}
+        if ids is not None:
+            kwargs["ids"] = ids
+        if where:
+            kwargs["where"] = where
+        if limit is not None:
+            kwargs.update(limit=limit, offset=offset)
+        found = self.collection.get(**kwargs)
+        return {
+            "ids": list(found.get("ids") or []),
+            "documents": list(found.get("documents") or []),
+            "metadatas": [m or {} for m in found.get("metadatas") or []],
+        }
+
+    def delete(self, ids: list[str]) -> None:
+        self.collection.delete(ids=ids)
+
+    def query(self, embedding, n_results, where=None) -> dict[str, list]:
+        return self.query_many([embedding], n_results, where)[0]
+
+    def query_many(self, embeddings, n_results, where=None) -> list[dict[str, list]]:
+        kwargs: dict[str, Any] = {"n_results": n_results}
+        if where:
+            kwargs["where"] = where
+        results = self.collection.query(query_embeddings=list(embeddings), **kwargs)
+
+        def column(name: str, i: int) -> list:
+            rows = results.get(name) or []
+            return list(rows[i] or []) if i < len(rows) else []
+
+        return [
+            {
+                "ids": column("ids", i),
+                "documents": column("documents", i),
+                "metadatas": [m or {} for m in column("metadatas", i)],
+                "distances": column("distances", i),
+            }
+            for i in range(len(embeddings))
+        ]
+
+    def count(self) -> int:
+        return self.collection.count()
+
+
+class NumpyBackend(VectorBackend):
+    """
+    Local index: L2-normalized float32 vectors in a memory-mapped .npy, documents and
+    metadata in JSON, metadata filters evaluated on columnar arrays.
+
+    Search is exact (one matrix-vector product) or IVF: vectors are clustered with k-means at
+    write time and a query scans only the nprobe closest clusters. Suited to corpora of a few
+    thousand to a few hundred thousand chunks; writes rewrite the files atomically (once per
+    bulk() block, which also trains IVF once). Reads and writes first reload the index if
+    another process (seed_vector_db.py) rewrote it.
+
+    With quantization "float16" or "int8" (symmetric, one float32 scale per vector) the scan
+    runs over the compact matrix, and the top n_results * rerank_factor candidates are
+    re-scored exactly against the float32 vectors, which stay on disk (memory-mapped) and are
+    only paged in for those rows.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        index: str = "exact",
+        ivf_min_points: int = 2000,
+        ivf_nprobe: int = 4,
+        quantization: str = "none",
+        rerank_factor: int = 4,
+    ) -> None:
+        if np is None:
+            raise ImportError("numpy required. Install with: pip install numpy")
+        if index not in ("exact", "ivf"):
+            raise ValueError(f"Unknown numpy index type: {index}")
+        if quantization not in QUANTIZATION_MODES:
+            raise ValueError(f"Unknown quantization: {quantization}")
+        self.directory = Path(directory)
+        self.index = index
+        self.ivf_min_points = ivf_min_points
+        self.ivf_nprobe = ivf_nprobe
+        self.quantization = quantization
+        self.rerank_factor = max(1, int(rerank_factor))
+        self._lock = threading.Lock()
+        self._bulk_depth = 0
+        self._load()
+
+    # -- persistence --------------------------------------------------------------------
+
+    def _index_stamp(self) -> tuple[int, int, int] | None:
+        """(inode, mtime_ns, size) of index.json; every save replaces the file."""
+        try:
+            st = (self.directory / "index.json").stat()
+        except OSError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def _refresh(self) -> None:
+        """Reload if index.json changed since this instance loaded or saved it. Lock held."""
+        if not self._dirty and self._index_stamp() != self._loaded_stamp:
+            self._load()
+
+    @contextmanager
+    def bulk(self) -> Iterator[None]:
+        """
+        Buffer writes in memory and persist them once when the outermost block exits. Until
+        then queries scan the float32 vectors exactly (codes and IVF lists are rebuilt on save).
+        """
+        with self._lock:
+            self._bulk_depth += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._bulk_depth -= 1
+                if not self._bulk_depth and self._dirty:
+                    self._save(self._matrix())
+
+    def _load(self) -> None:
+        self._ids: list[str] = []
+        self._documents: list[str] = []
+        self._metadatas: list[dict[str, Any]] = []
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+        self._codes: Any = None
+        self._scales: Any = None
+        self._centroids: Any = None
+        self._assignments: Any = None
+        self._columns: dict[str, Any] = {}
+        self._columns_stale = False
+        # Rows appended since the last save, stacked onto _vectors lazily (see _matrix)
+        self._tail: list[Any] = []
+        self._dirty = False
+        # Stat before reading, so a write that lands mid-load is picked up by the next _refresh
+        self._loaded_stamp = self._index_stamp()
+        meta_path = self.directory / "index.json"
+        if self._loaded_stamp is None:
+            return
+        with open(meta_path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != NUMPY_INDEX_VERSION:
+            return
+        self._ids = data["ids"]
+        self._documents = data["documents"]
+        self._metadatas = data["metadatas"]
+        if self._ids:
+            self._vectors = np.load(self.directory / "vectors.npy", mmap_mode="r")
+            if data.get("quantization", "none") == self.quantization:
+                self._load_codes()
+            else:
+                # Mode changed in config: re-quantize from the float32 vectors once
+                self._write_codes(self._vectors)
+                data["quantization"] = self.quantization
+                tmp = self.directory / "index.json.tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(data, f)
+                os.replace(tmp, meta_path)
+                self._loaded_stamp = self._index_stamp()
+        if (self.directory / "centroids.npy").exists():
+            self._centroids = np.load(self.directory / "centroids.npy")
+            self._assignments = np.load(self.directory / "assignments.npy")
+        self._build_columns()
+
+    def _save(self, vectors: Any) -> None:
+        """Write arrays and JSON atomically, then re-open the vectors memory-mapped."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        _atomic_save_npy(self.directory / "vectors.npy", vectors)
+        self._write_codes(vectors)
+        centroids = assignments = None
+        if self.index == "ivf" and len(vectors) >= self.ivf_min_points:
+            centroids, assignments = _kmeans(vectors, max(1, int(np.sqrt(len(vectors)))))
+            _atomic_save_npy(self.directory / "centroids.npy", centroids)
+            _atomic_save_npy(self.directory / "assignments.npy", assignments)
+        else:
+            for name in ("centroids.npy", "assignments.npy"):
+                (self.directory / name).unlink(missing_ok=True)
+        tmp = self.directory / "index.json.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "version": NUMPY_INDEX_VERSION,
+                    "quantization": self.quantization,
+                    "ids": self._ids,
+                    "documents": self._documents,
+                    "metadatas": self._metadatas,
+                },
+                f,
+            )
+        os.replace(tmp, self.directory / "index.json")
+        self._loaded_stamp = self._index_stamp()
+        self._dirty = False
+        self._vectors = (
+            np.load(self.directory / "vectors.npy", mmap_mode="r") if len(vectors) else vectors
+        )
+        self._centroids, self._assignments = centroids, assignments
+        self._build_columns()
+
+    def _write_codes(self, vectors: Any) -> None:
+        """Write (and load) the quantized search matrix for the configured mode."""
+        for name in ("codes.npy", "scales.npy"):
+            (self.directory / name).unlink(missing_ok=True)
+        self._codes = self._scales = None
+        if self.quantization == "none" or not len(vectors):
+            return
+        codes, scales = quantize(vectors, self.quantization)
+        _atomic_save_npy(self.directory / "codes.npy", codes)
+        if scales is not None:
+            _atomic_save_npy(self.directory / "scales.npy", scales)
+        self._load_codes()
+
+    def _load_codes(self) -> None:
+        if self.quantization == "none" or not (self.directory / "codes.npy").exists():
+            return
+        self._codes = np.load(self.directory / "codes.npy")
+        if (self.directory / "scales.npy").exists():
+            self._scales = np.load(self.directory / "scales.npy")
+
+    def resident_bytes(self) -> int:
+        """Bytes of the matrix each search scans (float32 vectors, or codes + scales)."""
+        if self._codes is not None:
+            scales = self._scales.nbytes if self._scales is not None else 0
+            return int(self._codes.nbytes + scales)
+        return int(self._vectors.nbytes)
+
+    def _build_columns(self) -> None:
+        keys = {k for m in self._metadatas for k in m}
+        self._columns = {
+            k: np.array([m.get(k) for m in self._metadatas] + [None], dtype=object)[:-1]
+            for k in keys
+        }
+        self._columns_stale = False
+
+    def _matrix(self) -> Any:
+        """
+        All float32 vectors as one writable in-memory array: pending appended rows are stacked
+        on, and the memory-mapped file is copied on the first write since the last save.
+        """
+        if self._tail:
+            parts = [self._vectors] if len(self._vectors) else []
+            self._vectors = np.vstack(parts + self._tail)
+            self._tail = []
+        elif isinstance(self._vectors, np.memmap) or not self._vectors.flags.writeable:
+            self._vectors = np.array(self._vectors)
+        return self._vectors
+
+    def _written(self) -> None:
+        """Record an in-memory write; persist now unless inside bulk(). Lock held."""
+        self._dirty = True
+        self._columns_stale = True
+        # Codes and IVF lists describe the saved matrix; scan the float32 rows until the save
+        self._codes = self._scales = self._centroids = self._assignments = None
+        if not self._bulk_depth:
+            self._save(self._matrix())
+
+    # -- writes -------------------------------------------------------------------------
+
+    def upsert(self, ids, embeddings, documents, metadatas) -> None:
+        new = _normalize(np.asarray(embeddings, dtype=np.float32))
+        with self._lock:
+            self._refresh()
+            dim = self._tail[0].shape[1] if self._tail else self._vectors.shape[1]
+            if len(self._ids) and new.shape[1] != dim:
+                raise ValueError(f"Embedding dimension {new.shape[1]} != index dimension {dim}")
+            position = {cid: i for i, cid in enumerate(self._ids)}
+            appended, replaced = [], []
+            for row, (cid, doc, meta) in enumerate(zip(ids, documents, metadatas)):
+                i = position.get(cid)
+                if i is None:
+                    position[cid] = len(self._ids)
+                    self._ids.append(cid)
+                    self._documents.append(doc)
+                    self._metadatas.append(dict(meta or {}))
+                    appended.append(row)
+                else:
+                    self._documents[i] = doc
+                    self._metadatas[i] = dict(meta or {})
+                    replaced.append((i, row))
+            if replaced:
+                vectors = self._matrix()
+                for i, row in replaced:
+                    vectors[i] = new[row]
+            if appended:
+                self._tail.append(new[appended])
+            self._written()
+
+    def delete(self, ids: list[str]) -> None:
+        drop = set(ids)
+        with self._lock:
+            self._refresh()
+            keep = [i for i, cid in enumerate(self._ids) if cid not in drop]
+            if len(keep) == len(self._ids):
+                return
+            vectors = self._matrix()
+            self._vectors = vectors[keep] if keep else np.zeros((0, vectors.shape[1]), np.float32)
+            self._ids = [self._ids[i] for i in keep]
+            self._documents = [self._documents[i] for i in keep]
+            self._metadatas = [self._metadatas[i] for i in keep]
+            self._written()
+
+    # -- reads --------------------------------------------------------------------------
+
+    def _mask(self, where: dict[str, Any] | None) -> Any:
+        """Boolean row mask for a Chroma-style where filter (see lexical_index.matches_where)."""
+        if self._columns_stale:
+            self._build_columns()
+        n = len(self._ids)
+        if not where:
+            return np.ones(n, dtype=bool)
+        mask = np.ones(n, dtype=bool)
+        for key, cond in where.items():
+            if key == "$and":
+                for c in cond:
+                    mask &= self._mask(c)
+            elif key == "$or":
+                any_mask = np.zeros(n, dtype=bool)
+                for c in cond:
+                    any_mask |= self._mask(c)
+                mask &= any_mask
+            elif key.startswith("$"):
+                raise ValueError(f"Unsupported where operator: {key}")
+            else:
+                column = self._columns.get(key)
+                if column is None:
+                    column = np.full(n, None, dtype=object)
+                ops = cond if isinstance(cond, dict) else {"$eq": cond}
+                for op, operand in ops.items():
+                    if op == "$eq":
+                        mask &= column == operand
+                    elif op == "$ne":
+                        mask &= column != operand
+                    elif op in ("$in", "$nin"):
+                        allowed = list(operand)
+                        hit = np.fromiter((v in allowed for v in column), dtype=bool, count=n)
+                        mask &= hit if op == "$in" else ~hit
+                    else:
+                        raise ValueError(f"Unsupported where operator: {op}")
+        return mask
+
+    def _rows(self, rows: list[int], distances: list[float] | None = None) -> dict[str, list]:
+        out = {
+            "ids": [self._ids[i] for i in rows],
+            "documents": [self._documents[i] for i in rows],
+            "metadatas": [self._metadatas[i] for i in rows],
+        }
+        if distances is not None:
+            out["distances"] = distances
+        return out
+
+    def get(self, ids=None, where=None, limit=None, offset=0) -> dict[str, list]:
+        with self._lock:
+            self._refresh()
+            mask = self._mask(where)
+            if ids is not None:
+                position = {cid: i for i, cid in enumerate(self._ids)}
+                rows = [position[c] for c in ids if c in position and mask[position[c]]]
+            else:
+                rows = np.flatnonzero(mask).tolist()
+            rows = rows[offset : offset + limit if limit is not None else None]
+            return self._rows(rows)
+
+    def query(self, embedding, n_results, where=None) -> dict[str, list]:
+        return self.query_many([embedding], n_results, where)[0]
+
+    def query_many(self, embeddings, n_results, where=None) -> list[dict[str, list]]:
+        queries = _normalize(np.asarray(embeddings, dtype=np.float32))
+        with self._lock:
+            self._refresh()
+            if not self._ids:
+                return [self._rows([], []) for _ in queries]
+            if self._tail:
+                self._matrix()
+            mask = self._mask(where)
+            if self._centroids is not None:
+                return [self._query_ivf(q, n_results, mask) for q in queries]
+            candidates = np.flatnonzero(mask)
+            if not len(candidates):
+                return [self._rows([], []) for _ in queries]
+            # One (queries x candidates) matrix product for the whole batch
+            sims = self._scan(candidates, queries)
+            return [self._top(candidates, row, q, n_results) for row, q in zip(sims, queries)]
+
+    def _query_ivf(self, q: Any, n_results: int, mask: Any) -> dict[str, list]:
+        nprobe = min(self.ivf_nprobe, len(self._centroids))
+        probe = np.argsort(-(self._centroids @ q))[:nprobe]
+        ivf_mask = mask & np.isin(self._assignments, probe)
+        # Too few candidates in the probed clusters (e.g. narrow filter): scan all matches
+        if ivf_mask.sum() >= n_results:
+            mask = ivf_mask
+        candidates = np.flatnonzero(mask)
+        if not len(candidates):
+            return self._rows([], [])
+        return self._top(candidates, self._scan(candidates, q[None, :])[0], q, n_results)
+
+    def _scan(self, candidates: Any, queries: Any) -> Any:
+        """(queries x candidates) similarities from the search matrix (approximate if quantized)."""
+        everything = len(candidates) == len(self._ids)  # unfiltered: skip the row gather copy
+        if self._codes is None:
+            matrix = self._vectors if everything else self._vectors[candidates]
+            return queries @ np.asarray(matrix).T
+        sims = np.empty((len(queries), len(candidates)), dtype=np.float32)
+        for start in range(0, len(candidates), SCAN_BLOCK_ROWS):
+            stop = start + SCAN_BLOCK_ROWS
+            rows = slice(start, stop) if everything else candidates[start:stop]
+            block = self._codes[rows].astype(np.float32)
+            if self._scales is not None:
+                block *= self._scales[rows][:, None]
+            sims[:, start:stop] = queries @ block.T
+            del block  # free before the next block is widened
+        return sims
+
+    def _top(self, candidates: Any, sims: Any, q: Any, n_results: int) -> dict[str, list]:
+        k = min(n_results, len(candidates))
+        if self._codes is not None:
+            # Shortlist on approximate scores, then re-score the shortlist exactly in float32
+            shortlist = min(len(candidates), k * self.rerank_factor)
+            pick = np.argpartition(-sims, shortlist - 1)[:shortlist]
+            candidates = candidates[pick]
+            sims = np.asarray(self._vectors[candidates]) @ q
+        top = np.argpartition(-sims, k - 1)[:k]
+        top = top[np.argsort(-sims[top])]
+        return self._rows(candidates[top].tolist(), (1.0 - sims[top]).astype(float).tolist())
+
+    def count(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._ids)
+
+
+def _normalize(vectors: Any) -> Any:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (vectors / norms).astype(np.float32)
+
+
+def quantize(vectors: Any, mode: str) -> tuple[Any, Any]:
+    """
+    (codes, per-vector scales) for float16 or int8 storage of row vectors.
+
+    int8 is symmetric per vector: codes = round(v / scale), scale = max|v| / 127, so
+    v . q ~= scale * (codes . q). float16 has no scales (None).
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if mode == "float16":
+        return vectors.astype(np.float16), None
+    if mode == "int8":
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+        return codes, scales.astype(np.float32)
+    raise ValueError(f"Unknown quantization: {mode}")
+
+
+def _atomic_save_npy(path: Path, array: Any) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp, path)
+
+
+def _kmeans(vectors: Any, k: int, iterations: int = 10, seed: int = 0) -> tuple[Any, Any]:
+    """Spherical k-means (cosine) for IVF lists: (centroids, assignment per vector)."""
+    rng = np.random.default_rng(seed)
+    data = np.asarray(vectors, dtype=np.float32)
+    centroids = data[rng.choice(len(data), size=min(k, len(data)), replace=False)].copy()
+    assignments = np.zeros(len(data), dtype=np.int32)
+    for _ in range(iterations):
+        assignments = np.argmax(data @ centroids.T, axis=1).astype(np.int32)
+        for c in range(len(centroids)):
+            members = data[assignments == c]
+            if len(members):
+                centroids[c] = members.mean(axis=0)
+        centroids = _normalize(centroids)
+    return centroids, assignments
@@ -1,23 +1,61 @@
-"""ChromaDB vector store for policy chunks."""
+"""Vector store for policy chunks (ChromaDB or local NumPy backend)."""
 
+import copy
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterator
+from contextlib import contextmanager
 from pathlib import Path
 from typing import Any
 
 from src.config import get_config
+from src.ingestion.cpt_index import cpt_metadata, cpt_metadata_key
+from src.lookup.embedding_cache import EmbeddingCache
+from src.lookup.lexical_index import BM25Index, reciprocal_rank_fusion
+from src.lookup.vector_backends import ChromaBackend, NumpyBackend, VectorBackend
 
-try:
-    import chromadb
-    from chromadb.config import Settings
-except ImportError:
-    chromadb = None
+DEFAULT_BATCH_SIZE = 500
+# Chroma's built-in (ONNX) model; other names are loaded through sentence-transformers.
+DEFAULT_EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+
+def content_hash(text: str, metadata: dict | None = None) -> str:
+    """sha256 of chunk text and metadata (stored in metadata to skip unchanged chunks on reseed)."""
+    payload = json.dumps([text, metadata or {}], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def chunk_id(chunk: dict) -> str:
+    """Stable id for a chunk: hash of payer, source, chunk index and text."""
+    meta = chunk.get("metadata", {}) or {}
+    parts = [
+        str(meta.get("payer", "")),
+        str(meta.get("source", "")),
+        str(chunk.get("chunk_index", meta.get("chunk_index", ""))),
+        chunk["text"],
+    ]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()[:32]
 
 
 class PolicyVectorStore:
-    """ChromaDB-backed store for policy text chunks."""
+    """
+    Store for policy text chunks over a pluggable backend (vector_store.backend).
+
+    "chroma" uses a Chroma PersistentClient; "numpy" is a local memory-mapped index that avoids
+    importing chromadb (see vector_backends.NumpyBackend).
+    """
 
-    def __init__(self, persist_directory: str | Path | None = None, collection_name: str | None = None) -> None:
-        if chromadb is None:
-            raise ImportError("chromadb required. Install with: pip install chromadb")
+    def __init__(
+        self,
+        persist_directory: str | Path | None = None,
+        collection_name: str | None = None,
+        embedding_function: Any = None,
+        embedding_cache: EmbeddingCache | None = None,
+        backend: VectorBackend | None = None,
+    ) -> None:
         config = get_config()
         paths = config.get("paths", {})
         vs_config = config.get("vector_store", {})
@@ -28,36 +66,363 @@ class PolicyVectorStore:
             persist = base / persist
         self.persist_directory = str(persist)
         self.collection_name = collection_name or vs_config.get("collection_name", "authlookup_policies")
-        self._client = chromadb.PersistentClient(path=self.persist_directory, settings=Settings(anonymized_telemetry=False))
-        self._collection = self._client.get_or_create_collection(name=self.collection_name, metadata={"description": "Policy chunks"})
-
-    def add_chunks(self, chunks: list[dict], ids: list[str] | None = None) -> None:
-        """Add policy chunks to the store."""
-        texts = [c["text"] for c in chunks]
-        metadatas = []
-        for c in chunks:
-            meta = dict(c.get("metadata", {}))
-            for k, v in list(meta.items()):
-                if v is None or (isinstance(v, (list, dict)) and len(str(v)) > 500):
-                    meta[k] = str(v)[:500]
-            metadatas.append(meta)
+        self.embedding_model = vs_config.get("embedding_model", DEFAULT_EMBEDDING_MODEL)
+        self.embedding_cache = (
+            embedding_cache if embedding_cache is not None else EmbeddingCache.from_config()
+        )
+        self.lexical = BM25Index(
+            Path(self.persist_directory) / f"_lexical_{self.collection_name}.json"
+        )
+        self._embed_fn = embedding_function
+        self._embed_lock = threading.Lock()
+        # LRU of search results keyed by (query, n_results, where, collection version)
+        self._search_cache: OrderedDict[tuple, list[dict]] = OrderedDict()
+        self._search_cache_entries = int(vs_config.get("search_cache_entries", 256))
+        self._search_cache_lock = threading.Lock()
+        self._version = 0
+        # Writers hold this for a whole bulk_write() block; the outermost block persists
+        self._write_lock = threading.RLock()
+        self._bulk_depth = 0
+        self._unsaved = False
+        self._generation_path = Path(self.persist_directory) / f"_generation_{self.collection_name}"
+        # Generation stamp the in-memory BM25 index reflects; reloaded when another process reseeds
+        self._lexical_stamp = self._collection_version()[1]
+        self.search_cache_hits = 0
+        self.search_cache_misses = 0
+        if backend is not None:
+            self._backend = backend
+        elif vs_config.get("backend", "chroma") == "numpy":
+            np_config = vs_config.get("numpy", {})
+            self._backend = NumpyBackend(
+                Path(self.persist_directory) / f"{self.collection_name}.npyindex",
+                index=np_config.get("index", "exact"),
+                ivf_min_points=np_config.get("ivf_min_points", 2000),
+                ivf_nprobe=np_config.get("ivf_nprobe", 4),
+                quantization=np_config.get("quantization", "none"),
+                rerank_factor=np_config.get("rerank_factor", 4),
+            )
+        else:
+            if self._embed_fn is None:
+                self._embed_fn = _embedding_function(self.embedding_model)
+            self._backend = ChromaBackend(
+                self.persist_directory, self.collection_name, self._embed_fn
+            )
+
+    def _embedding_function(self) -> Any:
+        """Embedding function, created on first use (query embeddings are usually cached)."""
+        with self._embed_lock:
+            if self._embed_fn is None:
+                self._embed_fn = _embedding_function(self.embedding_model)
+            return self._embed_fn
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        """Embed texts, reusing cached vectors for text already embedded with this model."""
+        if self.embedding_cache is None:
+            return [list(map(float, v)) for v in self._embedding_function()(list(texts))]
+        return self.embedding_cache.embed(
+            self.embedding_model, texts, lambda missing: self._embedding_function()(missing)
+        )
+
+    def add_chunks(
+        self, chunks: list[dict], ids: list[str] | None = None, batch_size: int | None = None
+    ) -> int:
+        """
+        Upsert policy chunks in batches; returns the number of chunks written.
+
+        Ids default to chunk_id() (content hash), so reseeding is idempotent. Chunks already
+        stored under the same id with the same content_hash are skipped (no re-embedding).
+        """
+        with self.bulk_write():
+            return self._add_chunks(chunks, ids, batch_size)
+
+    def _add_chunks(self, chunks: list[dict], ids: list[str] | None, batch_size: int | None) -> int:
         if ids is None:
-            ids = [f"chunk_{i}" for i in range(len(chunks))]
-        self._collection.add(documents=texts, metadatas=metadatas, ids=ids)
+            ids = [chunk_id(c) for c in chunks]
+        self.ensure_lexical_index()
+        # Last occurrence wins for duplicate ids in one call (Chroma rejects duplicates in a batch)
+        by_id: dict[str, dict] = {}
+        for cid, c in zip(ids, chunks):
+            by_id[cid] = c
+        batch_size = self._batch_size(batch_size)
+        items = list(by_id.items())
+        written = 0
+        for start in range(0, len(items), batch_size):
+            batch = items[start : start + batch_size]
+            existing = self._existing_hashes([cid for cid, _ in batch])
+            todo_ids, texts, metadatas = [], [], []
+            for cid, c in batch:
+                meta = _chunk_metadata(c)
+                h = content_hash(c["text"], meta)
+                if existing.get(cid) == h:
+                    continue
+                meta["content_hash"] = h
+                todo_ids.append(cid)
+                texts.append(c["text"])
+                metadatas.append(meta)
+            if todo_ids:
+                self._backend.upsert(todo_ids, self.embed(texts), texts, metadatas)
+                self.lexical.add(todo_ids, texts, metadatas)
+                written += len(todo_ids)
+        if written:
+            self._mark_unsaved()
+        return written
+
+    def prune_source(self, source: str, keep_ids: list[str], payer: str | None = None) -> int:
+        """
+        Delete chunks whose metadata source is source (and payer, if given) but whose id is
+        not in keep_ids. Pass payer: PDF file names are only unique within a payer.
+        """
+        where: dict[str, Any] = {"source": source}
+        if payer is not None:
+            where = {"$and": [{"payer": payer}, {"source": source}]}
+        with self.bulk_write():
+            found = self._backend.get(where=where)
+            keep = set(keep_ids)
+            stale = [cid for cid in found.get("ids", []) if cid not in keep]
+            if stale:
+                self._backend.delete(stale)
+                self.lexical.remove(stale)
+                self._mark_unsaved()
+        return len(stale)
+
+    @contextmanager
+    def bulk_write(self) -> Iterator[None]:
+        """
+        Group add_chunks/prune_source calls (e.g. a whole reseed): the backend and BM25 index
+        are persisted, and the generation stamp bumped, once when the outermost block exits.
+        """
+        with self._write_lock:
+            self._bulk_depth += 1
+            try:
+                with self._backend.bulk():
+                    yield
+            finally:
+                self._bulk_depth -= 1
+                if not self._bulk_depth and self._unsaved:
+                    self._unsaved = False
+                    self.lexical.save()
+                    self._bump_version()
+
+    def _mark_unsaved(self) -> None:
+        """Invalidate cached searches now; bulk_write() persists the BM25 index on exit."""
+        self._unsaved = True
+        with self._search_cache_lock:
+            self._version += 1
+            self._search_cache.clear()
+
+    def ensure_lexical_index(self) -> None:
+        """Build the BM25 index from the collection if it was never written (e.g. older seed)."""
+        if self.lexical.exists() or len(self.lexical) or not self.count():
+            return
+        page = self._batch_size(None)
+        offset = 0
+        while True:
+            found = self._backend.get(limit=page, offset=offset)
+            ids = found.get("ids", [])
+            if not ids:
+                break
+            self.lexical.add(ids, found["documents"], found["metadatas"])
+            offset += len(ids)
+        self.lexical.save()
+
+    def _batch_size(self, batch_size: int | None) -> int:
+        """Configured batch size, capped at the client's max batch size when it reports one."""
+        configured = get_config().get("vector_store", {}).get("batch_size", DEFAULT_BATCH_SIZE)
+        size = batch_size or configured
+        if self._backend.max_batch_size:
+            size = min(size, self._backend.max_batch_size)
+        return max(1, int(size))
+
+    def _existing_hashes(self, ids: list[str]) -> dict[str, str | None]:
+        """id -> stored content_hash for ids already in the collection."""
+        found = self._backend.get(ids=ids)
+        return {
+            cid: meta.get("content_hash") for cid, meta in zip(found["ids"], found["metadatas"])
+        }
 
     def search(self, query: str, n_results: int = 5, where: dict | None = None) -> list[dict]:
         """Search for relevant chunks."""
-        kwargs = {"n_results": n_results}
-        if where:
-            kwargs["where"] = where
-        results = self._collection.query(query_texts=[query], **kwargs)
-        docs = []
-        if results["documents"] and results["documents"][0]:
-            for i, doc in enumerate(results["documents"][0]):
-                meta = (results["metadatas"][0][i] if results["metadatas"] else {}) or {}
-                docs.append({"text": doc, "metadata": meta})
-        return docs
+        return self.search_many([query], n_results=n_results, where=where)[0]
+
+    def search_many(
+        self, queries: list[str], n_results: int = 5, where: dict | None = None
+    ) -> list[list[dict]]:
+        """
+        Search several queries at once: one embedding batch and one backend query.
+
+        Returns one result list per query, in input order. Results are served from the search
+        cache when the same (query, n_results, where) was searched since the last write.
+        """
+        if not queries:
+            return []
+        version = self._collection_version()
+        where_key = json.dumps(where, sort_keys=True, default=str) if where else ""
+        keys = [(q, n_results, where_key, version) for q in queries]
+        results: list[list[dict] | None] = [self._cache_get(k) for k in keys]
+        missing = list(dict.fromkeys(q for q, r in zip(queries, results) if r is None))
+        if missing:
+            batches = self._backend.query_many(self.embed(missing), n_results, where)
+            fresh = {
+                q: [
+                    {"id": cid, "text": doc, "metadata": meta}
+                    for cid, doc, meta in zip(r["ids"], r["documents"], r["metadatas"])
+                ]
+                for q, r in zip(missing, batches)
+            }
+            for q, docs in fresh.items():
+                self._cache_set((q, n_results, where_key, version), docs)
+            results = [
+                r if r is not None else copy.deepcopy(fresh[q]) for q, r in zip(queries, results)
+            ]
+        return results
+
+    def _collection_version(self) -> tuple[int, int]:
+        """
+        (in-process write counter, generation stamp). The stamp file is touched on every write,
+        so a reseed from another process (seed_vector_db.py) also invalidates cached searches.
+        """
+        try:
+            stamp = self._generation_path.stat().st_mtime_ns
+        except OSError:
+            stamp = 0
+        return self._version, stamp
+
+    def _bump_version(self) -> None:
+        with self._search_cache_lock:
+            self._version += 1
+            self._search_cache.clear()
+        try:
+            self._generation_path.parent.mkdir(parents=True, exist_ok=True)
+            self._generation_path.write_text(str(time.time_ns()), encoding="utf-8")
+        except OSError:
+            pass
+        # This process wrote the lexical index itself; it is current
+        self._lexical_stamp = self._collection_version()[1]
+
+    def _refresh_lexical(self) -> None:
+        """Reload the BM25 index if the collection was rewritten by another process."""
+        stamp = self._collection_version()[1]
+        if stamp != self._lexical_stamp:
+            self.lexical.reload()
+            self._lexical_stamp = stamp
+
+    def _cache_get(self, key: tuple) -> list[dict] | None:
+        if self._search_cache_entries <= 0:
+            return None
+        with self._search_cache_lock:
+            docs = self._search_cache.get(key)
+            if docs is None:
+                self.search_cache_misses += 1
+                return None
+            self._search_cache.move_to_end(key)
+            self.search_cache_hits += 1
+            return copy.deepcopy(docs)
+
+    def _cache_set(self, key: tuple, docs: list[dict]) -> None:
+        if self._search_cache_entries <= 0:
+            return
+        with self._search_cache_lock:
+            self._search_cache[key] = copy.deepcopy(docs)
+            self._search_cache.move_to_end(key)
+            while len(self._search_cache) > self._search_cache_entries:
+                self._search_cache.popitem(last=False)
+
+    def search_cache_stats(self) -> dict[str, Any]:
+        """Search cache hit/miss counters and hit rate."""
+        with self._search_cache_lock:
+            total = self.search_cache_hits + self.search_cache_misses
+            return {
+                "hits": self.search_cache_hits,
+                "misses": self.search_cache_misses,
+                "hit_rate": self.search_cache_hits / total if total else 0.0,
+                "entries": len(self._search_cache),
+            }
+
+    def hybrid_search(
+        self,
+        query: str,
+        cpt_code: str | None = None,
+        n_results: int = 5,
+        where: dict | None = None,
+    ) -> list[dict]:
+        """
+        Lexical (BM25) + vector search fused with reciprocal rank fusion.
+
+        With cpt_code, both searches are prefiltered to chunks whose metadata records that code;
+        if none do, the search falls back to the unfiltered query.
+        """
+        vs_config = get_config().get("vector_store", {})
+        candidates = max(n_results, int(vs_config.get("hybrid_candidates", 20)))
+        self._refresh_lexical()
+        self.ensure_lexical_index()
+        filters = [where] if where else []
+        if cpt_code:
+            cpt_where = _and_where(*filters, {cpt_metadata_key(cpt_code): True})
+            prefiltered = self._fused_search(query, candidates, cpt_where, vs_config)
+            if prefiltered:
+                return prefiltered[:n_results]
+        return self._fused_search(query, candidates, _and_where(*filters), vs_config)[:n_results]
+
+    def _fused_search(
+        self, query: str, candidates: int, where: dict | None, vs_config: dict
+    ) -> list[dict]:
+        vector_hits = self.search(query, n_results=candidates, where=where)
+        lexical_hits = self.lexical.search(query, n_results=candidates, where=where)
+        docs = {d["id"]: d for d in vector_hits if d.get("id")}
+        missing = [doc_id for doc_id, _ in lexical_hits if doc_id not in docs]
+        if missing:
+            found = self._backend.get(ids=missing)
+            for doc_id, text, meta in zip(
+                found.get("ids", []), found["documents"], found["metadatas"]
+            ):
+                docs[doc_id] = {"id": doc_id, "text": text, "metadata": meta or {}}
+        fused = reciprocal_rank_fusion(
+            [[d["id"] for d in vector_hits if d.get("id")], [doc_id for doc_id, _ in lexical_hits]],
+            k=int(vs_config.get("rrf_k", 60)),
+        )
+        return [{**docs[doc_id], "score": score} for doc_id, score in fused if doc_id in docs]
 
     def count(self) -> int:
         """Return number of chunks in collection."""
-        return self._collection.count()
+        return self._backend.count()
+
+
+def _chunk_metadata(chunk: dict) -> dict[str, Any]:
+    """Storable metadata for a chunk, with CPT code flags added if ingestion did not record them."""
+    meta = dict(chunk.get("metadata", {}))
+    for k, v in list(meta.items()):
+        if v is None or (isinstance(v, (list, dict)) and len(str(v)) > 500):
+            meta[k] = str(v)[:500]
+    meta.pop("content_hash", None)
+    if "cpt_codes" not in meta:
+        meta.update(cpt_metadata(chunk["text"]))
+    return meta
+
+
+def _and_where(*filters: dict) -> dict | None:
+    """Combine Chroma where filters (Chroma requires $and for more than one condition)."""
+    conditions = [{k: v} for f in filters if f for k, v in f.items()]
+    if not conditions:
+        return None
+    if len(conditions) == 1:
+        return conditions[0]
+    return {"$and": conditions}
+
+
+def _embedding_function(model: str) -> Any:
+    """Chroma embedding function for the configured model (sentence-transformers if no chromadb)."""
+    try:
+        from chromadb.utils import embedding_functions
+    except ImportError:
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError:
+            raise ImportError(
+                "chromadb or sentence-transformers required to embed text. "
+                "Install with: pip install chromadb"
+            ) from None
+        st_model = SentenceTransformer(model)
+        return lambda texts: st_model.encode(list(texts), normalize_embeddings=True).tolist()
+    if model == DEFAULT_EMBEDDING_MODEL:
+        return embedding_functions.DefaultEmbeddingFunction()
+    return embedding_functions.SentenceTransformerEmbeddingFunction(model_name=model)
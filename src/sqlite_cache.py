@@ -0,0 +1,108 @@
+"""SQLite-backed JSON key/value cache shared by the lookup and LLM cache layers."""
+
+import json
+import sqlite3
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+
+class SQLiteCache:
+    """
+    Persistent key/value cache on a local SQLite file.
+
+    Values are stored as JSON. Entries can expire (ttl_seconds) and the table can be capped
+    (max_entries); when over the cap the least recently used entries are evicted.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        table: str = "cache",
+        ttl_seconds: float | None = None,
+        max_entries: int | None = None,
+    ) -> None:
+        if not table.isidentifier():
+            raise ValueError(f"Invalid table name: {table}")
+        self.path = Path(path)
+        self.table = table
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created REAL NOT NULL, accessed REAL NOT NULL, expires_at REAL)"
+            )
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_accessed ON {table} (accessed)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Short-lived connection; commits on success and always closes."""
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key: str) -> Any | None:
+        """Return cached value or None if missing/expired."""
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at is not None and expires_at < now:
+                conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                return None
+            conn.execute(f"UPDATE {self.table} SET accessed = ? WHERE key = ?", (now, key))
+        try:
+            return json.loads(value)
+        except json.JSONDecodeError:
+            return None
+
+    def set(self, key: str, value: Any, ttl_seconds: float | None = None) -> None:
+        """Store value under key (overwrites). ttl_seconds overrides the cache default."""
+        now = time.time()
+        ttl = ttl_seconds if ttl_seconds is not None else self.ttl_seconds
+        expires_at = now + ttl if ttl else None
+        payload = json.dumps(value)
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, created, accessed, expires_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, payload, now, now, expires_at),
+            )
+            conn.execute(
+                f"DELETE FROM {self.table} WHERE expires_at IS NOT NULL AND expires_at < ?", (now,)
+            )
+            if self.max_entries:
+                conn.execute(
+                    f"DELETE FROM {self.table} WHERE key IN ("
+                    f"SELECT key FROM {self.table} ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+
+    def delete(self, key: str) -> None:
+        """Remove key if present."""
+        with self._lock, self._connect() as conn:
+            conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock, self._connect() as conn:
+            conn.execute(f"DELETE FROM {self.table}")
+
+    def __len__(self) -> int:
+        with self._lock, self._connect() as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
@@ -10,3 +10,12 @@ def sample_config():
         "paths": {"cpt_file": "data/cpt/cpt_codes.json"},
         "ollama": {"model": "llama3:8b", "timeout": 60},
     }
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(tmp_path, monkeypatch):
+    """Point on-disk caches at a per-test directory so tests never share cached results."""
+    from src.config import get_config
+
+    paths = get_config().setdefault("paths", {})
+    monkeypatch.setitem(paths, "cache_dir", str(tmp_path / "cache"))
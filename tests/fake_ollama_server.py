@@ -0,0 +1,398 @@
+"""
+Local stand-in for an Ollama server, for offline latency, load and fault testing.
+
+Speaks the subset of the Ollama HTTP API the clients use (/api/chat streaming and
+non-streaming, /api/generate, /api/tags, /api/ps) and answers each prompt type with canned
+JSON. Generation is simulated with per-token delays, and requests are serialized
+`parallel` at a time the way a CPU-only Ollama runs them. Faults (hangs, malformed JSON,
+HTTP errors, dropped connections) can be injected deterministically or at seeded random
+rates, so the real client, cache and scheduler can be exercised reproducibly.
+
+Test and benchmark helper only (not part of the src package).
+
+Usage:
+    python -m tests.fake_ollama_server --port 11435 --token-latency 0.02
+    (then point ollama.base_url at http://127.0.0.1:11435)
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+from src.llm.prompt_manager import load_prompt
+
+FAULT_KINDS = ("timeout", "malformed", "error", "disconnect")
+
+DEFAULT_RESPONSES: dict[str, dict[str, Any]] = {
+    "input_parser": {"procedure": "brain MRI with contrast", "payer": "Aetna"},
+    "cpt_mapper": {
+        "code": "70553",
+        "description": "MRI brain without and with contrast",
+        "confidence": "high",
+    },
+    "policy_extractor": {
+        "prior_auth_required": True,
+        "documentation_required": ["Clinical notes supporting the study", "Prior imaging results"],
+        "medical_necessity_criteria": ["Neurologic symptoms not explained by prior imaging"],
+        "common_denial_reasons": ["Missing clinical notes"],
+        "source_section": "Advanced imaging policy",
+    },
+    "staff_rewriter": {
+        "documentation_required": ["Attach the provider's notes explaining why the MRI is needed"],
+        "medical_necessity_criteria": ["Patient has new neurologic symptoms"],
+        "common_denial_reasons": ["Notes missing from the request"],
+    },
+}
+
+# Splits generated text into simulated tokens (a word with its leading space, or punctuation)
+_TOKEN_RE = re.compile(r"\s*\w+|\s*[^\w\s]+|\s+")
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _prompt_signatures() -> dict[str, str]:
+    """Prompt name -> fixed opening text of its template, used to recognise rendered prompts."""
+    signatures = {}
+    for name in DEFAULT_RESPONSES:
+        try:
+            first_line = load_prompt(name).splitlines()[0]
+        except (FileNotFoundError, IndexError):
+            continue
+        signatures[name] = first_line.split("{", 1)[0].strip()
+    return signatures
+
+
+class FakeOllamaServer:
+    """
+    Threaded HTTP server imitating Ollama. Use as a context manager or start()/stop().
+
+    token_latency and prefill_latency are seconds per generated / prompt token;
+    load_seconds is charged once until the model is loaded (chat or warm-up), and a
+    keep_alive of 0 unloads it again. fault_rates maps fault kinds to probabilities;
+    inject() queues faults for the next requests. Streams stop generating when the client
+    disconnects (counted in stats()["cancelled"]).
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        models: tuple[str, ...] = ("qwen2.5-coder:3b",),
+        token_latency: float = 0.0,
+        prefill_latency: float = 0.0,
+        load_seconds: float = 0.0,
+        parallel: int = 1,
+        responses: dict[str, Any] | None = None,
+        trailing_text: str = " Let me know if you need anything else.",
+        fault_rates: dict[str, float] | None = None,
+        hang_seconds: float = 30.0,
+        seed: int = 0,
+    ) -> None:
+        self.models = list(models)
+        self.token_latency = token_latency
+        self.prefill_latency = prefill_latency
+        self.load_seconds = load_seconds
+        self.responses = {**DEFAULT_RESPONSES, **(responses or {})}
+        self.trailing_text = trailing_text
+        self.fault_rates = dict(fault_rates or {})
+        self.hang_seconds = hang_seconds
+        self._rng = random.Random(seed)
+        self._signatures = _prompt_signatures()
+        self._slots = threading.Semaphore(parallel)
+        self._lock = threading.Lock()
+        self._loaded: set[str] = set()
+        self._injected: deque[str] = deque()
+        self._stats: Counter[str] = Counter()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeOllamaServer":
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            kwargs={"poll_interval": 0.05},
+            name="fake-ollama",
+            daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join(5)
+
+    def __enter__(self) -> "FakeOllamaServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    def inject(self, kind: str, times: int = 1) -> None:
+        """Make the next `times` chat/generate requests fail with fault kind."""
+        if kind not in FAULT_KINDS:
+            raise ValueError(f"Unknown fault {kind!r}; expected one of {FAULT_KINDS}")
+        with self._lock:
+            self._injected.extend([kind] * times)
+
+    def stats(self) -> dict[str, int]:
+        """Request, token, cancellation and fault counters (faults as fault_<kind>)."""
+        with self._lock:
+            return dict(self._stats)
+
+    def _count(self, key: str, n: int = 1) -> None:
+        with self._lock:
+            self._stats[key] += n
+
+    def _next_fault(self) -> str | None:
+        with self._lock:
+            if self._injected:
+                return self._injected.popleft()
+            for kind in FAULT_KINDS:
+                rate = self.fault_rates.get(kind, 0.0)
+                if rate and self._rng.random() < rate:
+                    return kind
+        return None
+
+    def prompt_type(self, prompt: str) -> str | None:
+        """Which prompt template rendered this text, if any."""
+        for name, signature in self._signatures.items():
+            if signature and prompt.lstrip().startswith(signature):
+                return name
+        return None
+
+    def reply_for(self, prompt: str, fault: str | None = None) -> str:
+        """Generated text for a prompt: canned JSON plus trailing prose, or "ok" if unrecognised."""
+        kind = self.prompt_type(prompt)
+        if kind is None:
+            return "ok"
+        body = json.dumps(self.responses[kind])
+        if fault == "malformed":
+            body = body[: max(1, len(body) // 2)].replace('"', "'", 1)
+        return body + self.trailing_text
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                if self.path == "/api/tags":
+                    models = [
+                        {
+                            "name": m,
+                            "model": m,
+                            "modified_at": _now(),
+                            "size": 0,
+                            "digest": "",
+                            "details": {},
+                        }
+                        for m in server.models
+                    ]
+                    self._json(200, {"models": models})
+                elif self.path == "/api/ps":
+                    with server._lock:
+                        loaded = sorted(server._loaded)
+                    self._json(
+                        200, {"models": [{"name": m, "model": m, "size": 0} for m in loaded]}
+                    )
+                elif self.path in ("/", "/api/version"):
+                    self._json(200, {"version": "0.0.0-fake"})
+                else:
+                    self._json(404, {"error": "not found"})
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    body = json.loads(self.rfile.read(length) or b"{}")
+                except json.JSONDecodeError:
+                    self._json(400, {"error": "invalid JSON body"})
+                    return
+                if self.path not in ("/api/chat", "/api/generate"):
+                    self._json(404, {"error": "not found"})
+                    return
+                model = body.get("model", "")
+                if model not in server.models:
+                    self._json(404, {"error": f"model '{model}' not found, try pulling it first"})
+                    return
+                server._count("requests")
+                fault = server._next_fault()
+                if fault is not None:
+                    server._count(f"fault_{fault}")
+                if fault == "error":
+                    self._json(503, {"error": "server busy (injected fault)"})
+                    return
+                if fault == "disconnect":
+                    self.close_connection = True
+                    self.connection.close()
+                    return
+                if fault == "timeout":
+                    time.sleep(server.hang_seconds)
+                if self.path == "/api/generate":
+                    prompt = user_text = body.get("prompt") or ""
+                else:
+                    messages = body.get("messages", [])
+                    prompt = "\n".join(m.get("content", "") for m in messages)
+                    user_text = next(
+                        (
+                            m.get("content", "")
+                            for m in reversed(messages)
+                            if m.get("role") == "user"
+                        ),
+                        "",
+                    )
+                with server._slots:
+                    self._generate(body, model, prompt, user_text, fault)
+
+            def _generate(
+                self,
+                body: dict[str, Any],
+                model: str,
+                prompt: str,
+                user_text: str,
+                fault: str | None,
+            ) -> None:
+                start = time.perf_counter()
+                with server._lock:
+                    cold = model not in server._loaded
+                    server._loaded.add(model)
+                if cold and server.load_seconds:
+                    time.sleep(server.load_seconds)
+                prompt_tokens = len(_TOKEN_RE.findall(prompt))
+                if server.prefill_latency:
+                    time.sleep(prompt_tokens * server.prefill_latency)
+                if body.get("keep_alive") in (0, "0", "0s"):
+                    with server._lock:
+                        server._loaded.discard(model)
+                is_chat = self.path == "/api/chat"
+                text = server.reply_for(user_text, fault) if user_text else ""
+                tokens = _TOKEN_RE.findall(text)
+                done = {
+                    "model": model,
+                    "created_at": _now(),
+                    "done": True,
+                    "done_reason": "stop",
+                    "prompt_eval_count": prompt_tokens,
+                    "eval_count": len(tokens),
+                }
+                if not body.get("stream", True):
+                    time.sleep(len(tokens) * server.token_latency)
+                    server._count("tokens", len(tokens))
+                    message = (
+                        {"message": {"role": "assistant", "content": text}}
+                        if is_chat
+                        else {"response": text}
+                    )
+                    done["total_duration"] = int((time.perf_counter() - start) * 1e9)
+                    self._json(200, {**done, **message})
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                try:
+                    for token in tokens:
+                        time.sleep(server.token_latency)
+                        part = {"role": "assistant", "content": token}
+                        self._chunk(
+                            {
+                                "model": model,
+                                "created_at": _now(),
+                                "done": False,
+                                **({"message": part} if is_chat else {"response": token}),
+                            }
+                        )
+                        server._count("tokens")
+                    done["total_duration"] = int((time.perf_counter() - start) * 1e9)
+                    empty = (
+                        {"message": {"role": "assistant", "content": ""}}
+                        if is_chat
+                        else {"response": ""}
+                    )
+                    self._chunk({**done, **empty})
+                    self.wfile.write(b"0\r\n\r\n")
+                    self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    # Client closed the stream: stop generating, like Ollama
+                    server._count("cancelled")
+                    self.close_connection = True
+
+            def _chunk(self, payload: dict[str, Any]) -> None:
+                data = (json.dumps(payload) + "\n").encode("utf-8")
+                self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+                self.wfile.flush()
+
+            def _json(self, status: int, payload: dict[str, Any]) -> None:
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fake Ollama server for offline testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--model", action="append", help="Model to serve (repeatable)")
+    parser.add_argument(
+        "--token-latency", type=float, default=0.02, help="Seconds per generated token"
+    )
+    parser.add_argument(
+        "--prefill-latency", type=float, default=0.0, help="Seconds per prompt token"
+    )
+    parser.add_argument("--load-seconds", type=float, default=0.0, help="Cold model load time")
+    parser.add_argument("--parallel", type=int, default=1, help="Concurrent generations")
+    for kind in FAULT_KINDS:
+        parser.add_argument(
+            f"--{kind}-rate", type=float, default=0.0, help=f"Probability of a {kind} fault"
+        )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = FakeOllamaServer(
+        host=args.host,
+        port=args.port,
+        models=tuple(args.model or ["qwen2.5-coder:3b"]),
+        token_latency=args.token_latency,
+        prefill_latency=args.prefill_latency,
+        load_seconds=args.load_seconds,
+        parallel=args.parallel,
+        fault_rates={kind: getattr(args, f"{kind}_rate") for kind in FAULT_KINDS},
+        seed=args.seed,
+    )
+    print(f"Fake Ollama listening on {server.url} (Ctrl+C to stop)")
+    server.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Tests for the asyncio lookup pipeline."""
+
+import asyncio
+import json
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+from src.lookup.async_lookup import AsyncCPTLookup, AsyncPolicyLookup
+from src.lookup.cpt_lookup import CPTLookup
+from src.lookup.deadline import Deadline
+from src.lookup.policy_lookup import PolicyLookup, _Retrieved
+
+
+def _cms_mock():
+    cms = MagicMock()
+    cms.cache_path = "missing.json"
+    cms.get_requirements.return_value = {
+        "prior_auth_required": True,
+        "documentation_required": ["Notes"],
+        "medical_necessity_criteria": [],
+        "common_denial_reasons": [],
+        "source_section": "CMS MCD Test",
+        "answer_tier": "source",
+    }
+    return cms
+
+
+def test_async_many_matches_sync():
+    """Async fan-out returns the same results as the threaded version."""
+    payers = ["Medicare", "cms", "UnknownPayerXYZ"]
+    sync = PolicyLookup(cms_lookup=_cms_mock())
+    expected = sync.get_requirements_many("70553", payers)
+    lookup = AsyncPolicyLookup(PolicyLookup(cms_lookup=_cms_mock()))
+    results = asyncio.run(lookup.get_requirements_many("70553", payers))
+    assert results == expected
+
+
+def test_async_many_logs_failed_payer(monkeypatch, caplog):
+    """A payer whose lookup raises is logged and falls back to default requirements."""
+    lookup = AsyncPolicyLookup(PolicyLookup(cms_lookup=_cms_mock()))
+
+    async def boom(*args, **kwargs):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(lookup, "get_requirements", boom)
+    with caplog.at_level("ERROR", logger="src.lookup.async_lookup"):
+        results = asyncio.run(lookup.get_requirements_many("70553", ["Aetna"]))
+    assert results["Aetna"]["answer_tier"] == "default"
+    assert "Requirements lookup failed for payer Aetna" in caplog.text
+
+
+def test_async_client_is_awaited_for_extraction(tmp_path):
+    """Coroutine clients are awaited directly; LLM extraction feeds the result."""
+    (tmp_path / "mri.json").write_text(
+        json.dumps({"chunks": [{"text": "CPT 70553 prior auth", "metadata": {"payer": "Anthem"}}]}),
+        encoding="utf-8",
+    )
+    client = MagicMock()
+    client.model = "m"
+    client.extract_json = AsyncMock(
+        return_value={"prior_auth_required": True, "documentation_required": ["Notes"]}
+    )
+    lookup = AsyncPolicyLookup(PolicyLookup())
+    retrieved = lookup.sync._retrieve_source(
+        {"type": "parsed_json", "parsed_dir": str(tmp_path)}, "70553", "Anthem", Deadline()
+    )
+    r = asyncio.run(lookup._resolve(retrieved, "70553", client, Deadline()))
+    assert r["answer_tier"] == "llm_extract"
+    assert r["documentation_required"] == ["Notes"]
+    client.extract_json.assert_awaited_once()
+
+
+def test_async_deadline_cancels_llm_and_uses_heuristic():
+    """An LLM call past the deadline is cancelled and the heuristic parse is returned."""
+    async def slow(*args, **kwargs):
+        await asyncio.sleep(1)
+        return {}
+
+    client = MagicMock()
+    client.model = "m"
+    client.extract_json = slow
+    chunk = {
+        "text": "CPT 70553 prior authorization\n- Clinical notes for the study",
+        "metadata": {"payer": "Anthem"},
+    }
+    retrieved = _Retrieved(policy_chunks=[chunk["text"]], chunk=chunk)
+    deadline = Deadline(0.05)
+    lookup = AsyncPolicyLookup(PolicyLookup())
+    start = time.monotonic()
+    r = asyncio.run(lookup._resolve(retrieved, "70553", client, deadline))
+    assert time.monotonic() - start < 0.5
+    assert r["answer_tier"] == "heuristic"
+    assert deadline.cut_steps == ["llm_extract"]
+
+
+def test_async_cpt_lookup_llm_fallback():
+    """Low-confidence keyword results fall back to the awaited LLM mapping."""
+    sync = CPTLookup()
+    code = next(iter(sync.cpt_codes))
+    client = MagicMock()
+    client.extract_json = AsyncMock(return_value={"code": code, "confidence": "medium"})
+    r = asyncio.run(AsyncCPTLookup(sync).find_code_with_llm("zz qq", client))
+    assert r["code"] == code
+    assert r["match"] == "llm"
+
+
+def test_async_speculative_cpt_lookup_cancels_llm(monkeypatch):
+    """Speculative mode awaits the LLM for no keyword match and cancels it for a confident one."""
+    sync = CPTLookup()
+    code = next(iter(sync.cpt_codes))
+    cancelled = []
+
+    async def extract(*args, **kwargs):
+        try:
+            await asyncio.sleep(0.05)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+        return {"code": code, "confidence": "medium"}
+
+    client = MagicMock()
+    client.extract_json = extract
+    lookup = AsyncCPTLookup(sync)
+    r = asyncio.run(lookup.find_code_with_llm("zz qq", client, speculative=True))
+    assert r["match"] == "llm" and r["code"] == code
+    assert not cancelled
+
+    from src.config import get_config
+
+    # Force speculation on a query keywords resolve confidently
+    monkeypatch.setitem(get_config().setdefault("cpt_lookup", {}), "speculative_min_hits", 99)
+    r = asyncio.run(lookup.find_code_with_llm("knee MRI", client, speculative=True))
+    assert r["match"] == "keyword"
+    assert cancelled == [True]
@@ -35,3 +35,42 @@ def test_cms_lookup_schema():
     assert isinstance(r["documentation_required"], list)
     assert isinstance(r["medical_necessity_criteria"], list)
     assert isinstance(r["common_denial_reasons"], list)
+
+
+def _write_cache(tmp_path, entry):
+    path = tmp_path / "articles_cache.json"
+    path.write_text(json.dumps({"70553": entry}), encoding="utf-8")
+    return path
+
+
+def test_cms_lookup_serves_precomputed_staff_rewrite(tmp_path):
+    """Precomputed staff bullets replace raw bullets when made from the current bullets."""
+    from src.lookup.cms_policy_lookup import STAFF_REWRITE_KEY, requirements_hash
+
+    entry = {
+        "prior_auth_required": True,
+        "documentation_required": ["Raw documentation text"],
+        "medical_necessity_criteria": ["Raw criteria"],
+        "common_denial_reasons": ["Raw denial"],
+        "source_section": "CMS MCD Test",
+    }
+    entry[STAFF_REWRITE_KEY] = {
+        "documentation_required": ["Get the imaging order"],
+        "source_hash": requirements_hash(entry),
+    }
+    r = CMSPolicyLookup(cache_path=_write_cache(tmp_path, entry)).get_requirements("70553")
+    assert r["documentation_required"] == ["Get the imaging order"]
+    assert r["medical_necessity_criteria"] == ["Raw criteria"]
+    assert STAFF_REWRITE_KEY not in r
+
+
+def test_cms_lookup_ignores_stale_staff_rewrite(tmp_path):
+    """A rewrite made from different bullets is not served."""
+    entry = {
+        "prior_auth_required": True,
+        "documentation_required": ["Raw documentation text"],
+        "source_section": "CMS MCD Test",
+        "staff_rewrite": {"documentation_required": ["Old"], "source_hash": "stale"},
+    }
+    r = CMSPolicyLookup(cache_path=_write_cache(tmp_path, entry)).get_requirements("70553")
+    assert r["documentation_required"] == ["Raw documentation text"]
@@ -0,0 +1,43 @@
+"""Tests for CPT -> chunk index."""
+
+import json
+
+from src.ingestion.cpt_index import (
+    CPT_INDEX_FILENAME,
+    build_cpt_index,
+    extract_cpt_codes,
+    load_cpt_index,
+    write_cpt_index,
+)
+
+
+def _write_policy(path, texts):
+    chunks = [
+        {"text": t, "chunk_index": i, "metadata": {"payer": "Anthem"}} for i, t in enumerate(texts)
+    ]
+    path.write_text(json.dumps({"source": path.name, "chunks": chunks}), encoding="utf-8")
+
+
+def test_extract_cpt_codes_token_boundaries():
+    """Codes match only as whole tokens."""
+    text = "CPT 70553, 73721-RT and G0121; ignore 170553, 70553.5 and ABC12345"
+    assert extract_cpt_codes(text) == {"70553", "73721", "G0121"}
+
+
+def test_build_cpt_index_postings(tmp_path):
+    """Index maps codes to (file, chunk position) and skips the index file itself."""
+    _write_policy(
+        tmp_path / "mri.json", ["Intro text", "CPT 70553 requires prior auth", "70551 and 70553"]
+    )
+    write_cpt_index(tmp_path)
+    index = build_cpt_index(tmp_path)
+    assert index["files"] == ["mri.json"]
+    assert index["postings"]["70553"] == [["mri.json", 1], ["mri.json", 2]]
+    assert index["postings"]["70551"] == [["mri.json", 2]]
+
+
+def test_load_cpt_index_missing_or_bad(tmp_path):
+    """Missing or corrupt index loads as None."""
+    assert load_cpt_index(tmp_path) is None
+    (tmp_path / CPT_INDEX_FILENAME).write_text("{not json", encoding="utf-8")
+    assert load_cpt_index(tmp_path) is None
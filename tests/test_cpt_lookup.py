@@ -43,3 +43,17 @@ def test_find_code_returns_dict():
     assert "description" in r
     assert "match" in r
     assert "confidence" in r
+
+
+def test_speculative_mode_falls_back_for_clients_without_cancel():
+    """A client whose extract_json takes no cancel= is used sequentially, not with a TypeError."""
+    lookup = CPTLookup()
+    code = next(iter(lookup.cpt_codes))
+
+    class PlainClient:
+        def extract_json(self, prompt, schema=None, priority="normal"):
+            return {"code": code, "confidence": "medium"}
+
+    r = lookup.find_code_with_llm("zz qq", PlainClient(), speculative=True)
+    assert r["code"] == code
+    assert r["match"] == "llm"
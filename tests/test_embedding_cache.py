@@ -0,0 +1,23 @@
+"""Tests for the persistent embedding cache."""
+
+from src.lookup.embedding_cache import EmbeddingCache
+
+
+def test_embed_computes_misses_once_and_round_trips(tmp_path):
+    """Only uncached (deduplicated) texts reach the model; vectors survive a reopen."""
+    calls = []
+
+    def embed_fn(texts):
+        calls.append(list(texts))
+        return [[0.5, float(len(t))] for t in texts]
+
+    cache = EmbeddingCache(tmp_path / "emb.sqlite")
+    assert cache.embed("m", ["a", "bb", "a"], embed_fn) == [[0.5, 1.0], [0.5, 2.0], [0.5, 1.0]]
+    assert calls == [["a", "bb"]]
+
+    reopened = EmbeddingCache(tmp_path / "emb.sqlite")
+    assert reopened.embed("m", ["bb"], embed_fn) == [[0.5, 2.0]]
+    assert calls == [["a", "bb"]]
+    reopened.embed("other-model", ["bb"], embed_fn)
+    assert calls[-1] == ["bb"]
+    assert len(reopened) == 3
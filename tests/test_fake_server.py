@@ -0,0 +1,113 @@
+"""Tests for the real OllamaClient HTTP path against the fake Ollama server."""
+
+import time
+
+import pytest
+
+pytest.importorskip("ollama")
+
+from src.llm.prompt_manager import format_prompt
+from src.llm.schemas import InputParse
+from tests.fake_ollama_server import DEFAULT_RESPONSES, FakeOllamaServer
+
+
+@pytest.fixture
+def fast_retries(monkeypatch):
+    from src.config import get_config
+
+    ollama_config = get_config().setdefault("ollama", {})
+    monkeypatch.setitem(ollama_config, "retry_backoff_seconds", 0.01)
+    monkeypatch.setitem(ollama_config, "stream_json", True)
+
+
+def test_client_round_trip_and_stream_cancellation(fast_retries):
+    """Canned JSON per prompt type; streaming stops generating once the object closes."""
+    from src.llm.ollama_client import OllamaClient
+
+    prompt = format_prompt("input_parser", query="brain MRI, Aetna")
+    with FakeOllamaServer(token_latency=0.01) as server:
+        client = OllamaClient(base_url=server.url)
+        assert client.health()["ok"]
+        assert client.query("hello", cache=False) == "ok"
+        expected = DEFAULT_RESPONSES["input_parser"]
+        assert client.extract_json(prompt, schema=InputParse, cache=False) == expected
+        assert client.extract_json(prompt, stream=False, cache=False) == expected
+        time.sleep(0.3)
+        stats = server.stats()
+    assert stats["requests"] == 3
+    assert stats["cancelled"] == 1
+
+
+def test_client_handles_injected_faults(fast_retries):
+    """503s and dropped connections are retried; malformed JSON comes back as raw."""
+    from src.llm.ollama_client import OllamaClient
+
+    prompt = format_prompt("input_parser", query="knee MRI, Cigna")
+    with FakeOllamaServer() as server:
+        client = OllamaClient(base_url=server.url)
+        server.inject("error")
+        server.inject("disconnect")
+        assert client.extract_json(prompt, cache=False) == DEFAULT_RESPONSES["input_parser"]
+        server.inject("malformed")
+        assert "raw" in client.extract_json(prompt, cache=False)
+        stats = server.stats()
+    assert stats["fault_error"] == stats["fault_disconnect"] == stats["fault_malformed"] == 1
+    assert stats["requests"] == 4
+
+
+def test_warm_up_pays_model_load_once():
+    """The cold model load is charged to warm_up, not to the first query."""
+    from src.llm.ollama_client import OllamaClient
+
+    with FakeOllamaServer(token_latency=0.0, load_seconds=0.2) as server:
+        client = OllamaClient(base_url=server.url)
+        assert not client.health()["model_loaded"]
+        assert client.warm_up()
+        assert client.health()["model_loaded"]
+        start = time.perf_counter()
+        client.query("hello", cache=False)
+        assert time.perf_counter() - start < 0.2
+
+
+def test_speculative_cpt_mapping(fast_retries, monkeypatch):
+    """Ambiguous queries use the concurrent LLM mapping; it is cancelled when keywords suffice."""
+    from src.config import get_config
+    from src.llm.ollama_client import OllamaClient
+    from src.lookup.cpt_lookup import CPTLookup
+
+    lookup = CPTLookup()
+    with FakeOllamaServer(token_latency=0.01) as server:
+        client = OllamaClient(base_url=server.url)
+        r = lookup.find_code_with_llm("zz qq", client, speculative=True)
+        assert r["code"] == DEFAULT_RESPONSES["cpt_mapper"]["code"]
+        assert r["match"] == "llm"
+
+        # Force speculation on a query keywords resolve confidently
+        monkeypatch.setitem(get_config().setdefault("cpt_lookup", {}), "speculative_min_hits", 99)
+        time.sleep(0.3)
+        before = server.stats()
+        r = lookup.find_code_with_llm("knee MRI", client, speculative=True)
+        assert r["match"] == "keyword"
+        time.sleep(0.3)
+        stats = server.stats()
+    # Either never sent, or its stream was closed mid-generation
+    assert stats["requests"] - before["requests"] == stats["cancelled"] - before["cancelled"]
+
+
+def test_deadline_cut_releases_scheduler_slot(fast_retries):
+    """A step cut by the deadline stops its generation instead of holding the LLM slot."""
+    from src.llm.ollama_client import OllamaClient
+    from src.llm.scheduler import LLMScheduler
+    from src.lookup.deadline import Deadline, DeadlineExceededError
+
+    prompt = format_prompt("input_parser", query="brain MRI, Aetna")
+    scheduler = LLMScheduler.from_config()
+    with FakeOllamaServer(token_latency=0.2) as server:
+        client = OllamaClient(base_url=server.url)
+        with pytest.raises(DeadlineExceededError):
+            Deadline(0.3).run("llm_extract", client.extract_json, prompt, cache=False)
+        # Stopped at the next token (every 0.2 s), well before the ~25-token reply finishes
+        time.sleep(0.6)
+        assert scheduler.stats()["inflight"] == 0
+        time.sleep(0.4)
+        assert server.stats().get("cancelled") == 1
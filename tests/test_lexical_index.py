@@ -0,0 +1,41 @@
+"""Tests for the BM25 lexical index."""
+
+import pytest
+
+from src.lookup.lexical_index import BM25Index, matches_where, reciprocal_rank_fusion
+
+
+def test_bm25_ranks_exact_code_and_persists(tmp_path):
+    """Exact code tokens rank first; filters apply; the index round-trips through disk."""
+    index = BM25Index(tmp_path / "_lexical.json")
+    index.add(
+        ["a", "b", "c"],
+        ["MRI brain 70551", "MRI brain 70553 prior authorization", "knee arthroscopy 29881"],
+        [{"payer": "Aetna"}, {"payer": "Aetna"}, {"payer": "Cigna"}],
+    )
+    assert index.search("CPT 70553 prior authorization")[0][0] == "b"
+    assert [i for i, _ in index.search("mri", where={"payer": "Cigna"})] == []
+    index.save()
+
+    reloaded = BM25Index(tmp_path / "_lexical.json")
+    assert len(reloaded) == 3
+    reloaded.remove(["b"])
+    assert [i for i, _ in reloaded.search("70553")] == []
+
+
+def test_matches_where_and_rrf():
+    """Chroma-style filters and reciprocal rank fusion."""
+    meta = {"payer": "Aetna", "cpt_70553": True}
+    assert matches_where(meta, {"$and": [{"payer": "Aetna"}, {"cpt_70553": True}]})
+    assert matches_where(meta, {"payer": {"$in": ["Aetna", "Cigna"]}})
+    assert not matches_where(meta, {"payer": {"$ne": "Aetna"}})
+    fused = reciprocal_rank_fusion([["x", "y"], ["y", "z"]])
+    assert fused[0][0] == "y"
+
+
+def test_matches_where_rejects_unsupported_operators():
+    """Unknown operators raise instead of silently matching everything."""
+    with pytest.raises(ValueError):
+        matches_where({"year": 2024}, {"year": {"$gt": 2020}})
+    with pytest.raises(ValueError):
+        matches_where({"payer": "Aetna"}, {"$not": {"payer": "Aetna"}})
@@ -3,7 +3,13 @@
 import pytest
 
 from src.llm.json_extractor import extract_json, extract_json_with_fallback
-from src.llm.prompt_manager import load_prompt, format_prompt, get_prompts_dir
+from src.llm.prompt_manager import (
+    build_prompt,
+    format_prompt,
+    get_prompts_dir,
+    get_token_counter,
+    load_prompt,
+)
 
 
 def test_extract_json_simple():
@@ -25,6 +31,21 @@ def test_extract_json_no_json_returns_none():
     assert extract_json("No JSON here") is None
 
 
+def test_extract_json_prose_with_braces_after_object():
+    """Trailing prose containing braces does not hide the object."""
+    assert extract_json('{"code": "70553"} note: use {x} later') == {"code": "70553"}
+
+
+def test_json_object_scanner_incremental():
+    """Scanner completes only when the top-level object closes, across fragments."""
+    from src.llm.json_extractor import JsonObjectScanner
+    scanner = JsonObjectScanner()
+    assert scanner.feed('Result: {"a": "x}{\\"", ') is None
+    assert scanner.feed('"b": {"c": [1, 2]}') is None
+    assert scanner.feed("} and more") == {"a": 'x}{"', "b": {"c": [1, 2]}}
+    assert scanner.done
+
+
 def test_extract_json_with_fallback():
     """Fallback returns dict with raw text when no JSON."""
     result = extract_json_with_fallback("No JSON")
@@ -50,3 +71,51 @@ def test_get_prompts_dir():
     path = get_prompts_dir()
     assert path.exists()
     assert "prompts" in str(path)
+
+
+def test_build_prompt_packs_chunks_by_relevance_within_budget():
+    """Whole chunks are packed in order; the first that does not fit is cut at a sentence."""
+    counter = get_token_counter()
+    overhead = counter.count(format_prompt("policy_extractor", cpt_code="70553", policy_text=""))
+    chunks = [
+        "First chunk. " * 20,
+        "Second chunk sentence one. Second chunk sentence two.",
+        "Third.",
+    ]
+    room = counter.count(chunks[0] + "\n\n" + "Second chunk sentence one.")
+    built = build_prompt(
+        "policy_extractor",
+        pack="policy_text",
+        chunks=chunks,
+        budget=overhead + room,
+        cpt_code="70553",
+    )
+    assert built.packed == chunks[0] + "\n\nSecond chunk sentence one."
+    assert built.chunks_used == 2
+    assert built.truncated
+    assert built.tokens <= overhead + room
+    assert "70553" in built.text
+
+    unbudgeted = build_prompt(
+        "policy_extractor", pack="policy_text", chunks=chunks, budget=None, cpt_code="70553"
+    )
+    assert unbudgeted.packed == "\n\n".join(chunks)
+    assert not unbudgeted.truncated
+    with pytest.raises(ValueError):
+        build_prompt("policy_extractor", pack="policy_text", chunks=chunks, budget=0, cpt_code="1")
+
+
+def test_build_prompt_cuts_oversized_chunk_between_words():
+    """A single chunk with no sentence boundary inside the budget is cut at a word gap."""
+    counter = get_token_counter()
+    overhead = counter.count(format_prompt("policy_extractor", cpt_code="1", policy_text=""))
+    built = build_prompt(
+        "policy_extractor",
+        pack="policy_text",
+        chunks=["word " * 500],
+        budget=overhead + 30,
+        cpt_code="1",
+    )
+    assert built.packed
+    assert built.packed.endswith("word")
+    assert counter.count(built.packed) <= 30
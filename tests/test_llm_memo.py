@@ -0,0 +1,47 @@
+"""Tests for LLM output memoization."""
+
+from unittest.mock import MagicMock
+
+from src.llm.llm_memo import LLMMemo
+from src.lookup.policy_lookup import PolicyLookup, _rewrite_for_staff
+
+
+def _client(payload):
+    client = MagicMock()
+    client.model = "qwen2.5-coder:3b"
+    client.extract_json.return_value = payload
+    return client
+
+
+def test_make_key_depends_on_inputs_and_model():
+    """Key changes with rendered inputs and model, not with kwarg order."""
+    k = LLMMemo.make_key("staff_rewriter", "m1", requirements_json="{}")
+    assert k == LLMMemo.make_key("staff_rewriter", "m1", requirements_json="{}")
+    assert k != LLMMemo.make_key("staff_rewriter", "m2", requirements_json="{}")
+    assert k != LLMMemo.make_key("staff_rewriter", "m1", requirements_json="{ }")
+    key = LLMMemo.make_key("policy_extractor", "m", cpt_code="1", policy_text="t")
+    assert key == LLMMemo.make_key("policy_extractor", "m", policy_text="t", cpt_code="1")
+
+
+def test_rewrite_memoized_across_lookups(tmp_path):
+    """Same bullets are rewritten once, even for different CPTs."""
+    memo = LLMMemo(tmp_path / "memo.sqlite")
+    client = _client({"documentation_required": ["Get the MRI order"]})
+    raw = {"documentation_required": ["Order"], "source_section": "CMS MCD L1"}
+    first = _rewrite_for_staff(raw, client, memo)
+    second = _rewrite_for_staff(dict(raw), client, memo)
+    assert (
+        first["documentation_required"] == second["documentation_required"] == ["Get the MRI order"]
+    )
+    client.extract_json.assert_called_once()
+    assert memo.stats()["hits"] == 1
+
+
+def test_extraction_not_memoized_on_raw_output(tmp_path):
+    """Unparseable LLM output is not memoized."""
+    memo = LLMMemo(tmp_path / "memo.sqlite")
+    pl = PolicyLookup(llm_memo=memo)
+    client = _client({"raw": "not json"})
+    pl._extract_with_llm("CPT 70553 policy", "70553", client)
+    pl._extract_with_llm("CPT 70553 policy", "70553", client)
+    assert client.extract_json.call_count == 2
@@ -26,9 +26,8 @@ def test_ollama_client_query_mock(mock_ollama):
 def test_ollama_client_extract_json_mock(mock_ollama):
     """extract_json parses JSON from response."""
     mock_client = MagicMock()
-    mock_client.chat.return_value = {
-        "message": {"content": '{"code": "70553", "confidence": "high"}'}
-    }
+    response = {"message": {"content": '{"code": "70553", "confidence": "high"}'}}
+    mock_client.chat.side_effect = lambda **kw: iter([response]) if kw.get("stream") else response
     mock_ollama.Client.return_value = mock_client
 
     from src.llm.ollama_client import OllamaClient
@@ -37,3 +36,200 @@ def test_ollama_client_extract_json_mock(mock_ollama):
     result = client.extract_json("map to CPT")
     assert result["code"] == "70553"
     assert result["confidence"] == "high"
+
+
+@patch("src.llm.ollama_client.ollama")
+def test_ollama_client_is_shared_with_timeout_and_pool(mock_ollama):
+    """One underlying client per process/host, created with timeouts and pool limits."""
+    from src.llm.ollama_client import OllamaClient
+
+    a = OllamaClient()
+    b = OllamaClient()
+    assert a._client is b._client
+    mock_ollama.Client.assert_called_once()
+    kwargs = mock_ollama.Client.call_args.kwargs
+    assert kwargs["timeout"].read == a.timeout
+    assert kwargs["limits"].max_connections == 4
+
+
+@patch("src.llm.ollama_client.time.sleep")
+@patch("src.llm.ollama_client.ollama")
+def test_ollama_client_retries_transient_errors(mock_ollama, mock_sleep):
+    """Connection errors and 5xx are retried; client errors are raised immediately."""
+    import ollama
+
+    mock_ollama.ResponseError = ollama.ResponseError
+    mock_client = MagicMock()
+    mock_client.chat.side_effect = [
+        ConnectionError("refused"),
+        ollama.ResponseError("busy", 503),
+        {"message": {"content": "ok"}},
+    ]
+    mock_ollama.Client.return_value = mock_client
+
+    from src.llm.ollama_client import OllamaClient
+
+    client = OllamaClient()
+    assert client.query("hi") == "ok"
+    assert mock_client.chat.call_count == 3
+    assert mock_sleep.call_count == 2
+
+    mock_client.chat.side_effect = ollama.ResponseError("model not found", 404)
+    with pytest.raises(ollama.ResponseError):
+        client.query("hi", cache=False)
+    assert mock_client.chat.call_count == 4
+
+    import httpx
+
+    mock_client.chat.side_effect = httpx.ReadTimeout("generation too slow")
+    with pytest.raises(httpx.ReadTimeout):
+        client.query("hi", cache=False)
+    assert mock_client.chat.call_count == 5
+
+
+@patch("src.llm.ollama_client.ollama")
+def test_extract_json_stream_stops_when_object_closes(mock_ollama):
+    """Streaming extract_json stops reading (and closes the stream) once the JSON object closes."""
+    parts = ['Sure: {"code": ', '"70553", "note": "a } b"', "}", " Hope", " this helps", "!"]
+    consumed = []
+    closed = []
+
+    def stream():
+        try:
+            for part in parts:
+                consumed.append(part)
+                yield {"message": {"content": part}}
+        finally:
+            closed.append(True)
+
+    mock_client = MagicMock()
+    mock_client.chat.return_value = stream()
+    mock_ollama.Client.return_value = mock_client
+
+    from src.llm.ollama_client import OllamaClient
+
+    result = OllamaClient().extract_json("map to CPT", stream=True)
+    assert result == {"code": "70553", "note": "a } b"}
+    assert consumed[-1] == "}"
+    assert closed == [True]
+    assert mock_client.chat.call_args.kwargs["stream"] is True
+
+
+@patch("src.llm.ollama_client.ollama")
+def test_ollama_client_extract_json_with_schema(mock_ollama):
+    """A schema is sent as Ollama's format and the output is validated against it."""
+    from src.llm.ollama_client import OllamaClient
+    from src.llm.schemas import CPTMapping
+
+    mock_client = MagicMock()
+    mock_ollama.Client.return_value = mock_client
+    client = OllamaClient()
+
+    response = {"message": {"content": '{"code": "70553", "confidence": "high"}'}}
+    mock_client.chat.side_effect = lambda **kw: iter([response]) if kw.get("stream") else response
+    result = client.extract_json("map to CPT", schema=CPTMapping)
+    assert result == {"code": "70553", "description": "", "confidence": "high"}
+    fmt = mock_client.chat.call_args.kwargs["format"]
+    assert set(fmt["required"]) == {"code", "description", "confidence"}
+
+    bad = {"message": {"content": '{"code": "70553", "confidence": "certain"}'}}
+    mock_client.chat.side_effect = lambda **kw: iter([bad]) if kw.get("stream") else bad
+    assert "raw" in client.extract_json("map to CPT", schema=CPTMapping, cache=False)
+
+
+def test_prompt_version_covers_schema():
+    """Prompts with an output schema hash it into their version."""
+    from src.llm.prompt_manager import prompt_version
+    from src.llm.schemas import PROMPT_SCHEMAS
+
+    before = prompt_version("cpt_mapper")
+    with patch.dict(PROMPT_SCHEMAS, {"cpt_mapper": None}):
+        assert prompt_version("cpt_mapper") != before
+
+
+@patch("src.llm.ollama_client.ollama")
+def test_async_client_query_and_stream(mock_ollama):
+    """AsyncOllamaClient shares one AsyncClient per loop and streams extract_json like the sync."""
+    import asyncio
+
+    from src.llm.ollama_client import AsyncOllamaClient
+
+    async def chat(**kwargs):
+        if not kwargs.get("stream"):
+            return {"message": {"content": "Hello"}}
+
+        async def parts():
+            for part in ['{"code": ', '"70553"}', " trailing"]:
+                yield {"message": {"content": part}}
+
+        return parts()
+
+    mock_ollama.AsyncClient.return_value.chat.side_effect = chat
+
+    async def run():
+        a, b = AsyncOllamaClient(), AsyncOllamaClient()
+        assert await a.query("hi") == "Hello"
+        assert await b.extract_json("map to CPT", stream=True) == {"code": "70553"}
+        assert a._client is b._client
+
+    asyncio.run(run())
+    mock_ollama.AsyncClient.assert_called_once()
+
+
+@patch("src.llm.ollama_client.ollama")
+def test_async_client_timeout_cancels_request_and_frees_slot(mock_ollama):
+    """A timed-out call cancels the in-flight request and releases its scheduler slot."""
+    import asyncio
+
+    from src.llm.ollama_client import AsyncOllamaClient
+
+    cancelled = []
+
+    async def slow_chat(**kwargs):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    mock_ollama.AsyncClient.return_value.chat.side_effect = slow_chat
+
+    async def run():
+        client = AsyncOllamaClient()
+        with pytest.raises(TimeoutError) as exc_info:
+            await client.query("hi", cache=False, timeout=0.05)
+        assert type(exc_info.value) is TimeoutError
+        return client._scheduler.stats()
+
+    stats = asyncio.run(run())
+    assert cancelled == [True]
+    assert stats["inflight"] == 0
+
+
+@patch("src.llm.ollama_client.ollama")
+def test_health_uses_tags_and_ps_with_ttl_cache(mock_ollama):
+    """health() never generates, is cached, and warm_up loads the model with keep_alive."""
+    from src.llm.ollama_client import OllamaClient
+
+    mock_client = MagicMock()
+    mock_client.list.return_value = {"models": [{"model": "qwen2.5-coder:3b"}]}
+    mock_client.ps.return_value = {"models": []}
+    mock_ollama.Client.return_value = mock_client
+
+    client = OllamaClient(model="qwen2.5-coder:3b", base_url="http://health-test:11434")
+    health = client.health()
+    assert health["ok"] and health["model_available"] and not health["model_loaded"]
+    assert client.health() == health
+    assert mock_client.list.call_count == 1
+    mock_client.chat.assert_not_called()
+
+    assert client.warm_up(keep_alive="1h")
+    kwargs = mock_client.generate.call_args.kwargs
+    assert kwargs["model"] == "qwen2.5-coder:3b"
+    assert kwargs["keep_alive"] == "1h"
+    mock_client.ps.return_value = {"models": [{"model": "qwen2.5-coder:3b"}]}
+    assert client.health()["model_loaded"]
+
+    missing = OllamaClient(model="llama3", base_url="http://health-test:11434").health()
+    assert not missing["ok"]
+    assert "not pulled" in missing["error"]
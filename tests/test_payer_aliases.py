@@ -27,3 +27,41 @@ def test_unknown_passes_through():
     """Unknown payer passes through as-is."""
     result = normalize_payer("SomeOtherPayer")
     assert result == "SomeOtherPayer"
+
+
+def test_longest_alias_in_free_text():
+    """Payer names embedded in longer text resolve via the longest contained alias."""
+    assert normalize_payer("Blue Cross Blue Shield of Texas") == "Anthem"
+    assert normalize_payer("UHC Medicare Advantage") == "UnitedHealthcare"
+    assert normalize_payer("Aetna Better Health") == "Aetna"
+
+
+def test_fuzzy_match_and_confidence():
+    """Typos resolve with lower confidence than exact aliases."""
+    from src.lookup.payer_aliases import resolve_payer
+    exact = resolve_payer("Medicare")
+    typo = resolve_payer("Medicar")
+    assert exact.canonical == typo.canonical == "Medicare"
+    assert exact.confidence == 1.0
+    assert typo.confidence < exact.confidence
+    assert resolve_payer("SomeOtherPayer") is None
+
+
+def test_medicaid_is_not_medicare():
+    """Medicaid plans never fuzzy-match Medicare; they pass through unresolved."""
+    from src.lookup.payer_aliases import resolve_payer
+    for text in ("Medicaid", "Texas Medicaid", "Molina Medicaid"):
+        assert resolve_payer(text) is None
+        assert normalize_payer(text) == text
+
+
+def test_specific_carrier_wins_regardless_of_order():
+    """A carrier named alongside a program payer wins in either word order."""
+    assert normalize_payer("Medicare Advantage UHC") == "UnitedHealthcare"
+    assert normalize_payer("UHC Medicare Advantage") == "UnitedHealthcare"
+
+
+def test_min_confidence_rejects_fuzzy_matches():
+    """Callers can require a confidence above the typo-match level."""
+    assert normalize_payer("Medicar") == "Medicare"
+    assert normalize_payer("Medicar", min_confidence=0.6) == "Medicar"
@@ -1,5 +1,11 @@
 """Tests for policy lookup."""
 
+import json
+import time
+from unittest.mock import MagicMock
+
+from src.ingestion.cpt_index import write_cpt_index
+from src.lookup.deadline import Deadline
 from src.lookup.policy_lookup import PolicyLookup, _default_requirements
 
 
@@ -27,3 +33,131 @@ def test_policy_lookup_returns_default_when_no_data():
     assert "prior_auth_required" in r
     assert isinstance(r["documentation_required"], list)
     assert r["source_section"] == "default"
+
+
+def test_parsed_json_source_uses_cpt_index(tmp_path):
+    """parsed_json source resolves the matching chunk through the CPT index."""
+    chunks = [
+        {"text": "CPT 170553 is not a match", "chunk_index": 0, "metadata": {"payer": "Anthem"}},
+        {"text": "CPT 70553 prior authorization\n- Clinical notes for the study", "chunk_index": 1,
+         "metadata": {"payer": "Anthem"}},
+    ]
+    (tmp_path / "mri.json").write_text(json.dumps({"chunks": chunks}), encoding="utf-8")
+    write_cpt_index(tmp_path)
+
+    pl = PolicyLookup()
+    source = {"type": "parsed_json", "parsed_dir": str(tmp_path)}
+    r = pl._query_source(source, "70553", "Anthem", None)
+    assert r is not None
+    assert r["source_section"] == "Anthem"
+    assert r["documentation_required"] == ["Clinical notes for the study"]
+    assert pl._query_source(source, "99999", "Anthem", None) is None
+
+
+def test_parsed_json_source_scans_unindexed_files(tmp_path):
+    """Files not covered by the index are still scanned."""
+    (tmp_path / "new.json").write_text(
+        json.dumps({"chunks": [{"text": "CPT 73721 knee MRI", "metadata": {"payer": "Anthem"}}]}),
+        encoding="utf-8",
+    )
+    pl = PolicyLookup()
+    r = pl._query_source(
+        {"type": "parsed_json", "parsed_dir": str(tmp_path)}, "73721", "Anthem", None
+    )
+    assert r is not None
+    assert r["source_section"] == "Anthem"
+
+
+def test_medicare_skips_live_staff_rewrite():
+    """CMS results are served without a live staff rewrite by default."""
+    cms = MagicMock()
+    cms.cache_path = "missing.json"
+    cms.get_requirements.return_value = {
+        "prior_auth_required": True,
+        "documentation_required": ["Notes"],
+        "medical_necessity_criteria": [],
+        "common_denial_reasons": [],
+        "source_section": "CMS MCD Test",
+    }
+    client = MagicMock()
+    r = PolicyLookup(cms_lookup=cms).get_requirements("70553", "Medicare", client)
+    assert r["documentation_required"] == ["Notes"]
+    client.extract_json.assert_not_called()
+
+
+def test_get_requirements_many_fans_out_per_canonical_payer():
+    """Aliases of one payer are looked up once; every input payer gets a result."""
+    cms = MagicMock()
+    cms.cache_path = "missing.json"
+    cms.get_requirements.return_value = {
+        "prior_auth_required": True,
+        "documentation_required": ["Notes"],
+        "medical_necessity_criteria": [],
+        "common_denial_reasons": [],
+        "source_section": "CMS MCD Test",
+    }
+    pl = PolicyLookup(cms_lookup=cms)
+    results = pl.get_requirements_many("70553", ["Medicare", "cms", "UnknownPayerXYZ"])
+    assert list(results) == ["Medicare", "cms", "UnknownPayerXYZ"]
+    assert results["Medicare"]["source_section"] == "CMS MCD Test"
+    assert results["cms"] == results["Medicare"]
+    assert results["UnknownPayerXYZ"]["source_section"] == "default"
+    cms.get_requirements.assert_called_once()
+
+
+def test_deadline_degrades_to_heuristic(tmp_path):
+    """A slow LLM extraction is abandoned at the deadline in favour of the heuristic parse."""
+    chunk = {
+        "text": "CPT 70553 prior authorization\n- Clinical notes for the study",
+        "metadata": {"payer": "Anthem"},
+    }
+    (tmp_path / "mri.json").write_text(json.dumps({"chunks": [chunk]}), encoding="utf-8")
+    client = MagicMock()
+    client.extract_json.side_effect = lambda *a, **k: time.sleep(1) or {}
+
+    pl = PolicyLookup()
+    source = {"type": "parsed_json", "parsed_dir": str(tmp_path)}
+    start = time.monotonic()
+    r = pl._lookup_requirements("70553", "Anthem", "Anthem", source, client, Deadline(0.05))
+    assert time.monotonic() - start < 0.5
+    assert r["answer_tier"] == "heuristic"
+    assert r["documentation_required"] == ["Clinical notes for the study"]
+
+
+def test_rewrite_reports_llm_tier():
+    """Completed live staff rewrite reports the llm_rewrite tier and is not degraded."""
+    client = MagicMock()
+    client.model = "m"
+    client.extract_json.return_value = {"documentation_required": ["Collect notes"]}
+    r = PolicyLookup()._maybe_rewrite_for_staff(
+        {"documentation_required": ["Raw"], "answer_tier": "heuristic"}, client, Deadline(5)
+    )
+    assert r["answer_tier"] == "llm_rewrite"
+    assert r["documentation_required"] == ["Collect notes"]
+
+
+def test_empty_source_section_falls_back_to_llm():
+    """Schema output always carries source_section; an empty one is reported as "llm"."""
+    finish = PolicyLookup()._finish_extraction
+    result = finish({"prior_auth_required": True, "source_section": ""}, None)
+    assert result["source_section"] == "llm"
+    assert finish({"source_section": "Section 4.2"}, None)["source_section"] == "Section 4.2"
+
+
+def test_vector_source_uses_hybrid_search_with_cpt_prefilter(monkeypatch):
+    """vector_store payers query hybrid_search with the CPT code and offer every fused chunk."""
+    store = MagicMock()
+    store.hybrid_search.return_value = [{"text": f"chunk {i}", "metadata": {}} for i in range(3)]
+    pl = PolicyLookup(vector_store=store)
+    source = {"type": "vector_store", "metadata_filter": {"payer": "Aetna"}}
+    retrieved = pl._retrieve_source(source, "70553", "Aetna", Deadline())
+    _, kwargs = store.hybrid_search.call_args
+    assert kwargs["cpt_code"] == "70553"
+    assert kwargs["where"] == {"payer": "Aetna"}
+    assert retrieved.policy_chunks == ["chunk 0", "chunk 1", "chunk 2"]
+
+    from src.config import get_config
+
+    monkeypatch.setitem(get_config()["vector_store"], "llm_chunks", 2)
+    retrieved = pl._retrieve_source(source, "70553", "Aetna", Deadline())
+    assert retrieved.policy_chunks == ["chunk 0", "chunk 1"]
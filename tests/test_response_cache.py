@@ -0,0 +1,72 @@
+"""Tests for the persistent LLM response cache."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.llm.response_cache import LLMResponseCache
+
+
+def test_make_key_depends_on_model_prompt_system_and_options():
+    """Key changes with every part of the request."""
+    k = LLMResponseCache.make_key("m1", "prompt", None, format="json")
+    assert k == LLMResponseCache.make_key("m1", "prompt", None, format="json")
+    assert k != LLMResponseCache.make_key("m2", "prompt", None, format="json")
+    assert k != LLMResponseCache.make_key("m1", "prompt ", None, format="json")
+    assert k != LLMResponseCache.make_key("m1", "prompt", "system", format="json")
+    assert k != LLMResponseCache.make_key("m1", "prompt", None, format={"type": "object"})
+
+
+def test_hits_report_saved_seconds_and_evict_by_size(tmp_path):
+    """Hits add the original generation time; beyond max_entries the LRU entry is evicted."""
+    cache = LLMResponseCache(tmp_path / "llm.sqlite", max_entries=2)
+    cache.set("a", "A", 2.5)
+    assert cache.get("a") == "A"
+    assert cache.get("missing") is None
+    cache.set("b", "B", 1.0)
+    cache.set("c", "C", 1.0)
+    assert cache.get("a") is None
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["saved_seconds"] == 2.5
+    assert stats["entries"] == 2
+
+
+def test_entries_expire(tmp_path):
+    """Entries older than the TTL are not served."""
+    cache = LLMResponseCache(tmp_path / "llm.sqlite", ttl_seconds=60)
+    with patch("src.sqlite_cache.time.time", return_value=1000.0):
+        cache.set("a", "A", 1.0)
+    with patch("src.sqlite_cache.time.time", return_value=1030.0):
+        assert cache.get("a") == "A"
+    with patch("src.sqlite_cache.time.time", return_value=1061.0):
+        assert cache.get("a") is None
+
+
+@patch("src.llm.ollama_client.ollama")
+def test_ollama_client_serves_repeated_prompts_from_cache(mock_ollama):
+    """Repeated extract_json/query calls skip Ollama; cache=False and unparseable output bypass."""
+    pytest.importorskip("ollama")
+    from src.llm.ollama_client import OllamaClient
+
+    response = {"message": {"content": '{"code": "70553"}'}}
+    mock_client = MagicMock()
+    mock_client.chat.side_effect = lambda **kw: iter([response]) if kw.get("stream") else response
+    mock_ollama.Client.return_value = mock_client
+    client = OllamaClient()
+
+    assert client.extract_json("map to CPT") == {"code": "70553"}
+    assert client.extract_json("map to CPT") == {"code": "70553"}
+    assert mock_client.chat.call_count == 1
+    client.extract_json("map to CPT", cache=False)
+    client.query("hello")
+    client.query("hello")
+    assert mock_client.chat.call_count == 3
+    assert client.cache_stats()["hits"] == 2
+
+    bad = {"message": {"content": "no json here"}}
+    mock_client.chat.side_effect = lambda **kw: iter([bad]) if kw.get("stream") else bad
+    assert "raw" in client.extract_json("other prompt")
+    assert "raw" in client.extract_json("other prompt")
+    assert mock_client.chat.call_count == 5
@@ -0,0 +1,157 @@
+"""Tests for the requirements result cache."""
+
+from unittest.mock import MagicMock
+
+from src.lookup.policy_lookup import PolicyLookup
+from src.lookup.result_cache import RequirementsCache, make_cache_key
+
+
+def _requirements():
+    return {
+        "prior_auth_required": True,
+        "documentation_required": ["Clinical notes"],
+        "medical_necessity_criteria": ["Known tumor"],
+        "common_denial_reasons": ["Missing notes"],
+        "source_section": "CMS MCD L33632",
+    }
+
+
+def test_cache_key_changes_with_components():
+    """Every key component participates in the key."""
+    base = make_cache_key("Medicare", "70553", "v1", "p1", "m1")
+    assert base == make_cache_key("Medicare", " 70553 ", "v1", "p1", "m1")
+    assert base != make_cache_key("Medicare", "70553", "v2", "p1", "m1")
+    assert base != make_cache_key("Medicare", "70553", "v1", "p2", "m1")
+    assert base != make_cache_key("Medicare", "70553", "v1", "p1", "m2")
+
+
+def test_memory_and_disk_tiers(tmp_path):
+    """Disk tier survives a new instance; hits are counted per tier."""
+    path = tmp_path / "req.sqlite"
+    cache = RequirementsCache(path=path)
+    assert cache.get("k") is None
+    cache.set("k", _requirements())
+    assert cache.get("k") == _requirements()
+
+    fresh = RequirementsCache(path=path)
+    assert fresh.get("k") == _requirements()
+    assert fresh.get("k") == _requirements()
+    stats = fresh.stats()
+    assert stats["disk_hits"] == 1
+    assert stats["memory_hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_ttl_eviction(tmp_path, monkeypatch):
+    """Expired entries are misses in both tiers."""
+    import src.lookup.result_cache as rc
+    import src.sqlite_cache as sc
+
+    cache = RequirementsCache(path=tmp_path / "req.sqlite", ttl_seconds=10)
+    cache.set("k", _requirements())
+    later = rc.time.time() + 60
+    monkeypatch.setattr(rc.time, "time", lambda: later)
+    monkeypatch.setattr(sc.time, "time", lambda: later)
+    assert cache.get("k") is None
+
+
+def test_policy_lookup_cache_hit_skips_source():
+    """Second identical lookup is served from cache without touching the source."""
+    cms = MagicMock()
+    cms.cache_path = "missing.json"
+    cms.get_requirements.return_value = _requirements()
+    pl = PolicyLookup(cms_lookup=cms)
+    first = pl.get_requirements("70553", "Medicare")
+    second = PolicyLookup(cms_lookup=cms).get_requirements("70553", "medicare")
+    assert first == second
+    assert first["documentation_required"] == ["Clinical notes"]
+    assert first["answer_tier"] == "source"
+    cms.get_requirements.assert_called_once()
+
+
+def test_unconfigured_payer_aliases_get_separate_keys():
+    """Without a source config the fallback matches on payer text, so aliases are keyed apart."""
+    pl = PolicyLookup(cms_lookup=MagicMock())
+    cms = {"type": "cms_api"}
+
+    def key(canonical, source, payer):
+        return pl._result_cache_key("70553", canonical, source, None, payer)
+
+    assert key("Medicare", cms, "cms") == key("Medicare", cms, "Medicare")
+    assert key("Humana", None, "Humana") != key("Humana", None, "Humana Gold")
+
+
+def test_source_version_is_reused_briefly(monkeypatch):
+    """Repeated lookups reuse the source fingerprint instead of re-statting the parsed tree."""
+    pl = PolicyLookup(cms_lookup=MagicMock())
+    compute = MagicMock(return_value="v1")
+    monkeypatch.setattr(pl, "_compute_source_version", compute)
+    assert pl._source_version(None, "Aetna") == pl._source_version(None, "Aetna") == "v1"
+    compute.assert_called_once()
+
+
+def test_failed_staff_rewrite_is_not_cached(monkeypatch):
+    """A rewrite that raises (e.g. scheduler back-pressure) is retried on the next lookup."""
+    from src.config import get_config
+
+    monkeypatch.setitem(get_config().setdefault("cms_api", {}), "live_staff_rewrite", True)
+    cms = MagicMock()
+    cms.cache_path = "missing.json"
+    cms.get_requirements.side_effect = lambda *a, **k: _requirements()
+    client = MagicMock()
+    client.model = "m"
+    client.extract_json.side_effect = [
+        ConnectionError("down"),
+        {"documentation_required": ["Send the clinical notes"]},
+    ]
+    pl = PolicyLookup(cms_lookup=cms)
+    assert pl.get_requirements("70553", "Medicare", client)["answer_tier"] == "source"
+    second = pl.get_requirements("70553", "Medicare", client)
+    assert second["answer_tier"] == "llm_rewrite"
+    assert second["documentation_required"] == ["Send the clinical notes"]
+    assert "_uncacheable" not in second
+
+
+def test_unparseable_extraction_is_not_cached(tmp_path, monkeypatch):
+    """Raw (unparseable) extraction output is not served from the cache on later lookups."""
+    import json
+
+    from src.config import get_config
+
+    chunk = {"text": "CPT 70553 prior authorization", "metadata": {"payer": "Anthem"}}
+    (tmp_path / "mri.json").write_text(json.dumps({"chunks": [chunk]}), encoding="utf-8")
+    source = {"type": "parsed_json", "parsed_dir": str(tmp_path)}
+    monkeypatch.setitem(get_config().setdefault("policy_sources", {}), "Anthem", source)
+    client = MagicMock()
+    client.model = "m"
+    client.extract_json.side_effect = [
+        {"raw": "not json"},
+        {"prior_auth_required": True, "documentation_required": ["Notes"]},
+        {"documentation_required": ["Send the notes"]},
+    ]
+    pl = PolicyLookup()
+    assert pl.get_requirements("70553", "Anthem", client)["documentation_required"] == []
+    second = pl.get_requirements("70553", "Anthem", client)
+    assert second["documentation_required"] == ["Send the notes"]
+    assert client.extract_json.call_count == 3
+
+
+def test_source_version_changes_when_reseed_keeps_count(tmp_path):
+    """Replacing a chunk's text (same collection size) changes the source fingerprint."""
+    from src.lookup.vector_backends import NumpyBackend
+    from src.lookup.vector_store import PolicyVectorStore, chunk_id
+
+    store = PolicyVectorStore(
+        persist_directory=tmp_path,
+        embedding_function=lambda texts: [[1.0, float(len(t))] for t in texts],
+        backend=NumpyBackend(tmp_path / "idx"),
+    )
+    meta = {"payer": "Aetna", "source": "a.pdf"}
+    store.add_chunks([{"text": "MRI 70553 notes", "metadata": meta}])
+    pl = PolicyLookup(vector_store=store, cms_lookup=MagicMock())
+    before = pl._compute_source_version(None, "Aetna")
+    edited = {"text": "MRI 70553 revised notes", "metadata": meta}
+    store.add_chunks([edited])
+    store.prune_source("a.pdf", [chunk_id(edited)], payer="Aetna")
+    assert store.count() == 1
+    assert pl._compute_source_version(None, "Aetna") != before
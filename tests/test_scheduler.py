@@ -0,0 +1,91 @@
+"""Tests for the LLM request scheduler."""
+
+import threading
+import time
+
+import pytest
+
+from src.llm.scheduler import LLMScheduler, SchedulerBusyError
+
+
+def _wait_for(predicate, timeout=2.0):
+    end = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < end, "timed out"
+        time.sleep(0.005)
+
+
+def test_scheduler_admits_waiters_by_priority():
+    """With one slot busy, a late interactive request is admitted before earlier background ones."""
+    sched = LLMScheduler(max_inflight=1)
+    sched.acquire("normal")
+    order = []
+
+    def worker(priority):
+        with sched.slot(priority):
+            order.append(priority)
+
+    threads = []
+    for priority in ["background", "background", "interactive"]:
+        t = threading.Thread(target=worker, args=(priority,))
+        t.start()
+        threads.append(t)
+        _wait_for(lambda n=len(threads): sched.stats()["queued"] == n)
+    assert sched.stats()["queued_by_priority"] == {"interactive": 1, "normal": 0, "background": 2}
+
+    sched.release()
+    for t in threads:
+        t.join(2)
+    assert order == ["interactive", "background", "background"]
+    stats = sched.stats()
+    assert stats["inflight"] == 0
+    assert stats["admitted"] == 4
+    assert stats["max_queue_depth"] == 3
+    assert stats["wait_seconds"]["interactive"]["p95"] > 0
+
+
+def test_scheduler_back_pressure():
+    """A full queue rejects immediately; a queued request gives up after the timeout."""
+    sched = LLMScheduler(max_inflight=1, max_queue=0)
+    with sched.slot():
+        with pytest.raises(SchedulerBusyError):
+            sched.acquire("interactive")
+        sched.max_queue = None
+        with pytest.raises(SchedulerBusyError):
+            sched.acquire("interactive", timeout=0.05)
+    stats = sched.stats()
+    assert stats["rejected"] == 1
+    assert stats["timed_out"] == 1
+    assert stats["queued"] == 0
+    with sched.slot("interactive"):
+        assert sched.stats()["inflight"] == 1
+
+
+def test_scheduler_async_waiters():
+    """Coroutines queue by priority alongside threads and leave the queue when cancelled."""
+    import asyncio
+
+    sched = LLMScheduler(max_inflight=1)
+
+    async def run():
+        order = []
+
+        async def worker(priority):
+            async with sched.async_slot(priority):
+                order.append(priority)
+
+        sched.acquire("normal")
+        background = asyncio.create_task(worker("background"))
+        cancelled = asyncio.create_task(worker("normal"))
+        interactive = asyncio.create_task(worker("interactive"))
+        await asyncio.sleep(0.01)
+        assert sched.stats()["queued"] == 3
+        cancelled.cancel()
+        await asyncio.sleep(0.01)
+        assert sched.stats()["queued"] == 2
+        await asyncio.to_thread(sched.release)
+        await asyncio.gather(background, interactive)
+        return order
+
+    assert asyncio.run(run()) == ["interactive", "background"]
+    assert sched.stats()["inflight"] == 0
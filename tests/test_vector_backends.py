@@ -0,0 +1,179 @@
+"""Tests for the local NumPy vector backend."""
+
+import numpy as np
+import pytest
+
+from src.lookup.vector_backends import NumpyBackend, VectorBackend
+from src.lookup.vector_store import PolicyVectorStore
+
+
+def _unit(i, dim=8):
+    v = np.zeros(dim, dtype=np.float32)
+    v[i % dim] = 1.0
+    v[(i + 1) % dim] = 0.1 * (i // dim)
+    return v.tolist()
+
+
+def test_exact_search_filters_and_persists(tmp_path):
+    """Nearest neighbours honour where filters; upsert/delete persist across reopen."""
+    backend = NumpyBackend(tmp_path / "idx")
+    backend.upsert(
+        ["a", "b", "c"],
+        [_unit(0), _unit(1), _unit(0)],
+        ["doc a", "doc b", "doc c"],
+        [{"payer": "Aetna"}, {"payer": "Aetna"}, {"payer": "Cigna", "cpt_70553": True}],
+    )
+    hits = backend.query(_unit(0), 2)
+    assert set(hits["ids"]) == {"a", "c"}
+    assert hits["distances"][0] < 1e-6
+    assert backend.query(_unit(0), 5, where={"payer": "Aetna"})["ids"] == ["a", "b"]
+    where = {"$and": [{"payer": {"$in": ["Cigna"]}}, {"cpt_70553": True}]}
+    assert backend.query(_unit(0), 5, where=where)["ids"] == ["c"]
+
+    backend.upsert(["a"], [_unit(1)], ["doc a2"], [{"payer": "Aetna"}])
+    backend.delete(["b"])
+    reopened = NumpyBackend(tmp_path / "idx")
+    assert reopened.count() == 2
+    assert isinstance(reopened._vectors, np.memmap)
+    assert reopened.get(ids=["a"])["documents"] == ["doc a2"]
+    assert reopened.query(_unit(1), 1)["ids"] == ["a"]
+
+
+def test_ivf_search_finds_exact_neighbour(tmp_path):
+    """IVF probes the closest clusters and still returns the true nearest neighbour."""
+    rng = np.random.default_rng(1)
+    vectors = rng.normal(size=(400, 16)).astype(np.float32)
+    ids = [str(i) for i in range(400)]
+    backend = NumpyBackend(tmp_path / "ivf", index="ivf", ivf_min_points=100, ivf_nprobe=3)
+    backend.upsert(ids, vectors.tolist(), ids, [{}] * 400)
+    assert backend._centroids is not None
+    for i in (0, 123, 399):
+        assert backend.query(vectors[i].tolist(), 1)["ids"] == [str(i)]
+
+
+def test_query_many_matches_single_queries(tmp_path):
+    """Batched exact search returns the same neighbours as one query at a time."""
+    rng = np.random.default_rng(2)
+    vectors = rng.normal(size=(50, 8)).astype(np.float32)
+    ids = [str(i) for i in range(50)]
+    backend = NumpyBackend(tmp_path / "idx")
+    backend.upsert(ids, vectors.tolist(), ids, [{"even": i % 2 == 0} for i in range(50)])
+    queries = rng.normal(size=(5, 8)).tolist()
+    batched = backend.query_many(queries, 3, where={"even": True})
+    assert [r["ids"] for r in batched] == [
+        backend.query(q, 3, where={"even": True})["ids"] for q in queries
+    ]
+
+
+def test_policy_vector_store_on_numpy_backend(tmp_path):
+    """The store API (add_chunks/search/count) is unchanged on the NumPy backend."""
+    embed = lambda texts: [_unit(len(t)) for t in texts]  # noqa: E731
+    store = PolicyVectorStore(
+        persist_directory=tmp_path,
+        embedding_function=embed,
+        backend=NumpyBackend(tmp_path / "idx"),
+    )
+    chunks = [{"text": t, "chunk_index": i, "metadata": {"payer": "Aetna", "source": "a.pdf"}}
+              for i, t in enumerate(["MRI 70553 brain", "knee 73721"])]
+    assert store.add_chunks(chunks) == 2
+    assert store.add_chunks(chunks) == 0
+    assert store.count() == 2
+    assert store.search("xxxxxxxxxxxxxxx", n_results=1)[0]["text"] == "MRI 70553 brain"
+    assert store.hybrid_search("CPT 70553", cpt_code="70553")[0]["text"] == "MRI 70553 brain"
+
+
+def test_quantized_search_reranks_to_exact_results(tmp_path):
+    """float16/int8 shrink the scanned matrix; exact rerank keeps the float32 top results."""
+    rng = np.random.default_rng(3)
+    vectors = rng.normal(size=(300, 32)).astype(np.float32)
+    ids = [str(i) for i in range(300)]
+    exact = NumpyBackend(tmp_path / "f32")
+    exact.upsert(ids, vectors.tolist(), ids, [{}] * 300)
+    queries = rng.normal(size=(10, 32)).tolist()
+    expected = [r["ids"] for r in exact.query_many(queries, 5)]
+    for mode, ratio in (("float16", 2), ("int8", 3)):
+        backend = NumpyBackend(tmp_path / mode, quantization=mode)
+        backend.upsert(ids, vectors.tolist(), ids, [{}] * 300)
+        assert exact.resident_bytes() >= ratio * backend.resident_bytes()
+        assert [r["ids"] for r in backend.query_many(queries, 5)] == expected
+        reopened = NumpyBackend(tmp_path / mode, quantization=mode)
+        assert reopened._codes is not None
+        assert [r["ids"] for r in reopened.query_many(queries, 5)] == expected
+
+
+def test_quantized_scan_is_blockwise(tmp_path, monkeypatch):
+    """Scanning across several row blocks gives the same results as one block."""
+    import src.lookup.vector_backends as vb
+
+    rng = np.random.default_rng(1)
+    vectors = rng.normal(size=(50, 8)).astype(np.float32)
+    ids = [str(i) for i in range(50)]
+    metadatas = [{"payer": "a" if i % 2 else "b"} for i in range(50)]
+    backend = NumpyBackend(tmp_path / "int8", quantization="int8")
+    backend.upsert(ids, vectors, ids, metadatas)
+    expected = backend.query(vectors[3], 5)
+    expected_filtered = backend.query(vectors[3], 5, where={"payer": "a"})
+    monkeypatch.setattr(vb, "SCAN_BLOCK_ROWS", 7)
+    assert backend.query(vectors[3], 5) == expected
+    assert backend.query(vectors[3], 5, where={"payer": "a"}) == expected_filtered
+
+
+def test_incomplete_backend_fails_at_construction():
+    """A backend missing part of the interface cannot be instantiated."""
+
+    class QueryOnly(VectorBackend):
+        def query(self, embedding, n_results, where=None):
+            return {"ids": [], "documents": [], "metadatas": [], "distances": []}
+
+    with pytest.raises(TypeError):
+        QueryOnly()
+
+
+def test_long_lived_store_sees_reseed_from_another_instance(tmp_path):
+    """A reseed through another instance is visible to reads, and later writes keep it."""
+    embed = lambda texts: [_unit(len(t)) for t in texts]  # noqa: E731
+
+    def open_store():
+        return PolicyVectorStore(
+            persist_directory=tmp_path,
+            embedding_function=embed,
+            backend=NumpyBackend(tmp_path / "idx"),
+        )
+
+    serving = open_store()
+    assert serving.count() == 0
+    meta = {"payer": "Aetna", "source": "a.pdf"}
+    open_store().add_chunks([{"text": "MRI 70553 brain", "metadata": meta}])
+    assert serving.count() == 1
+    assert serving.hybrid_search("CPT 70553", cpt_code="70553")[0]["text"] == "MRI 70553 brain"
+    serving.add_chunks([{"text": "knee 73721", "metadata": meta}])
+    assert open_store().count() == 2
+
+
+def test_bulk_write_persists_and_trains_ivf_once(tmp_path, monkeypatch):
+    """Several add_chunks/prune_source calls in one bulk_write save the index once."""
+    import src.lookup.vector_backends as vb
+
+    kmeans_calls = []
+    real_kmeans = vb._kmeans
+
+    def counting_kmeans(*args, **kwargs):
+        kmeans_calls.append(1)
+        return real_kmeans(*args, **kwargs)
+
+    monkeypatch.setattr(vb, "_kmeans", counting_kmeans)
+    embed = lambda texts: [_unit(len(t)) for t in texts]  # noqa: E731
+    backend = NumpyBackend(tmp_path / "idx", index="ivf", ivf_min_points=4)
+    store = PolicyVectorStore(persist_directory=tmp_path, embedding_function=embed, backend=backend)
+    with store.bulk_write():
+        for n in range(5):
+            meta = {"payer": "Aetna", "source": f"{n}.pdf"}
+            store.add_chunks([{"text": f"policy {n} " + "x" * n, "metadata": meta}])
+        store.prune_source("0.pdf", [], payer="Aetna")
+        assert not (tmp_path / "idx" / "index.json").exists()
+        assert store.count() == 4
+        assert store.search("policy", n_results=4)
+    assert len(kmeans_calls) == 1
+    reopened = NumpyBackend(tmp_path / "idx", index="ivf", ivf_min_points=4)
+    assert reopened.count() == 4
+    assert reopened._centroids is not None
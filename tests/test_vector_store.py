@@ -0,0 +1,190 @@
+"""Tests for PolicyVectorStore upsert (Chroma client replaced by an in-memory fake)."""
+
+from types import SimpleNamespace
+
+import pytest
+
+import src.lookup.vector_backends as vb
+import src.lookup.vector_store as vs
+from src.lookup.lexical_index import matches_where
+
+
+class FakeCollection:
+    def __init__(self):
+        self.rows: dict[str, tuple[str, dict]] = {}
+        self.upsert_calls: list[int] = []
+        self.query_calls = 0
+
+    def upsert(self, documents, metadatas, ids, embeddings):
+        assert len(set(ids)) == len(ids) == len(embeddings)
+        self.upsert_calls.append(len(ids))
+        for cid, doc, meta in zip(ids, documents, metadatas):
+            self.rows[cid] = (doc, meta)
+
+    def get(self, ids=None, where=None, include=None, limit=None, offset=0):
+        if ids is not None:
+            hits = [cid for cid in ids if cid in self.rows]
+        else:
+            hits = [cid for cid, (_, m) in self.rows.items() if matches_where(m, where)]
+            hits = hits[offset : offset + limit if limit else None]
+        return {
+            "ids": hits,
+            "documents": [self.rows[cid][0] for cid in hits],
+            "metadatas": [self.rows[cid][1] for cid in hits],
+        }
+
+    def delete(self, ids):
+        for cid in ids:
+            self.rows.pop(cid, None)
+
+    def count(self):
+        return len(self.rows)
+
+    def query(self, query_embeddings, n_results, where=None):
+        self.query_calls += 1
+        # Stand-in for semantic ranking: every matching row, insertion order
+        hits = [cid for cid, (_, m) in self.rows.items() if matches_where(m, where)][:n_results]
+        return {
+            "ids": [hits] * len(query_embeddings),
+            "documents": [[self.rows[cid][0] for cid in hits]] * len(query_embeddings),
+            "metadatas": [[self.rows[cid][1] for cid in hits]] * len(query_embeddings),
+        }
+
+
+class CountingEmbedder:
+    def __init__(self):
+        self.texts: list[str] = []
+
+    def __call__(self, texts):
+        self.texts.extend(texts)
+        return [[float(len(t)), 1.0] for t in texts]
+
+
+@pytest.fixture
+def fake_chroma(monkeypatch):
+    def client_factory(**kw):
+        collection = FakeCollection()
+        return SimpleNamespace(get_or_create_collection=lambda **kw: collection, max_batch_size=3)
+
+    fake = SimpleNamespace(PersistentClient=client_factory)
+    monkeypatch.setattr(vb, "_import_chromadb", lambda: (fake, lambda **kw: None))
+
+
+@pytest.fixture
+def store(fake_chroma, tmp_path):
+    return vs.PolicyVectorStore(persist_directory=tmp_path, embedding_function=CountingEmbedder())
+
+
+def _chunks(texts, source="a.pdf", payer="Aetna"):
+    return [
+        {
+            "text": t,
+            "chunk_index": i,
+            "metadata": {"payer": payer, "source": source, "chunk_index": i},
+        }
+        for i, t in enumerate(texts)
+    ]
+
+
+def test_upsert_is_batched_and_idempotent(store):
+    """Chunks are upserted in client-capped batches; reseeding unchanged chunks writes nothing."""
+    chunks = _chunks([f"text {i}" for i in range(7)])
+    assert store.add_chunks(chunks) == 7
+    assert store._backend.collection.upsert_calls == [3, 3, 1]
+    assert store.add_chunks(chunks) == 0
+    assert store.count() == 7
+
+
+def test_changed_chunk_rewritten_and_stale_pruned(store):
+    """Edited text gets a new id; prune_source removes the source's previous chunks."""
+    store.add_chunks(_chunks(["one", "two"]))
+    edited = _chunks(["one", "two (revised)"])
+    assert store.add_chunks(edited) == 1
+    assert store.prune_source("a.pdf", [vs.chunk_id(c) for c in edited]) == 1
+    docs = sorted(doc for doc, _ in store._backend.collection.rows.values())
+    assert docs == ["one", "two (revised)"]
+    assert all("content_hash" in meta for _, meta in store._backend.collection.rows.values())
+
+
+def test_prune_source_keeps_other_payers_same_file_name(store):
+    """Reseeding one payer's policy.pdf does not delete another payer's policy.pdf chunks."""
+    aetna = _chunks(["aetna text"], source="policy.pdf")
+    uhc = _chunks(["uhc text"], source="policy.pdf", payer="UnitedHealthcare")
+    store.add_chunks(aetna + uhc)
+    assert store.prune_source("policy.pdf", [vs.chunk_id(c) for c in aetna], payer="Aetna") == 0
+    assert store.count() == 2
+
+
+def test_bm25_index_reloads_after_reseed_elsewhere(store, tmp_path):
+    """A long-running store picks up BM25 documents written by another process's reseed."""
+    other = vs.PolicyVectorStore(persist_directory=tmp_path, embedding_function=CountingEmbedder())
+    other.add_chunks(_chunks(["Knee MRI 73721"]))
+    assert len(store.lexical) == 0
+    store.hybrid_search("knee", cpt_code="73721")
+    assert len(store.lexical) == 1
+
+
+def test_rebuild_and_repeat_queries_reuse_cached_embeddings(fake_chroma, tmp_path):
+    """A fresh collection re-adds chunks and repeats queries without running the model again."""
+    chunks = _chunks(["alpha", "beta"])
+    first = CountingEmbedder()
+    vs.PolicyVectorStore(persist_directory=tmp_path, embedding_function=first).add_chunks(chunks)
+    assert first.texts == ["alpha", "beta"]
+
+    second = CountingEmbedder()
+    rebuilt = vs.PolicyVectorStore(persist_directory=tmp_path, embedding_function=second)
+    assert rebuilt.add_chunks(chunks) == 2
+    rebuilt.search("knee mri")
+    rebuilt.search("knee mri")
+    assert second.texts == ["knee mri"]
+    assert rebuilt._backend.collection.rows[vs.chunk_id(chunks[0])][1]["content_hash"]
+
+
+def test_hybrid_search_prefilters_on_cpt_metadata(store):
+    """Chunks are tagged with their CPT codes at ingestion; hybrid search prefilters on the code."""
+    store.add_chunks(_chunks([
+        "Knee MRI 73721 requires prior authorization",
+        "Brain MRI 70551 without contrast",
+        "Brain MRI 70553 without and with contrast requires prior authorization",
+    ]))
+    hits = store.hybrid_search("CPT 70553 prior authorization Aetna", cpt_code="70553", n_results=5)
+    assert [h["text"] for h in hits] == [
+        "Brain MRI 70553 without and with contrast requires prior authorization"
+    ]
+    assert hits[0]["metadata"]["cpt_70553"] is True
+
+    fallback = store.hybrid_search("prior authorization", cpt_code="99999", n_results=2)
+    assert len(fallback) == 2
+
+
+def test_search_many_embeds_and_queries_once(store):
+    """search_many issues one embedding batch and one collection query for all queries."""
+    store.add_chunks(_chunks(["Knee MRI 73721", "Brain MRI 70553"]))
+    embedder = store._embed_fn
+    embedder.texts.clear()
+    results = store.search_many(["q one", "q two", "q three"], n_results=1)
+    assert len(results) == 3
+    assert all(r[0]["text"] == "Knee MRI 73721" for r in results)
+    assert embedder.texts == ["q one", "q two", "q three"]
+    assert store._backend.collection.query_calls == 1
+
+
+def test_search_cache_hits_until_collection_changes(store, fake_chroma, tmp_path):
+    """Repeated searches skip embedding and query; writes (from any instance) invalidate."""
+    store.add_chunks(_chunks(["Knee MRI 73721"]))
+    store.search("knee", n_results=1, where={"payer": "Aetna"})
+    calls = store._backend.collection.query_calls
+    assert (
+        store.search("knee", n_results=1, where={"payer": "Aetna"})[0]["text"] == "Knee MRI 73721"
+    )
+    assert store._backend.collection.query_calls == calls
+    assert store.search_cache_stats()["hits"] == 1
+
+    store.add_chunks(_chunks(["Knee MRI 73721", "Hip MRI 73721"]))
+    store.search("knee", n_results=1, where={"payer": "Aetna"})
+    assert store._backend.collection.query_calls == calls + 1
+
+    other = vs.PolicyVectorStore(persist_directory=tmp_path, embedding_function=CountingEmbedder())
+    other.add_chunks(_chunks(["Shoulder MRI 73221"], source="b.pdf"))
+    store.search("knee", n_results=1, where={"payer": "Aetna"})
+    assert store._backend.collection.query_calls == calls + 2